@@ -0,0 +1,4 @@
+"""Бенчмарки отчёта: синтетические листы, фейковые Sheets и Telegram.
+
+Запуск: python -m benchmarks.run_benchmarks --output bench.json
+"""
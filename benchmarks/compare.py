@@ -0,0 +1,50 @@
+"""Сравнение двух прогонов бенчмарка: python -m benchmarks.compare old.json new.json
+
+Печатает p50/p90 по каждому сценарию и отношение new/old.
+Код возврата 1, если какой-то p50 вырос больше чем в --threshold раз.
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as file:
+        report = json.load(file)
+    return {
+        (item["scenario"], item["projects"], item["dates"]): item
+        for item in report["results"]
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args(argv)
+
+    old = load_results(args.old)
+    new = load_results(args.new)
+    regressed = False
+    for key in sorted(old.keys() & new.keys()):
+        old_p50 = old[key]["latency_ms"]["p50"]
+        new_p50 = new[key]["latency_ms"]["p50"]
+        ratio = new_p50 / old_p50 if old_p50 else float("inf")
+        marker = ""
+        if ratio > args.threshold:
+            marker = "  <-- регрессия"
+            regressed = True
+        scenario, projects, dates = key
+        print(
+            f"{scenario:32} {projects:>6}×{dates:<4} "
+            f"p50 {old_p50:9.2f} → {new_p50:9.2f} мс  "
+            f"p90 {old[key]['latency_ms']['p90']:9.2f} → {new[key]['latency_ms']['p90']:9.2f} мс  "
+            f"×{ratio:.2f}{marker}"
+        )
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
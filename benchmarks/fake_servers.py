@@ -0,0 +1,359 @@
+"""Локальные фейковые HTTP-серверы Google Sheets и Telegram Bot API.
+
+Оба крутятся в фоновом потоке на 127.0.0.1 и свободном порту:
+
+    with FakeSheetsServer({"sheet": rows}) as sheets, FakeTelegramServer() as telegram:
+        ...sheets.url, telegram.url...
+
+Sheets можно поднять отдельно и направить на него бота через SHEETS_API_BASE_URL:
+
+    python -m benchmarks.synthetic --projects 200 --dates 365 --output fixtures/sheet.json
+    python -m benchmarks.fake_servers --fixtures fixtures --port 8085 --rate-5xx 0.1
+    SHEETS_API_BASE_URL=http://127.0.0.1:8085 SECONDARY_SPREADSHEET_ID=sheet \\
+        CREDENTIALS_FILE= python send_secondary_report.py
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        return None
+
+    def send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _BackgroundServer:
+    """Общая обвязка: старт в потоке, url, context manager."""
+
+    handler_class = _QuietHandler
+
+    def __init__(self, port: int = 0):
+        self.requests_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self.handler_class)
+        self._server.daemon_threads = True
+        self._server.owner = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_request(self) -> int:
+        with self._lock:
+            self.requests_count += 1
+            return self.requests_count
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+GOOGLE_ERROR_STATUS = {
+    429: "RESOURCE_EXHAUSTED",
+    500: "INTERNAL",
+    502: "BAD_GATEWAY",
+    503: "UNAVAILABLE",
+    504: "DEADLINE_EXCEEDED",
+}
+
+_CELL_RE = re.compile(r"^([A-Za-z]*)(\d*)$")
+
+
+def _column_number(letters: str) -> int:
+    number = 0
+    for letter in letters.upper():
+        number = number * 26 + ord(letter) - ord("A") + 1
+    return number
+
+
+def parse_a1_range(range_name: str) -> Tuple[Optional[str], int, int, Optional[int], Optional[int]]:
+    """'Лист'!A1:ZZ227 → (лист, первая строка, первая колонка, конец строк, конец колонок).
+
+    Индексы с нуля, концы не включаются; None — до конца листа.
+    """
+    sheet_name = None
+    cells = range_name
+    if "!" in range_name:
+        sheet_name, cells = range_name.rsplit("!", 1)
+        if sheet_name.startswith("'") and sheet_name.endswith("'"):
+            sheet_name = sheet_name[1:-1].replace("''", "'")
+    start, _, end = cells.partition(":")
+    start_match = _CELL_RE.match(start.strip())
+    end_match = _CELL_RE.match((end or start).strip())
+    if not start_match or not end_match:
+        raise ValueError(f"Unable to parse range: {range_name}")
+
+    start_letters, start_digits = start_match.groups()
+    end_letters, end_digits = end_match.groups()
+    first_column = _column_number(start_letters) - 1 if start_letters else 0
+    first_row = int(start_digits) - 1 if start_digits else 0
+    last_column = _column_number(end_letters) if end_letters else None
+    last_row = int(end_digits) if end_digits else None
+    return sheet_name, first_row, first_column, last_row, last_column
+
+
+def clip_values(values: List[List[str]], range_name: str) -> List[List[str]]:
+    """Вырезает диапазон и, как Google, обрезает пустые хвосты строк и листа."""
+    _, first_row, first_column, last_row, last_column = parse_a1_range(range_name)
+    clipped = []
+    for row in values[first_row:last_row]:
+        cells = list(row[first_column:last_column])
+        while cells and cells[-1] in ("", None):
+            cells.pop()
+        clipped.append(cells)
+    while clipped and not clipped[-1]:
+        clipped.pop()
+    return clipped
+
+
+@dataclass
+class SheetsFaults:
+    """Что подмешивать в ответы: задержку, 429 и 5xx.
+
+    latency/jitter — секунды; rate_429/rate_5xx — доля запросов с ошибкой.
+    fail_next(503, 503) — детерминированно отдать эти статусы следующим запросам.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    status_5xx: int = 503
+    seed: Optional[int] = None
+    scripted: List[int] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def fail_next(self, *statuses: int) -> None:
+        with self._lock:
+            self.scripted.extend(statuses)
+
+    def delay(self) -> float:
+        with self._lock:
+            return self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def pick_status(self) -> Optional[int]:
+        with self._lock:
+            if self.scripted:
+                return self.scripted.pop(0)
+            roll = self._rng.random()
+            if roll < self.rate_429:
+                return 429
+            if roll < self.rate_429 + self.rate_5xx:
+                return self.status_5xx
+            return None
+
+
+class _SheetsHandler(_QuietHandler):
+    def do_GET(self):
+        server = self.server.owner
+        server.count_request()
+        url = urlsplit(self.path)
+        # /v4/spreadsheets/{id}/values/{range} и /v4/spreadsheets/{id}/values:batchGet
+        parts = url.path.split("/")
+        if len(parts) < 5 or parts[1] != "v4" or parts[2] != "spreadsheets":
+            self.send_error_json(404, "Not found")
+            return
+
+        delay = server.faults.delay()
+        if delay:
+            time.sleep(delay)
+        status = server.faults.pick_status()
+        if status is not None:
+            server.count_error(status)
+            self.send_error_json(status, "Injected failure")
+            return
+
+        server.log_request(url.path, url.query, self.headers)
+        spreadsheet_id = unquote(parts[3])
+        try:
+            if parts[4] == "values:batchGet":
+                ranges = parse_qs(url.query).get("ranges", [])
+                payload = {
+                    "spreadsheetId": spreadsheet_id,
+                    "valueRanges": [
+                        server.value_range(spreadsheet_id, range_name) for range_name in ranges
+                    ],
+                }
+            elif parts[4] == "values" and len(parts) >= 6:
+                range_name = unquote("/".join(parts[5:]))
+                payload = server.value_range(spreadsheet_id, range_name)
+            else:
+                self.send_error_json(404, "Not found")
+                return
+        except KeyError:
+            self.send_error_json(404, "Requested entity was not found.")
+            return
+        except ValueError as e:
+            self.send_error_json(400, str(e))
+            return
+        self.send_json(200, payload)
+
+    def send_error_json(self, status: int, message: str) -> None:
+        self.send_json(
+            status,
+            {
+                "error": {
+                    "code": status,
+                    "message": message,
+                    "status": GOOGLE_ERROR_STATUS.get(status, "INVALID_ARGUMENT"),
+                }
+            },
+        )
+
+
+class FakeSheetsServer(_BackgroundServer):
+    """Локальный Sheets API: values.get и values.batchGet.
+
+    sheets: spreadsheetId → values (лист с любым именем)
+    или spreadsheetId → {имя листа: values}.
+    Диапазон режется как в Google; faults подмешивает задержку, 429 и 5xx.
+    log_limit — сколько последних запросов держать в request_log (None — все).
+    """
+
+    handler_class = _SheetsHandler
+
+    def __init__(
+        self,
+        sheets: Dict[str, object],
+        faults: Optional[SheetsFaults] = None,
+        port: int = 0,
+        log_limit: Optional[int] = None,
+    ):
+        self.sheets = sheets
+        self.faults = faults or SheetsFaults()
+        self.errors_count: Dict[int, int] = {}
+        self.request_log: List[dict] = []  # path, query и заголовки каждого запроса
+        self.log_limit = log_limit
+        super().__init__(port=port)
+
+    @classmethod
+    def from_fixtures(cls, directory: str, **kwargs) -> "FakeSheetsServer":
+        """Каждый {spreadsheetId}.json в папке — values или {имя листа: values}."""
+        sheets = {}
+        for path in sorted(Path(directory).glob("*.json")):
+            with open(path, encoding="utf-8") as file:
+                sheets[path.stem] = json.load(file)
+        return cls(sheets, **kwargs)
+
+    def log_request(self, path: str, query: str, headers) -> None:
+        with self._lock:
+            self.request_log.append({
+                "path": unquote(path),
+                "query": parse_qs(query),
+                "headers": {key.lower(): value for key, value in headers.items()},
+            })
+            if self.log_limit is not None:
+                del self.request_log[:-self.log_limit]
+
+    def count_error(self, status: int) -> None:
+        with self._lock:
+            self.errors_count[status] = self.errors_count.get(status, 0) + 1
+
+    def value_range(self, spreadsheet_id: str, range_name: str) -> dict:
+        spreadsheet = self.sheets[spreadsheet_id]
+        sheet_name = parse_a1_range(range_name)[0]
+        if isinstance(spreadsheet, dict):
+            if sheet_name is None:
+                sheet_name = next(iter(spreadsheet))
+            values = spreadsheet[sheet_name]
+        else:
+            values = spreadsheet
+        return {
+            "range": range_name,
+            "majorDimension": "ROWS",
+            "values": clip_values(values, range_name),
+        }
+
+
+class _TelegramHandler(_QuietHandler):
+    def do_POST(self):
+        server = self.server.owner
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        message_id = server.count_request()
+        if server.latency:
+            time.sleep(server.latency)
+        self.send_json(200, {"ok": True, "result": {"message_id": message_id}})
+
+
+class FakeTelegramServer(_BackgroundServer):
+    """Bot API: на любой POST /bot{token}/{method} отвечает ok=true."""
+
+    handler_class = _TelegramHandler
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Локальный Sheets API из fixture-файлов")
+    parser.add_argument("--fixtures", required=True, help="папка с {spreadsheetId}.json")
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--latency", type=float, default=0.0, help="секунды на ответ")
+    parser.add_argument("--jitter", type=float, default=0.0, help="случайная добавка к задержке")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="доля ответов 429")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="доля ответов 5xx")
+    parser.add_argument("--status-5xx", type=int, default=503)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    faults = SheetsFaults(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        status_5xx=args.status_5xx,
+        seed=args.seed,
+    )
+    server = FakeSheetsServer.from_fixtures(args.fixtures, faults=faults, port=args.port)
+    print(f"Fake Sheets API: {server.url} ({', '.join(server.sheets)})")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Прогон записанного дня: ответы Sheets с диска, Telegram — фейковый.
+
+    python -m benchmarks.replay captures --output replay_new.json
+    python -m benchmarks.compare replay_old.json replay_new.json
+
+captures — папка SHEETS_CAPTURE['DIRECTORY'] с прода. Сценарии те же, что в
+run_benchmarks: разбор (обычный и потоковый), сборка таблиц, доставка. Формат
+JSON тот же, поэтому версии сравниваются через benchmarks.compare.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+from typing import Dict, List
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHTOKEN")
+os.environ.setdefault("GROUP_CHAT_ID", "-100")
+
+import src.config as config
+from src import rich_report
+from src.data_processor import DataProcessor, column_to_index
+from src.report_history import dated_columns
+from src.sheets_capture import load_captures
+
+from benchmarks.fake_servers import FakeTelegramServer
+from benchmarks.run_benchmarks import CHAT_ID, git_commit, measure, measure_delivery, summarize
+
+
+def sheet_shape(directory: str) -> Dict[str, int]:
+    """Сколько проектов и колонок дат в самом большом записанном ответе."""
+    values = max(
+        (capture.response.get("values", []) for capture in load_captures(directory)),
+        key=len,
+    )
+    structure = config.SHEET_SETTINGS["SECONDARY"]["STRUCTURE"]
+    data_start = column_to_index(structure["DATA_START_COLUMN"])
+    return {
+        "projects": max(len(values) - 1, 0),
+        "dates": len(dated_columns(values[0], data_start)) if values else 0,
+    }
+
+
+def run_replay(directory: str, iterations: int, telegram_latency: float, realtime: bool) -> List[dict]:
+    processor = DataProcessor.from_capture(directory, realtime=realtime)
+    params = sheet_shape(directory)
+    original_streaming = config.SHEETS_STREAMING
+    results = []
+    try:
+        config.SHEETS_STREAMING = False
+        report = processor.generate_secondary_report()
+        if not report.get("success"):
+            raise RuntimeError(f"Записанный отчёт не собрался: {report.get('error')}")
+
+        for name, streaming in (
+            ("generate_secondary_report", False),
+            ("generate_secondary_report_streaming", True),
+        ):
+            config.SHEETS_STREAMING = streaming
+            samples = measure(processor.generate_secondary_report, iterations)
+            results.append(summarize(name, samples, params["projects"], params))
+    finally:
+        config.SHEETS_STREAMING = original_streaming
+
+    grouped = rich_report.group_projects_by_chat(report["projects"], default_chat_id=CHAT_ID)
+    rows = [rich_report.project_to_row(item) for items in grouped.values() for item in items]
+    samples = measure(
+        lambda: rich_report.build_rich_report_messages(report["report_date"], rows),
+        iterations,
+    )
+    results.append(summarize("build_rich_report_messages", samples, len(rows), params))
+
+    with FakeTelegramServer(latency=telegram_latency) as telegram_server:
+        samples, sent = asyncio.run(
+            measure_delivery(processor, report, telegram_server, iterations)
+        )
+    delivery = summarize("deliver_secondary_report", samples, params["projects"], params)
+    delivery["messages_per_delivery"] = sent
+    results.append(delivery)
+    return results
+
+
+def main(argv=None) -> Dict[str, object]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", help="папка с записями SheetsRecorder")
+    parser.add_argument("--output", help="куда записать JSON (по умолчанию stdout)")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--telegram-latency", type=float, default=0.0, help="секунды на ответ Bot API")
+    parser.add_argument("--realtime", action="store_true", help="ждать, сколько в записи отвечал Google")
+    args = parser.parse_args(argv)
+
+    print(f"Воспроизведение {args.directory}...", file=sys.stderr)
+    results = run_replay(args.directory, args.iterations, args.telegram_latency, args.realtime)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "iterations": args.iterations,
+            "capture": os.path.abspath(args.directory),
+            "realtime": args.realtime,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
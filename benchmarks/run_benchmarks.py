@@ -0,0 +1,284 @@
+"""Бенчмарк отчёта: чтение листа, сборка таблиц и доставка на фейковых серверах.
+
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --full --output bench_full.json
+    python -m benchmarks.compare old.json new.json
+
+Результат — JSON с перцентилями задержки и пропускной способностью по сценариям.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHTOKEN")
+os.environ.setdefault("GROUP_CHAT_ID", "-100")
+
+import pytz
+
+import src.config as config
+from src import rich_report
+from src.anomalies import find_anomalies
+from src.data_processor import DataProcessor, index_to_column, parse_sheet_int
+from src.history_store import HistoryStore
+from src.report_history import dated_columns
+from src.sheet_matrix import parse_int_matrix
+from src.telegram_bot import TelegramBot
+
+from benchmarks.fake_servers import FakeSheetsServer, FakeTelegramServer
+from benchmarks.synthetic import HEADERS, make_sheet
+
+QUICK_PROJECTS = [10, 100, 1000]
+QUICK_DATES = [1, 30, 365]
+FULL_PROJECTS = [10, 100, 1000, 10000]
+FULL_DATES = [1, 30, 365, 730]
+
+SPREADSHEET_ID = "bench-sheet"
+BOT_TOKEN = "123456:BENCHTOKEN"
+CHAT_ID = -100
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Перцентиль с линейной интерполяцией между соседними значениями."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(name: str, samples: List[float], items: int, params: dict) -> dict:
+    """Сводка сценария: задержки в мс и throughput в элементах и вызовах в секунду."""
+    total = sum(samples)
+    return {
+        "scenario": name,
+        **params,
+        "iterations": len(samples),
+        "latency_ms": {
+            "min": min(samples) * 1000,
+            "p50": percentile(samples, 0.50) * 1000,
+            "p90": percentile(samples, 0.90) * 1000,
+            "p99": percentile(samples, 0.99) * 1000,
+            "max": max(samples) * 1000,
+            "mean": total / len(samples) * 1000,
+        },
+        "throughput": {
+            "calls_per_s": len(samples) / total if total else 0.0,
+            "items_per_s": items * len(samples) / total if total else 0.0,
+        },
+    }
+
+
+def measure(func: Callable[[], object], iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def peak_memory_kib(func: Callable[[], object]) -> float:
+    """Пик Python-аллокаций за один вызов, КиБ."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def make_bench_processor(sheets_url: str) -> DataProcessor:
+    """Настоящий DataProcessor, смотрит на фейковый Sheets без credentials."""
+    config.SHEETS_API_BASE_URL = sheets_url
+    config.CREDENTIALS_FILE = None
+    return DataProcessor()
+
+
+def configure_sheet(projects: int, dates: int) -> None:
+    """Диапазон листа под размер синтетики, чтобы не упираться в A1:ZZ227."""
+    settings = config.SHEET_SETTINGS['SECONDARY']
+    settings['SPREADSHEET_ID'] = SPREADSHEET_ID
+    last_column = index_to_column(len(HEADERS) + dates - 1)
+    settings['STRUCTURE']['RANGE'] = f"A1:{last_column}{projects + 1}"
+
+
+def run_case(projects: int, dates: int, iterations: int, telegram_latency: float) -> List[dict]:
+    today = datetime.now(pytz.timezone(config.REPORT_TIME['TIMEZONE'])).date()
+    sheet = make_sheet(projects, dates, today)
+    configure_sheet(projects, dates)
+    params = {"projects": projects, "dates": dates}
+    results = []
+
+    with FakeSheetsServer({SPREADSHEET_ID: sheet}) as sheets_server, FakeTelegramServer(
+        latency=telegram_latency
+    ) as telegram_server:
+        processor = make_bench_processor(sheets_server.url)
+        report = processor.generate_secondary_report()
+        if not report.get("success"):
+            raise RuntimeError(f"Синтетический отчёт не собрался: {report.get('error')}")
+
+        for name, streaming in (
+            ("generate_secondary_report", False),
+            ("generate_secondary_report_streaming", True),
+        ):
+            config.SHEETS_STREAMING = streaming
+            samples = measure(processor.generate_secondary_report, iterations)
+            summary = summarize(name, samples, projects, params)
+            summary["peak_memory_kib"] = peak_memory_kib(processor.generate_secondary_report)
+            results.append(summary)
+        config.SHEETS_STREAMING = False
+
+        project_rows = sheet[1:]
+        first_date = len(HEADERS)
+        cells = projects * dates
+        samples = measure(lambda: parse_int_matrix(project_rows, first_date, dates), iterations)
+        results.append(summarize("parse_int_matrix", samples, cells, params))
+        samples = measure(
+            lambda: [
+                [parse_sheet_int(row, first_date + offset) for offset in range(dates)]
+                for row in project_rows
+            ],
+            iterations,
+        )
+        results.append(summarize("parse_sheet_int_per_cell", samples, cells, params))
+
+        # аномалии по всей истории: dates − 1 прошлых дат против сегодняшней колонки
+        history_cells = [row[first_date:first_date + dates - 1] for row in project_rows]
+        anomaly_projects = [
+            {"name": row[0], "today_data": parse_sheet_int(row, first_date + dates - 1)}
+            for row in project_rows
+        ]
+        samples = measure(
+            lambda: find_anomalies(anomaly_projects, history_cells, config.ANOMALIES),
+            iterations,
+        )
+        results.append(summarize("find_anomalies", samples, cells, params))
+
+        # холодный старт истории: отобразить сохранённую матрицу вместо скачивания и разбора
+        with tempfile.TemporaryDirectory() as directory:
+            store = HistoryStore(directory)
+            matrix, _ = parse_int_matrix(project_rows, first_date, dates)
+            store.save(
+                [row[0] for row in project_rows],
+                [header_date for header_date, _ in dated_columns(sheet[0], first_date)],
+                matrix.T,
+            )
+            samples = measure(store.load, iterations)
+            results.append(summarize("history_store_load", samples, cells, params))
+
+        grouped = rich_report.group_projects_by_chat(report["projects"], default_chat_id=CHAT_ID)
+        rows = [rich_report.project_to_row(item) for item in grouped.get(CHAT_ID, [])]
+        samples = measure(
+            lambda: rich_report.build_rich_report_messages(report["report_date"], rows),
+            iterations,
+        )
+        results.append(summarize("build_rich_report_messages", samples, len(rows), params))
+
+        disable_rows = rich_report.disable_projects_to_rows(report["projects_to_disable"])
+        samples = measure(lambda: rich_report.build_disable_warning_messages(disable_rows), iterations)
+        results.append(summarize("build_disable_warning_messages", samples, len(disable_rows), params))
+
+        reduce_rows = rich_report.reduce_projects_to_rows(report["projects_to_reduce"])
+        samples = measure(lambda: rich_report.build_reduce_warning_messages(reduce_rows), iterations)
+        results.append(summarize("build_reduce_warning_messages", samples, len(reduce_rows), params))
+
+        samples, sent = asyncio.run(
+            measure_delivery(processor, report, telegram_server, iterations)
+        )
+        delivery = summarize("deliver_secondary_report", samples, projects, params)
+        delivery["messages_per_delivery"] = sent
+        results.append(delivery)
+
+    return results
+
+
+async def measure_delivery(processor, report, telegram_server, iterations):
+    """Полная rich-доставка: to_thread + requests.post в фейковый Telegram."""
+    original_url = rich_report.TELEGRAM_API_URL
+    original_format = config.REPORTS_MESSAGE_FORMAT
+    rich_report.TELEGRAM_API_URL = telegram_server.url
+    config.REPORTS_MESSAGE_FORMAT = "rich"
+    bot = TelegramBot(BOT_TOKEN, processor)
+    samples = []
+    try:
+        before = telegram_server.requests_count
+        for _ in range(iterations):
+            started = time.perf_counter()
+            await bot.deliver_secondary_report(chat_id=CHAT_ID, result=report)
+            samples.append(time.perf_counter() - started)
+        sent = (telegram_server.requests_count - before) // max(iterations, 1)
+    finally:
+        rich_report.TELEGRAM_API_URL = original_url
+        config.REPORTS_MESSAGE_FORMAT = original_format
+        await bot.bot.session.close()
+    return samples, sent
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def parse_sizes(text: str) -> List[int]:
+    return [int(part) for part in text.split(",") if part.strip()]
+
+
+def main(argv=None) -> Dict[str, object]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="куда записать JSON (по умолчанию stdout)")
+    parser.add_argument("--full", action="store_true", help="10..10000 проектов × 1..730 дат")
+    parser.add_argument("--projects", type=parse_sizes, help="например 10,100,1000")
+    parser.add_argument("--dates", type=parse_sizes, help="например 1,30,365")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--telegram-latency", type=float, default=0.0, help="секунды на ответ Bot API")
+    args = parser.parse_args(argv)
+
+    project_sizes = args.projects or (FULL_PROJECTS if args.full else QUICK_PROJECTS)
+    date_sizes = args.dates or (FULL_DATES if args.full else QUICK_DATES)
+
+    results = []
+    for projects in project_sizes:
+        for dates in date_sizes:
+            print(f"{projects} проектов × {dates} дат...", file=sys.stderr)
+            results.extend(run_case(projects, dates, args.iterations, args.telegram_latency))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Soak-тест памяти: тысячи отчётов подряд на фейковых серверах, память должна стоять.
+
+    python -m benchmarks.soak --reports 10000 --output soak.json
+
+Один процесс собирает и доставляет отчёт снова и снова, как бот за недели работы.
+После прогрева (--warmup) — точка отсчёта, дальше раз в --sample-every отчётов
+замер после gc: RSS и число объектов под gc. Выросло больше --max-rss-growth-mib
+или --max-object-growth — тест не прошёл, код возврата 1. С --tracemalloc в JSON
+ещё строки кода, которые выросли сильнее всего (прогон заметно медленнее).
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHTOKEN")
+os.environ.setdefault("GROUP_CHAT_ID", "-100")
+
+import pytz
+
+import src.config as config
+from src import rich_report
+from src.memory_guard import MIB, rss_bytes, top_growth
+from src.telegram_bot import TelegramBot
+
+from benchmarks.fake_servers import FakeSheetsServer, FakeTelegramServer
+from benchmarks.run_benchmarks import (
+    BOT_TOKEN,
+    CHAT_ID,
+    SPREADSHEET_ID,
+    configure_sheet,
+    git_commit,
+    make_bench_processor,
+)
+from benchmarks.synthetic import make_sheet
+
+
+def snapshot():
+    gc.collect()
+    return tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__),)
+    )
+
+
+def measure_memory(reports: int) -> dict:
+    """Замер после gc: RSS, объекты под gc и, если включён, tracemalloc."""
+    gc.collect()
+    rss = rss_bytes()
+    sample = {
+        "reports": reports,
+        "rss_mib": round(rss / MIB, 1) if rss is not None else None,
+        "gc_objects": len(gc.get_objects()),
+    }
+    if tracemalloc.is_tracing():
+        sample["traced_kib"] = round(tracemalloc.get_traced_memory()[0] / 1024, 1)
+    return sample
+
+
+async def soak(processor, reports: int, warmup: int, sample_every: int, trace: bool) -> Dict[str, object]:
+    """warmup + reports отчётов подряд: generate_secondary_report и rich-доставка в один чат."""
+    bot = TelegramBot(BOT_TOKEN, processor)
+    samples: List[dict] = []
+    baseline = final = None
+    started = time.perf_counter()
+    try:
+        for number in range(1, warmup + reports + 1):
+            result = processor.generate_secondary_report()
+            if not await bot.deliver_secondary_report(chat_id=CHAT_ID, result=result):
+                raise RuntimeError(f"Отчёт {number} не доставлен: {result.get('error')}")
+            if number == warmup:
+                if trace:
+                    # только после прогрева: под tracemalloc отчёт в разы медленнее
+                    tracemalloc.start()
+                    baseline = snapshot()
+                samples.append(measure_memory(0))
+            elif number > warmup and (number - warmup) % sample_every == 0:
+                samples.append(measure_memory(number - warmup))
+        if trace:
+            final = snapshot()
+    finally:
+        tracemalloc.stop()
+        await bot.bot.session.close()
+    return {
+        "samples": samples,
+        "elapsed_s": round(time.perf_counter() - started, 1),
+        "baseline": baseline,
+        "final": final,
+    }
+
+
+def growth(samples: List[dict]) -> Dict[str, float]:
+    """Насколько выросло от замера после прогрева до последнего."""
+    first, last = samples[0], samples[-1]
+    result = {"gc_objects": last["gc_objects"] - first["gc_objects"]}
+    if first["rss_mib"] is not None:
+        result["rss_mib"] = round(last["rss_mib"] - first["rss_mib"], 1)
+    if "traced_kib" in last:
+        result["traced_kib"] = round(last["traced_kib"], 1)
+    return result
+
+
+def main(argv=None) -> Dict[str, object]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="куда записать JSON (по умолчанию stdout)")
+    parser.add_argument("--reports", type=int, default=10000)
+    parser.add_argument("--warmup", type=int, default=200, help="отчётов до точки отсчёта")
+    parser.add_argument("--sample-every", type=int, help="по умолчанию reports / 20")
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--dates", type=int, default=30)
+    parser.add_argument("--max-rss-growth-mib", type=float, default=32.0)
+    parser.add_argument("--max-object-growth", type=int, default=2000, help="объектов под gc")
+    parser.add_argument("--tracemalloc", action="store_true", help="ещё и какие строки выросли")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+    warmup = max(1, args.warmup)
+    sample_every = args.sample_every or max(1, args.reports // 20)
+
+    today = datetime.now(pytz.timezone(config.REPORT_TIME['TIMEZONE'])).date()
+    sheet = make_sheet(args.projects, args.dates, today)
+    configure_sheet(args.projects, args.dates)
+    original_url = rich_report.TELEGRAM_API_URL
+    original_format = config.REPORTS_MESSAGE_FORMAT
+    config.REPORTS_MESSAGE_FORMAT = "rich"
+    print(f"{args.reports} отчётов, {args.projects} проектов × {args.dates} дат...", file=sys.stderr)
+
+    try:
+        with FakeSheetsServer(
+            {SPREADSHEET_ID: sheet}, log_limit=100
+        ) as sheets_server, FakeTelegramServer() as telegram_server:
+            rich_report.TELEGRAM_API_URL = telegram_server.url
+            processor = make_bench_processor(sheets_server.url)
+            run = asyncio.run(
+                soak(processor, args.reports, warmup, sample_every, args.tracemalloc)
+            )
+    finally:
+        rich_report.TELEGRAM_API_URL = original_url
+        config.REPORTS_MESSAGE_FORMAT = original_format
+
+    grown = growth(run["samples"])
+    flat = (
+        grown["gc_objects"] <= args.max_object_growth
+        and grown.get("rss_mib", 0.0) <= args.max_rss_growth_mib
+    )
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "reports": args.reports,
+            "warmup": warmup,
+            "projects": args.projects,
+            "dates": args.dates,
+            "elapsed_s": run["elapsed_s"],
+        },
+        "growth": grown,
+        "limits": {"rss_mib": args.max_rss_growth_mib, "gc_objects": args.max_object_growth},
+        "flat": flat,
+        "samples": run["samples"],
+    }
+    if args.tracemalloc:
+        report["top_growth"] = top_growth(run["baseline"], run["final"], args.top)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main()["flat"] else 1)
@@ -0,0 +1,98 @@
+"""Синтетический лист «[учет данных]» для бенчмарков.
+
+Структура как у настоящего: A — проект, B — статус, C — объём, D — пусто,
+E — остаток, F — выдано, с G — колонки по датам, последняя — сегодня.
+
+Fixture для benchmarks.fake_servers:
+    python -m benchmarks.synthetic --projects 200 --dates 365 --output fixtures/sheet.json
+"""
+
+import argparse
+import json
+import random
+from datetime import date, datetime, timedelta
+from typing import List
+
+HEADERS = ["Проект", "Статус", "Объем", "D", "Остаток", "Выдано"]
+
+WORDS = [
+    "Альфа", "Бета", "Гамма", "Дельта", "Ёлка", "Жук", "Заря", "Искра",
+    "Кедр", "Лотос", "Мост", "Норд", "Омега", "Полюс", "Ромашка", "Север",
+    "Тайга", "Урал", "Феникс", "Хвоя", "Цапля", "Чайка", "Шторм", "Щука",
+    "Эхо", "Юг", "Якорь",
+]
+
+# Символы, которые escape_rich_table_cell обязан экранировать
+SPECIAL_CHARACTERS = ["|", "_", "*", "`", "\\", "[", "]", "<", ">", "$", "#", "\n"]
+
+
+def make_project_name(index: int, rng: random.Random) -> str:
+    """Кириллическое имя с кодом [LRn]; примерно каждое пятое — со спецсимволами."""
+    words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+    name = f"[LR{index}] {words}"
+    if rng.random() < 0.2:
+        name += f" {rng.choice(SPECIAL_CHARACTERS)} {rng.choice(WORDS).lower()}"
+    return name
+
+
+def make_cell(rng: random.Random) -> str:
+    """Ячейка за день: обычно число, иногда пусто, NBSP-разделитель или мусор."""
+    roll = rng.random()
+    if roll < 0.15:
+        return ""
+    if roll < 0.2:
+        return rng.choice(["—", "н/д", "#REF!"])
+    value = rng.randint(0, 2500)
+    if value >= 1000 and roll < 0.4:
+        return f"{value // 1000}\xa0{value % 1000:03d}"
+    return str(value)
+
+
+def make_date_headers(dates: int, today: date) -> List[str]:
+    """Заголовки дат dd.mm.yy; последняя колонка — today."""
+    first = today - timedelta(days=dates - 1)
+    return [(first + timedelta(days=offset)).strftime("%d.%m.%y") for offset in range(dates)]
+
+
+def make_sheet(projects: int, dates: int, today: date, seed: int = 0) -> List[List[str]]:
+    """Собирает values как их отдаёт Sheets API: строки разной длины, всё строками."""
+    rng = random.Random(seed)
+    rows = [HEADERS + make_date_headers(dates, today)]
+    for index in range(1, projects + 1):
+        volume = rng.choice([1000, 5000, 10000, 50000])
+        issued = rng.randint(0, volume + 200)
+        remaining = volume - issued
+        row = [
+            make_project_name(index, rng),
+            "TRUE" if rng.random() < 0.9 else "FALSE",
+            str(volume),
+            "",
+            str(remaining),
+            str(issued),
+        ]
+        row.extend(make_cell(rng) for _ in range(dates))
+        # Sheets обрезает пустой хвост строки
+        while row and row[-1] == "":
+            row.pop()
+        rows.append(row)
+    return rows
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Синтетический лист в JSON-fixture")
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--dates", type=int, default=365)
+    parser.add_argument("--today", help="дд.мм.гггг, по умолчанию сегодня")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sheet-name", default="[учет данных] 2025")
+    parser.add_argument("--output", required=True, help="путь к {spreadsheetId}.json")
+    args = parser.parse_args(argv)
+
+    today = datetime.strptime(args.today, "%d.%m.%Y").date() if args.today else date.today()
+    rows = make_sheet(args.projects, args.dates, today, seed=args.seed)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump({args.sheet_name: rows}, file, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
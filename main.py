@@ -1,13 +1,10 @@
-import asyncio
 import logging
 from src.telegram_bot import TelegramBot
 from src.data_processor import DataProcessor
 from src import config
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from src import loop_health
+from src.logging_setup import setup_logging_from_config
+from src.tracing import configure_tracing_from_config
 
 async def main():
     data_processor = DataProcessor()
@@ -19,4 +16,6 @@ async def main():
         logging.error(f"Error running bot: {e}")
 
 if __name__ == '__main__':
-    asyncio.run(main()) 
\ No newline at end of file
+    setup_logging_from_config(config.LOGGING, config.LOGGING['BOT_FILE'])
+    configure_tracing_from_config(config.TRACING, config.TRACING['BOT_FILE'])
+    loop_health.run(main(), config.LOOP_HEALTH) 
\ No newline at end of file
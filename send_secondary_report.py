@@ -2,33 +2,35 @@
 
 Запускается из cron каждый день в 13:40 по Москве.
 Бот при этом остаётся запущенным: /secondary и кнопка работают в любой момент.
+С --range 01.10-15.10 отправляет отчёт за период вместо отчёта за сегодня.
 """
 
+import argparse
 import asyncio
 import logging
+from datetime import datetime
+
+import pytz
 
 from src.data_processor import DataProcessor
+from src.report_history import parse_date_range
 from src.telegram_bot import TelegramBot
 from src import config
+from src.logging_setup import log_stage, setup_logging_from_config
+from src import tracing
+from src.config_reload import ConfigReloader
 
 logger = logging.getLogger(__name__)
 
 
 def setup_logging():
-    """Пишем в файл, потому что cron обычно глушит stdout/stderr."""
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler("send_secondary_report.log", encoding="utf-8"),
-            logging.StreamHandler(),
-        ],
-        force=True,
-    )
-
-
-async def send_report(data_processor=None, bot=None):
-    """Собирает отчёт и отправляет его в GROUP_CHAT_ID."""
+    """Пишем в файл, потому что cron обычно глушит stdout/stderr. Трассы — в свой JSONL."""
+    setup_logging_from_config(config.LOGGING, config.LOGGING['CRON_FILE'])
+    tracing.configure_tracing_from_config(config.TRACING, config.TRACING['CRON_FILE'])
+
+
+async def send_report(data_processor=None, bot=None, date_range=None):
+    """Собирает отчёт и отправляет его в GROUP_CHAT_ID. date_range — (с, по) для отчёта за период."""
     close_bot = False
     if data_processor is None:
         data_processor = DataProcessor()
@@ -39,22 +41,56 @@ async def send_report(data_processor=None, bot=None):
     try:
         if config.GROUP_CHAT_ID is None:
             raise RuntimeError("GROUP_CHAT_ID не задан в .env")
-        result = data_processor.generate_secondary_report()
-        logger.info("Отчёт собран, success=%s", result.get("success"))
-        await bot.deliver_secondary_report(
-            chat_id=config.GROUP_CHAT_ID,
-            result=result,
-            notify_empty=False,
-        )
-        logger.info("Отчёт отправлен в чат %s", config.GROUP_CHAT_ID)
+        chat_id = config.GROUP_CHAT_ID
+        with tracing.trace("send_report", chat_id=chat_id, period=date_range is not None):
+            if date_range is not None:
+                with log_stage(logger, "generate_range_report", chat_id=chat_id):
+                    result = data_processor.generate_range_report(*date_range)
+                logger.info("Отчёт за период собран, success=%s", result.get("success"))
+                with log_stage(logger, "deliver_range_report", chat_id=chat_id):
+                    await bot.deliver_range_report(
+                        chat_id=chat_id,
+                        result=result,
+                        notify_empty=False,
+                    )
+                logger.info("Отчёт за период отправлен в чат %s", config.GROUP_CHAT_ID)
+                return
+            with log_stage(logger, "generate_secondary_report", chat_id=chat_id):
+                result = data_processor.generate_secondary_report()
+            logger.info("Отчёт собран, success=%s", result.get("success"))
+            with log_stage(logger, "deliver_secondary_report", chat_id=chat_id):
+                await bot.deliver_secondary_report(
+                    chat_id=chat_id,
+                    result=result,
+                    notify_empty=False,
+                )
+            logger.info("Отчёт отправлен в чат %s", config.GROUP_CHAT_ID)
+            if bot.last_delivery_summary is not None:
+                logger.info("Сводка рассылки по чатам: %s", bot.last_delivery_summary)
     finally:
         if close_bot:
             await bot.bot.session.close()
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Отправка отчёта в GROUP_CHAT_ID")
+    parser.add_argument("--range", dest="date_range", help="период вида 01.10-15.10")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    date_range = None
+    if args.date_range:
+        today = datetime.now(pytz.timezone(config.REPORT_TIME['TIMEZONE'])).date()
+        try:
+            date_range = parse_date_range(args.date_range, today)
+        except ValueError as e:
+            raise SystemExit(f"--range: {e}")
     setup_logging()
-    asyncio.run(send_report())
+    if config.CONFIG_RELOAD['ENABLED']:
+        ConfigReloader(config.CONFIG_RELOAD['FILE']).check()
+    asyncio.run(send_report(date_range=date_range))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+"""Аномалии дневных поступлений: провал в ноль или всплеск относительно обычного.
+
+«Обычное» для проекта — медиана его последних дат, разброс — MAD (медиана
+отклонений от медианы). Устойчивый z = 0.6745 · (день − медиана) / MAD
+(Iglewicz–Hoaglin); |z| больше порога — аномалия. Считается сразу для всех
+проектов одной матрицей NumPy: 500 проектов × 365 дат — единицы миллисекунд.
+
+Отчёт уходит днём, и «сегодня» в нём — неполный день: против медианы полных
+дней почти каждый проект выглядел бы провалом. Поэтому по умолчанию
+(ANOMALIES['DAY'] = 'yesterday') проверяется последний полный день — вчера.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.sheet_matrix import parse_int_matrix
+
+# Для нормального распределения MAD ≈ 0.6745 σ
+MAD_SCALE = 0.6745
+
+
+def history_matrix(history_cells: Sequence[list]) -> np.ndarray:
+    """Сырые ячейки дат по проектам → float-матрица; пусто и мусор — NaN."""
+    values, mask = parse_int_matrix(history_cells)
+    history = values.astype(np.float64)
+    history[~mask] = np.nan
+    return history
+
+
+def _row_medians(rows: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Медиана каждой строки без NaN: сортировка кладёт NaN в конец, дальше — индексы.
+
+    В разы быстрее np.nanmedian по строкам.
+    """
+    ordered = np.sort(rows, axis=1)
+    index = np.arange(len(rows))
+    return (ordered[index, (counts - 1) // 2] + ordered[index, counts // 2]) / 2
+
+
+def robust_z_scores(
+    history: np.ndarray,
+    today: np.ndarray,
+    min_days: int,
+    min_mad: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(z, медиана) по проектам. Меньше min_days чисел в истории — NaN.
+
+    min_mad — нижняя граница разброса: у ровного ряда MAD = 0, и любое отличие
+    дало бы бесконечный z.
+    """
+    scores = np.full(len(today), np.nan)
+    medians = np.full(len(today), np.nan)
+    if history.size == 0:
+        return scores, medians
+    counts = np.count_nonzero(~np.isnan(history), axis=1)
+    enough = counts >= max(min_days, 1)
+    if not enough.any():
+        return scores, medians
+    rows, counts = history[enough], counts[enough]
+    median = _row_medians(rows, counts)
+    mad = _row_medians(np.abs(rows - median[:, None]), counts)
+    scores[enough] = MAD_SCALE * (today[enough] - median) / np.maximum(mad, min_mad)
+    medians[enough] = median
+    return scores, medians
+
+
+def day_label(day, today) -> str:
+    """Подпись проверяемого дня в таблице и тексте: «Сегодня» или «Вчера»."""
+    return 'Сегодня' if day is None or day == today else 'Вчера'
+
+
+def find_anomalies(
+    projects: List[dict],
+    history_cells: Sequence[list],
+    settings: dict,
+    values: Optional[Sequence[int]] = None,
+) -> List[dict]:
+    """Проекты, чей проверяемый день выбивается из истории; сильнейшие отклонения первыми.
+
+    history_cells[i] — ячейки дат до проверяемого дня для projects[i], старые слева.
+    values[i] — число за проверяемый день; None — project['today_data'].
+    """
+    if not projects:
+        return []
+    if values is None:
+        values = [project['today_data'] for project in projects]
+    history = history_matrix(history_cells)
+    day = np.array(values, dtype=np.float64)
+    scores, medians = robust_z_scores(history, day, settings['MIN_DAYS'], settings['MIN_MAD'])
+    flagged = np.flatnonzero(np.abs(np.nan_to_num(scores)) > settings['THRESHOLD'])
+    flagged = flagged[np.argsort(-np.abs(scores[flagged]), kind='stable')]
+    anomalies = []
+    for index in flagged.tolist():
+        project = projects[index]
+        anomalies.append({
+            'name': project['name'],
+            'value': int(values[index]),
+            'median': round(float(medians[index]), 1),
+            'score': round(float(scores[index]), 1),
+        })
+    return anomalies
@@ -0,0 +1,66 @@
+"""Куда слать проект: индекс «имя проекта → chat_id клиента».
+
+Источник — колонка CHAT_ID_COLUMN основного листа или отдельная вкладка
+«проект | chat_id». Индекс пересобирается, только когда данные маршрутизации
+изменились; на обычном отчёте это один хэш и проход по проектам.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def parse_chat_id(value) -> Optional[int]:
+    """chat_id из ячейки: '-100123', ' -100 123 '. Пусто или мусор → None (общий чат)."""
+    if value is None:
+        return None
+    text = str(value).replace('\xa0', '').replace(' ', '').strip()
+    if text == '':
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        return None
+
+
+class ChatRoutingIndex:
+    """Кэш маршрутов: пары (проект, chat_id) → словарь, пока пары не поменялись."""
+
+    def __init__(self):
+        self.digest = None
+        self.chat_by_project: Dict[str, int] = {}
+        self.rebuilds = 0
+
+    def update(self, pairs: Iterable[Tuple[str, object]]) -> bool:
+        """Обновляет индекс по сырым парам из листа. True — индекс пересобран."""
+        pairs = tuple((str(name).strip(), chat) for name, chat in pairs if name)
+        digest = hash(pairs)
+        if digest == self.digest:
+            return False
+
+        chat_by_project = {}
+        for name, raw_chat in pairs:
+            chat_id = parse_chat_id(raw_chat)
+            if chat_id is None:
+                if raw_chat not in (None, ''):
+                    logger.warning(f"Проект {name}: не похоже на chat_id: {raw_chat!r}, шлём в общий чат")
+                continue
+            chat_by_project[name] = chat_id
+        self.chat_by_project = chat_by_project
+        self.digest = digest
+        self.rebuilds += 1
+        return True
+
+    def chat_for(self, name: str) -> Optional[int]:
+        return self.chat_by_project.get(str(name).strip())
+
+    def route(self, projects: List[dict]) -> List[dict]:
+        """Проставляет telegram_chat_id проектам из индекса; без маршрута — ключа нет."""
+        for project in projects:
+            chat_id = self.chat_for(project['name'])
+            if chat_id is None:
+                project.pop('telegram_chat_id', None)
+            else:
+                project['telegram_chat_id'] = chat_id
+        return projects
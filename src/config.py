@@ -23,6 +23,118 @@ GROUP_CHAT_ID = parse_optional_int(os.getenv("GROUP_CHAT_ID"))
 SECONDARY_SPREADSHEET_ID = os.getenv("SECONDARY_SPREADSHEET_ID")
 CREDENTIALS_FILE = os.getenv("CREDENTIALS_FILE")
 
+# Адрес Sheets API. Пусто — настоящий Google.
+# Для офлайн-прогонов: http://127.0.0.1:8085 (python -m benchmarks.fake_servers).
+# Если при этом CREDENTIALS_FILE не задан, ходим без авторизации.
+SHEETS_API_BASE_URL = os.getenv("SHEETS_API_BASE_URL") or None
+
+# Потоковое чтение листа: строки разбираются по мере прихода HTTP-ответа,
+# от каждой остаются только нужные отчёту ячейки. Память не растёт с числом колонок дат,
+# но нет снимка для отчёта «по старым данным», если Google не ответил.
+SHEETS_STREAMING = False
+
+# Клиент Sheets: у каждого потока своё соединение, можно читать несколько диапазонов сразу.
+# MAX_PARALLEL — сколько запросов values_get_many держит одновременно; TIMEOUT — секунды на ответ.
+SHEETS_TRANSPORT = {
+    'MAX_PARALLEL': 4,
+    'TIMEOUT': 30,
+}
+
+# Повторы чтения листа при 429/5xx/сетевых сбоях: задержка растёт x2 со случайным jitter
+SHEETS_RETRY = {
+    'MAX_ATTEMPTS': 4,
+    'BASE_DELAY': 0.5,   # секунды
+    'MAX_DELAY': 8.0,
+}
+
+# После FAILURE_THRESHOLD неудачных чтений подряд не ходим в Google RESET_TIMEOUT секунд
+# и отдаём последний удачный снимок листа с пометкой «данные устарели»
+SHEETS_CIRCUIT_BREAKER = {
+    'FAILURE_THRESHOLD': 3,
+    'RESET_TIMEOUT': 60,
+}
+
+# Логи бота и cron: пишет отдельный поток, файл ротируется по размеру.
+# JSON — по строке JSON на запись, с chat_id и временем этапов (stage, duration_ms).
+# BOT_FILE — файл для main.py; None — только консоль (journald у systemd-службы).
+LOGGING = {
+    'LEVEL': 'INFO',
+    'JSON': False,
+    'MAX_BYTES': 10 * 1024 * 1024,
+    'BACKUP_COUNT': 5,
+    'BOT_FILE': None,
+    'CRON_FILE': 'send_secondary_report.log',
+}
+
+# Запись ответов Sheets values.get с временем ответа в DIRECTORY (src/sheets_capture.py).
+# Записанный день прогоняется офлайн: python -m benchmarks.replay captures --output replay.json
+SHEETS_CAPTURE = {
+    'RECORD': False,
+    'DIRECTORY': 'captures',
+}
+
+# Наблюдатель тарифов в боте (src/tariff_watcher.py): раз в INTERVAL секунд читает только
+# колонки имени, статуса, остатка и сегодняшней даты и сразу шлёт предупреждение по проектам,
+# которые с прошлого опроса исчерпали тариф или ушли в «остаток меньше чем на день».
+# Первый опрос после запуска бота — точка отсчёта, без сообщений. CHAT_ID None — GROUP_CHAT_ID.
+TARIFF_WATCHER = {
+    'ENABLED': False,
+    'INTERVAL': 300,
+    'CHAT_ID': None,
+}
+
+# Event loop бота (src/loop_health.py). UVLOOP — запускать на uvloop, если он установлен
+# (pip install uvloop). DEBUG — режим отладки asyncio: колбэки дольше SLOW_CALLBACK секунд
+# попадают в лог. Задержка цикла меряется раз в SAMPLE_INTERVAL, последние SAMPLES замеров —
+# в /traces и раз в LOG_INTERVAL секунд в лог. Цикл стоит дольше BLOCK_THRESHOLD — в лог стек.
+# ENABLED — сэмплер и сторожевой поток; UVLOOP и DEBUG работают и без него.
+LOOP_HEALTH = {
+    'ENABLED': False,
+    'UVLOOP': False,
+    'DEBUG': False,
+    'SLOW_CALLBACK': 0.1,
+    'SAMPLE_INTERVAL': 0.5,
+    'BLOCK_THRESHOLD': 1.0,
+    'SAMPLES': 1200,
+    'LOG_INTERVAL': 300,
+}
+
+# Память бота (src/memory_guard.py): раз в INTERVAL секунд RSS сверяется с RSS_BUDGET_MB
+# (None — без бюджета); превышение — одно предупреждение в ADMIN_CHAT_ID, до возврата под бюджет.
+# RSS берётся из /proc: на системах без него бюджет не проверяется.
+# TRACEMALLOC — ещё и снимки аллокаций: TOP строк, выросших с прошлой проверки, пишутся в лог.
+# tracemalloc замедляет Python, поэтому по умолчанию выключен; TRACEMALLOC_FRAMES — глубина стека.
+MEMORY_GUARD = {
+    'ENABLED': False,
+    'INTERVAL': 600,
+    'RSS_BUDGET_MB': 512,
+    'TRACEMALLOC': False,
+    'TRACEMALLOC_FRAMES': 1,
+    'TOP': 10,
+}
+
+# Настройки на лету (src/config_reload.py): FILE — JSON с переопределениями REPORTS_MESSAGE_FORMAT,
+# SHEET_SETTINGS, REPORT_DELTAS, ANOMALIES и DELIVERY_QUEUE поверх этого файла. Бот проверяет его
+# раз в INTERVAL секунд и подменяет настройки без перезапуска; cron читает его при старте.
+CONFIG_RELOAD = {
+    'ENABLED': False,
+    'FILE': 'config_overrides.json',
+    'INTERVAL': 5,
+}
+
+# Трассировка отчёта (src/tracing.py): сколько заняли Google, разбор, сборка таблиц и каждая отправка.
+# RING_SIZE этапов держит в памяти бот — их показывает /traces (только ADMIN_CHAT_ID).
+# *_FILE — JSONL по строке на этап; None — без файла.
+TRACING = {
+    'ENABLED': True,
+    'RING_SIZE': 2000,
+    'BOT_FILE': None,
+    'CRON_FILE': 'send_secondary_report.traces.jsonl',
+    'MAX_BYTES': 10 * 1024 * 1024,
+    'BACKUP_COUNT': 2,
+    'SHOW_TRACES': 3,  # сколько последних трасс в /traces без аргумента
+}
+
 # Минимальная структура для формата даты, используемого во втором отчете
 SHEET_STRUCTURE = {
     'DATE_FORMAT_OUT': '%d.%m.%Y'
@@ -42,6 +154,106 @@ REPORT_TIME = {
 # Допустимые значения: legacy | rich
 REPORTS_MESSAGE_FORMAT = "rich"
 
+# Живой отчёт (только rich): в каждом чате одно закреплённое сообщение,
+# которое бот правит на месте вместо новых таблиц на каждый /secondary и cron.
+# MIN_EDIT_INTERVAL — не чаще одной правки в чат за столько секунд (в группах Telegram
+# пускает ~20 правок в минуту); правки внутри окна сливаются в одну.
+# STATE_FILE — message_id закрепов, общий для бота и cron; перечитывается перед каждой правкой.
+LIVE_DASHBOARD = {
+    'ENABLED': False,
+    'MIN_EDIT_INTERVAL': 3,
+    'STATE_FILE': 'live_dashboard.json',
+}
+
+# Частота /secondary и кнопки «📊 Отчет» (src/throttling.py): не больше USER_LIMIT запросов
+# от одного человека и CHAT_LIMIT в одном чате за WINDOW секунд. Сверх лимита Google не
+# трогаем: SERVE_LAST — прислать в чат его таблицы из последнего собранного сегодня отчёта
+# (без предупреждений и чужих чатов), иначе короткий ответ.
+REPORT_THROTTLING = {
+    'ENABLED': False,
+    'WINDOW': 60,
+    'USER_LIMIT': 2,
+    'CHAT_LIMIT': 3,
+    'SERVE_LAST': False,
+}
+
+# Очередь доставки отчёта (src/delivery_queue.py): по всем чатам сначала «тарифы исчерпаны»,
+# потом «остаток меньше чем на день», потом основной отчёт, последними аномалии.
+# PER_CHAT_ORDER: 'fifo' — внутри чата как раньше (отчёт, потом предупреждения), но чаты
+# со срочным обслуживаются первыми; 'priority' — предупреждения раньше отчёта своего чата.
+# Рассылка пулом процессов (SHARDED_DELIVERY) — один элемент очереди со своим ключом, поэтому
+# «тарифы исчерпаны» и «остаток меньше чем на день» уходят до неё в обоих режимах.
+DELIVERY_QUEUE = {
+    'PER_CHAT_ORDER': 'fifo',
+}
+
+# Постраничный отчёт (src/report_pages.py): отчёт, который не влез в одно сообщение, уходит
+# одним сообщением с кнопками ◀/▶ вместо нескольких. Страницы держатся в LRU на CACHE_PAGES
+# страниц; DIRECTORY — копия на диске, чтобы бот листал и отчёт, отправленный cron.
+# DISK_REPORTS — сколько отчётов (файл на чат) держать там, старые удаляются.
+PAGINATED_REPORT = {
+    'ENABLED': False,
+    'CACHE_PAGES': 500,
+    'DIRECTORY': 'report_pages',
+    'DISK_REPORTS': 200,
+}
+
+# Рассылка по чатам клиентов пулом процессов (только rich, без живого отчёта).
+# Включается, когда чатов не меньше MIN_CHATS: на меньшем числе запуск процессов дороже.
+# RATE_PER_SECOND — общий темп на все процессы (Bot API пускает ~30 сообщений в секунду).
+SHARDED_DELIVERY = {
+    'ENABLED': False,
+    'WORKERS': 4,
+    'RATE_PER_SECOND': 25,
+    'MIN_CHATS': 50,
+}
+
+# /project и inline-поиск отвечают по последнему разобранному отчёту.
+# MAX_AGE — через сколько секунд перечитать лист; INLINE_CACHE_TIME — сколько секунд
+# Telegram сам отдаёт из кэша одинаковые inline-запросы, не спрашивая бота.
+PROJECT_LOOKUP = {
+    'MAX_AGE': 300,
+    'INLINE_CACHE_TIME': 300,
+    'MAX_RESULTS': 10,
+}
+
+# Отчёт за период (/secondary 01.10-15.10): снимок листа моложе SNAPSHOT_MAX_AGE секунд
+# переиспользуется вместе с накопленными суммами, следующие периоды считаются без Google.
+RANGE_REPORT = {
+    'SNAPSHOT_MAX_AGE': 300,
+}
+
+# История проекты × даты на диске (HISTORY_STORE['DIRECTORY']): отчёты за период
+# в холодном процессе (cron) отображают файл в память и забирают из Google только
+# колонки дат начиная с REFETCH_DAYS последних сохранённых — они ещё могут меняться.
+HISTORY_STORE = {
+    'ENABLED': False,
+    'DIRECTORY': 'history',
+    'REFETCH_DAYS': 2,
+}
+
+# Колонки «вчера» и «Δ неделя» (сегодня минус тот же день неделю назад) в Rich-таблице
+# основного отчёта. Числа берутся из того же ответа values.get, что и «сегодня»: это
+# две ячейки на проект, ни лишнего запроса, ни лишнего диапазона.
+REPORT_DELTAS = {
+    'ENABLED': False,
+}
+
+# Аномалии в основном отчёте (src/anomalies.py): число проекта за DAY сравнивается
+# с медианой его WINDOW предыдущих дат (None — вся история листа). Устойчивый z по MAD
+# больше THRESHOLD — проект попадает в таблицу «аномалии». Меньше MIN_DAYS чисел в
+# истории — проект не проверяется; MIN_MAD — нижняя граница разброса для ровных рядов.
+# DAY: 'yesterday' — последний полный день; 'today' — сегодняшняя колонка, но отчёт уходит
+# в REPORT_TIME, день ещё не закончился, и против полных дней почти всё выглядит провалом.
+ANOMALIES = {
+    'ENABLED': False,
+    'DAY': 'yesterday',
+    'WINDOW': 28,
+    'THRESHOLD': 3.5,
+    'MIN_DAYS': 7,
+    'MIN_MAD': 1.0,
+}
+
 SHEET_SETTINGS = {
     'SECONDARY': {
         'SPREADSHEET_ID': SECONDARY_SPREADSHEET_ID,
@@ -55,7 +267,16 @@ SHEET_SETTINGS = {
             'TOTAL_ISSUED_COLUMN': 'F',  # Выдано итого
             'DATA_START_COLUMN': 'G',    # Начало данных по датам
             'DATE_ROW': 1,
-        }
+            # chat_id клиента, которому слать проект (например 'D'). None — все в общий чат
+            'CHAT_ID_COLUMN': None,
+        },
+        # Или отдельная вкладка «проект | chat_id»: NAME — имя вкладки, None — не используется.
+        # Перечитывается не чаще раза в REFRESH_SECONDS; CHAT_ID_COLUMN важнее вкладки.
+        'ROUTING': {
+            'NAME': None,
+            'RANGE': 'A2:B',
+            'REFRESH_SECONDS': 300,
+        },
     }
 }
 
@@ -69,6 +290,17 @@ MESSAGES = {
 Тариф: {total_issued}/{total_volume}
 Выдано за сегодня: {today_data}
 Остаток: {tariff_remaining}
+""",
+
+    'RANGE_REPORT': r"""🔍 \[LR конкуренты] Поступление данных с {date_from} по {date_to} (дат в листе: {days}):
+
+{projects_data}""",
+
+    'RANGE_PROJECT_FORMAT': """
+Проект: *{name}*
+Всего за период: {total}
+В среднем за день: {average}
+Остаток: {tariff_remaining}
 """,
 
     'PROJECTS_TO_DISABLE': """
@@ -85,6 +317,12 @@ MESSAGES = {
 {projects_list}
 
 *Необходимо уменьшить лимиты для указанных проектов!*
+""",
+
+    'ANOMALIES': """
+📉 *Аномалии поступлений:*
+
+{projects_list}
 """
 }
 
@@ -0,0 +1,183 @@
+"""Перечитывание части настроек на лету, без перезапуска службы.
+
+Перезапуск project_data_bot ради смены формата или колонки листа стоит холодного
+старта: новые credentials, клиент Sheets, соединения и кэши. Вместо этого
+CONFIG_RELOAD['FILE'] — JSON с переопределениями ключей из RELOADABLE:
+
+    {"REPORTS_MESSAGE_FORMAT": "legacy",
+     "SHEET_SETTINGS": {"SECONDARY": {"STRUCTURE": {"RANGE": "A1:ZZ300"}}}}
+
+Словари сливаются с умолчаниями из src/config.py вглубь. Файл проверяется по
+mtime раз в INTERVAL секунд; новая версия проходит те же проверки, что и отчёт
+(get_message_format, буквы колонок, RANGE), и только целиком подменяет значения
+в модуле config. Ошибка в файле — в лог, работают прежние настройки. Удалили
+файл — возвращаются умолчания. Клиенты Sheets и Telegram при этом не трогаются.
+
+Отчёт читает настройки не раз (лист, потом разметка), поэтому берёт их снимком
+в начале (DataProcessor.report_settings) под тем же замком, под которым здесь
+подменяются значения и вызывается on_change. Уже идущий отчёт доживает на
+старых настройках, следующий видит только новые.
+"""
+
+import asyncio
+import copy
+import json
+import logging
+import os
+import re
+import threading
+from types import ModuleType
+from typing import Callable, Dict, List, Optional
+
+import src.config as config
+from src.data_processor import range_end
+from src.delivery_queue import DeliveryQueue
+from src.rich_report import get_message_format
+
+logger = logging.getLogger(__name__)
+
+# Только то, что читается из config на каждом отчёте, а не один раз при запуске
+RELOADABLE = (
+    'REPORTS_MESSAGE_FORMAT',
+    'SHEET_SETTINGS',
+    'REPORT_DELTAS',
+    'ANOMALIES',
+    'DELIVERY_QUEUE',
+)
+
+STRUCTURE_COLUMNS = (
+    'PROJECT_COLUMN',
+    'STATUS_COLUMN',
+    'VOLUME_COLUMN',
+    'REMAINING_COLUMN',
+    'TOTAL_ISSUED_COLUMN',
+    'DATA_START_COLUMN',
+)
+# column_to_index понимает только одну букву
+_COLUMN_RE = re.compile(r'^[A-Za-z]$')
+
+
+def merge(base, override, path: str = ''):
+    """Копия base с override поверх; вложенные словари — по ключам, чужой ключ — ошибка."""
+    if not isinstance(base, dict) or not isinstance(override, dict):
+        return copy.deepcopy(override)
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if key not in base:
+            raise ValueError(f"{path}{key}: такой настройки нет")
+        merged[key] = merge(base[key], value, f"{path}{key}.")
+    return merged
+
+
+def validate_structure(name: str, structure: dict) -> None:
+    """Буквы колонок и RANGE листа — до того, как на них упадёт отчёт."""
+    for key in (*STRUCTURE_COLUMNS, 'CHAT_ID_COLUMN'):
+        letter = structure[key]
+        if key == 'CHAT_ID_COLUMN' and letter is None:
+            continue
+        if not isinstance(letter, str) or not _COLUMN_RE.match(letter):
+            raise ValueError(f"SHEET_SETTINGS.{name}.STRUCTURE.{key}: нужна одна буква, получено {letter!r}")
+    data_start = structure['DATA_START_COLUMN'].upper()
+    late = [key for key in STRUCTURE_COLUMNS[:-1] if structure[key].upper() >= data_start]
+    if late:
+        raise ValueError(f"SHEET_SETTINGS.{name}.STRUCTURE: {', '.join(late)} не левее DATA_START_COLUMN")
+    range_end(structure['RANGE'])
+    if not isinstance(structure['DATE_ROW'], int) or structure['DATE_ROW'] < 1:
+        raise ValueError(f"SHEET_SETTINGS.{name}.STRUCTURE.DATE_ROW: нужен номер строки")
+
+
+def validate(settings: Dict[str, object]) -> None:
+    get_message_format(settings['REPORTS_MESSAGE_FORMAT'])
+    DeliveryQueue(settings['DELIVERY_QUEUE']['PER_CHAT_ORDER'])
+    if settings['ANOMALIES']['DAY'] not in ('today', 'yesterday'):
+        raise ValueError(f"ANOMALIES.DAY: 'today' или 'yesterday', получено {settings['ANOMALIES']['DAY']!r}")
+    for name, sheet in settings['SHEET_SETTINGS'].items():
+        validate_structure(name, sheet['STRUCTURE'])
+
+
+def _stamp(path: str):
+    """Версия файла: редактор может заменить его новым, поэтому и inode."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class ConfigReloader:
+    """Следит за файлом переопределений; on_change(ключи) — после подмены настроек.
+
+    lock — замок, под которым отчёты снимают настройки (DataProcessor.settings_lock).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        on_change: Optional[Callable[[List[str]], None]] = None,
+        module: ModuleType = config,
+        lock=None,
+    ):
+        self.path = path
+        self.on_change = on_change
+        self.module = module
+        self.lock = lock if lock is not None else threading.RLock()
+        # умолчания — как в config.py при запуске, до любых переопределений
+        self.defaults = {key: copy.deepcopy(getattr(module, key)) for key in RELOADABLE}
+        self.stamp = None
+        self.reloads = 0
+        self.errors = 0
+
+    def build(self, overrides: dict) -> Dict[str, object]:
+        """Настройки RELOADABLE с переопределениями, проверенные; ошибка — ValueError."""
+        if not isinstance(overrides, dict):
+            raise ValueError("в файле должен быть JSON-объект")
+        unknown = sorted(set(overrides) - set(RELOADABLE))
+        if unknown:
+            raise ValueError(f"на лету не меняются: {', '.join(unknown)}")
+        settings = {
+            key: merge(self.defaults[key], overrides[key], f"{key}.") if key in overrides
+            else copy.deepcopy(self.defaults[key])
+            for key in RELOADABLE
+        }
+        validate(settings)
+        return settings
+
+    def _read(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding='utf-8') as file:
+            return json.load(file)
+
+    def check(self) -> List[str]:
+        """Перечитывает файл, если он поменялся. Возвращает подменённые ключи."""
+        stamp = _stamp(self.path)
+        if stamp == self.stamp:
+            return []
+        self.stamp = stamp
+        try:
+            settings = self.build(self._read())
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.errors += 1
+            logger.error(f"Config overrides {self.path} rejected, keeping current settings: {e}")
+            return []
+
+        changed = [key for key in RELOADABLE if settings[key] != getattr(self.module, key)]
+        if not changed:
+            return []
+        # подмена и on_change под замком отчётов: снимок настроек — целиком старый или целиком новый
+        with self.lock:
+            vars(self.module).update({key: settings[key] for key in changed})
+            if self.on_change is not None:
+                self.on_change(changed)
+        self.reloads += 1
+        logger.info("Config reloaded from %s: %s", self.path, ', '.join(changed))
+        return changed
+
+    async def run(self, interval: float) -> None:
+        """Проверка файла раз в interval секунд, пока задачу не отменят."""
+        while True:
+            self.check()
+            await asyncio.sleep(interval)
+
+    def summary(self) -> str:
+        return f"Конфиг {self.path}: перечитан {self.reloads} раз, отклонён {self.errors}"
@@ -1,18 +1,76 @@
-from datetime import datetime
+import contextvars
+import json
+import re
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from urllib.parse import quote
+import numpy as np
 import pytz
+from google.auth.credentials import AnonymousCredentials
+from google.auth.transport.requests import AuthorizedSession
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 import src.config as config
+from src.anomalies import day_label, find_anomalies
+from src.chat_routing import ChatRoutingIndex
+from src.history_store import HistoryStore
+from src.legacy_report import render_anomalies_warning, render_projects_text, render_tariff_warning
+from src.report_history import HistoryMatrix, dated_columns
+from src.sheet_matrix import parse_int_matrix
+from src.sheets_capture import SheetsRecorder, SheetsReplay
+from src.sheets_resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    SheetSnapshot,
+    SheetsClientError,
+    SheetsEmptyError,
+    SheetsFetchError,
+    call_with_retry,
+    classify_error,
+)
+from src.sheets_stream import iter_values_rows, keep_cells
+from src.sheets_transport import SHEETS_USER_AGENT, ThreadLocalHttp
+from src.tariff_watcher import DISABLE, REDUCE, tariff_level, warning_entry
+from src import tracing
 import logging
 
 logger = logging.getLogger(__name__)
 
+SHEETS_API_DEFAULT_URL = 'https://sheets.googleapis.com'
+SHEETS_STREAM_CHUNK_SIZE = 64 * 1024
+SHEETS_STREAM_TIMEOUT = 30
+# Маски fields: Google не присылает range и majorDimension, которые отчёту не нужны
+SHEETS_VALUES_FIELDS = 'values'
+SHEETS_BATCH_FIELDS = 'valueRanges(values)'
+
 
 def column_to_index(letter):
     """Буква колонки Google Sheets → индекс списка. A=0, B=1, ..."""
     return ord(letter.strip().upper()) - ord('A')
 
 
+def index_to_column(index):
+    """Индекс списка → буква колонки Google Sheets. 0=A, 25=Z, 26=AA, ..."""
+    letters = ''
+    index += 1
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def range_end(range_a1):
+    """'A1:ZZ227' → ('ZZ', 227): последняя колонка и строка диапазона листа."""
+    match = re.search(r'([A-Za-z]+)(\d+)$', range_a1)
+    if not match:
+        raise ValueError(f"RANGE должен кончаться ячейкой: {range_a1}")
+    return match.group(1).upper(), int(match.group(2))
+
+
 def parse_sheet_int(row, index, default=0):
     """Читает число из своей ячейки. Пусто, нет колонки или мусор → default."""
     if index >= len(row):
@@ -25,132 +83,700 @@ def parse_sheet_int(row, index, default=0):
         return default
     try:
         return int(float(text))
-    except ValueError:
+    except (ValueError, OverflowError):
         return default
 
 
+def iter_active_projects(cells, history_start=None, extras=None):
+    """Проекты со статусом TRUE из строк keep_cells: имя, статус, объём, остаток, выдано, сегодня.
+
+    Седьмая ячейка, если есть, — сырой chat_id из CHAT_ID_COLUMN. Дальше могут
+    идти extras — {ключ: номер ячейки} для дополнительных чисел (номер None —
+    значение None) и с history_start — даты до сегодня, они уходят в project['history'].
+    """
+    extras = extras or {}
+    tail = [position for position in (history_start, *extras.values()) if position is not None]
+    base_end = min(tail) if tail else None
+    for row in cells:
+        name, status = row[0], row[1]
+        if status != 'TRUE':
+            continue
+        try:
+            base = row[:base_end]
+            project = {
+                'name': name if name is not None else '',
+                'total_volume': parse_sheet_int(base, 2),
+                'tariff_remaining': parse_sheet_int(base, 3),
+                'total_issued': parse_sheet_int(base, 4),
+                'today_data': parse_sheet_int(base, 5),
+            }
+            if len(base) > 6:
+                project['telegram_chat_id'] = base[6]
+            for key, position in extras.items():
+                project[key] = parse_sheet_int(row, position) if position is not None else None
+            if history_start is not None:
+                project['history'] = row[history_start:]
+            yield project
+        except (ValueError, IndexError) as e:
+            logger.error(f"Ошибка обработки строки {row}: {e}")
+            continue
+
+
+def delta_columns(headers, structure, today):
+    """Колонки вчера и той же даты неделей раньше: {'yesterday_data': i, 'week_ago_data': j}.
+
+    Берутся из того же ответа, что и сегодня; нет такой даты в листе — None.
+    """
+    data_start = column_to_index(structure['DATA_START_COLUMN'])
+    positions = dict(dated_columns(headers, data_start))
+    return {
+        'yesterday_data': positions.get(today - timedelta(days=1)),
+        'week_ago_data': positions.get(today - timedelta(days=7)),
+    }
+
+
+def history_columns(headers, structure, day, window):
+    """Колонки дат до day, старые слева: не больше window последних (None — все)."""
+    data_start = column_to_index(structure['DATA_START_COLUMN'])
+    past = [position for header_date, position in dated_columns(headers, data_start) if header_date < day]
+    return past[-window:] if window else past
+
+
+def anomaly_columns(headers, structure, today, settings):
+    """Что проверять на аномалии: (день, его колонка или None — это today_data, история).
+
+    settings — ANOMALIES; DAY = 'yesterday' — последний полный день, нет вчера в листе — None.
+    """
+    if settings['DAY'] == 'today':
+        return today, None, history_columns(headers, structure, today, settings['WINDOW'])
+    day = today - timedelta(days=1)
+    data_start = column_to_index(structure['DATA_START_COLUMN'])
+    position = dict(dated_columns(headers, data_start)).get(day)
+    if position is None:
+        return None
+    return day, position, history_columns(headers, structure, day, settings['WINDOW'])
+
+
+def settings_snapshot():
+    """Перечитываемые настройки, которые нужны отчёту (см. config_reload).
+
+    ConfigReloader не правит словари, а подменяет их целиком, поэтому ссылки,
+    взятые здесь, не меняются до конца отчёта.
+    """
+    return {
+        'SHEET_SETTINGS': config.SHEET_SETTINGS,
+        'REPORT_DELTAS': config.REPORT_DELTAS,
+        'ANOMALIES': config.ANOMALIES,
+    }
+
+
+def _tee_chunks(chunks, received):
+    """Отдаёт куски дальше и складывает их в received — для записи потокового ответа."""
+    for chunk in chunks:
+        received.append(chunk)
+        yield chunk
+
+
 class DataProcessor:
     def __init__(self):
         """Инициализация обработчика данных"""
-        self.credentials = service_account.Credentials.from_service_account_file(
+        self.credentials = self._load_credentials()
+        self.http = ThreadLocalHttp(self.credentials, timeout=config.SHEETS_TRANSPORT['TIMEOUT'])
+        self.service = self._build_service()
+        # для потокового чтения; requests держит пул соединений и потокобезопасен
+        self.session = AuthorizedSession(self.credentials)
+        self.session.headers['User-Agent'] = SHEETS_USER_AGENT
+        self._init_state(
+            capture_recorder=(
+                SheetsRecorder(config.SHEETS_CAPTURE['DIRECTORY'])
+                if config.SHEETS_CAPTURE['RECORD'] else None
+            ),
+        )
+
+    def _init_state(self, capture_recorder=None, capture_replay=None):
+        """Всё, кроме клиентов Google: общее для __init__ и from_capture."""
+        self.fetch_pool = None  # потоки values_get_many, создаются при первом вызове
+        self.moscow_tz = pytz.timezone(config.REPORT_TIME['TIMEZONE'])
+        self.retry_policy = RetryPolicy.from_config(config.SHEETS_RETRY)
+        self.breaker = CircuitBreaker.from_config(config.SHEETS_CIRCUIT_BREAKER)
+        self.snapshots = {}  # sheet_type → последний удачный SheetSnapshot
+        self.routing = ChatRoutingIndex()
+        self.routing_fetched_at = None  # time.monotonic() последнего чтения вкладки маршрутов
+        self.history = None  # (fetched_at снимка, HistoryMatrix) для отчётов за период
+        self.history_store = HistoryStore(config.HISTORY_STORE['DIRECTORY'])
+        self.today_column = None  # (дата dd.mm.yy, индекс колонки) для наблюдателя тарифов
+        self.capture_recorder = capture_recorder
+        self.capture_replay = capture_replay  # SheetsReplay — вместо Google, см. from_capture
+        # снимок настроек на отчёт и сброс кэшей листа — под одним замком, см. report_settings
+        self.settings_lock = threading.Condition()
+        self.reports_running = 0
+        self.reset_pending = False
+
+    def reset_sheet_caches(self):
+        """Забывает всё, что построено по старой разметке листа; клиент Sheets и соединения остаются.
+
+        Пока идут отчёты на прежних настройках, сброс откладывается до конца последнего.
+        """
+        with self.settings_lock:
+            if self.reports_running:
+                self.reset_pending = True
+            else:
+                self._clear_sheet_caches()
+
+    def _clear_sheet_caches(self):
+        self.snapshots = {}
+        self.routing = ChatRoutingIndex()
+        self.routing_fetched_at = None
+        self.history = None
+        self.today_column = None
+
+    @contextmanager
+    def report_settings(self):
+        """Один снимок настроек на весь отчёт; кэши листа, пока он идёт, не сбрасываются.
+
+        Отложенный сброс выполняется, когда закончится последний отчёт; новые
+        отчёты до этого ждут, чтобы не читать кэши старой разметки.
+        """
+        lock = self.settings_lock
+        with lock:
+            lock.wait_for(lambda: not self.reset_pending)
+            self.reports_running += 1
+            settings = settings_snapshot()
+        try:
+            yield settings
+        finally:
+            with lock:
+                self.reports_running -= 1
+                if not self.reports_running and self.reset_pending:
+                    self._clear_sheet_caches()
+                    self.reset_pending = False
+                    lock.notify_all()
+
+    @classmethod
+    def from_capture(cls, directory, realtime=False):
+        """Обработчик без Google: values.get отдаются из записей SheetsRecorder в directory.
+
+        Без credentials и клиентов Sheets, остальное — как в __init__.
+        """
+        processor = cls.__new__(cls)
+        processor.credentials = processor.http = processor.service = processor.session = None
+        processor._init_state(capture_replay=SheetsReplay.from_directory(directory, realtime=realtime))
+        return processor
+
+    def now(self):
+        """Сейчас по Москве; при воспроизведении — когда записан последний отданный ответ."""
+        replay = self.capture_replay
+        if replay is not None:
+            return replay.recorded_at
+        return datetime.now(self.moscow_tz)
+
+    def values_get(self, spreadsheet_id, range_name):
+        """values.get с повторами. С записью ответ ложится на диск, при воспроизведении — берётся с диска."""
+        replay = self.capture_replay
+        if replay is not None:
+            try:
+                return replay.next(range_name).response
+            except KeyError as e:
+                raise SheetsClientError(str(e)) from e
+
+        started = time.perf_counter()
+        result = call_with_retry(
+            lambda: self.service.spreadsheets().values().get(
+                spreadsheetId=spreadsheet_id,
+                range=range_name,
+                fields=SHEETS_VALUES_FIELDS,
+            ).execute(),
+            self.retry_policy,
+            self.breaker,
+        )
+        recorder = self.capture_recorder
+        if recorder is not None:
+            recorder.record(range_name, result, time.perf_counter() - started, self.now())
+        return result
+
+    def values_get_many(self, targets):
+        """Несколько values_get параллельно: [(spreadsheet_id, range), ...] → ответы в том же порядке.
+
+        Не больше SHEETS_TRANSPORT['MAX_PARALLEL'] запросов сразу; трасса текущего
+        отчёта видна в каждом потоке.
+        """
+        targets = list(targets)
+        if len(targets) <= 1:
+            return [self.values_get(*target) for target in targets]
+        if self.fetch_pool is None:
+            # потоки живут с обработчиком: их соединения переиспользуются между вызовами
+            self.fetch_pool = ThreadPoolExecutor(
+                max_workers=config.SHEETS_TRANSPORT['MAX_PARALLEL'],
+                thread_name_prefix='sheets',
+            )
+        futures = [
+            self.fetch_pool.submit(contextvars.copy_context().run, self.values_get, *target)
+            for target in targets
+        ]
+        return [future.result() for future in futures]
+
+    def _load_credentials(self):
+        """Service Account из файла. Для локального фейкового Sheets без файла — анонимно."""
+        if config.SHEETS_API_BASE_URL and not config.CREDENTIALS_FILE:
+            return AnonymousCredentials()
+        return service_account.Credentials.from_service_account_file(
             config.CREDENTIALS_FILE,
             scopes=['https://www.googleapis.com/auth/spreadsheets.readonly']
         )
-        self.service = build('sheets', 'v4', credentials=self.credentials)
-        self.moscow_tz = pytz.timezone(config.REPORT_TIME['TIMEZONE'])
 
-    def get_sheet_data(self, sheet_type='SECONDARY'):
-        """Получение данных из таблицы"""
+    def _build_service(self):
+        """Клиент Sheets API; SHEETS_API_BASE_URL подменяет адрес Google.
+
+        Каждый запрос идёт через http своего потока (ThreadLocalHttp), поэтому
+        values_get и batch_get можно звать из нескольких потоков сразу.
+        """
+        client_options = None
+        if config.SHEETS_API_BASE_URL:
+            client_options = {'api_endpoint': config.SHEETS_API_BASE_URL}
+        return build(
+            'sheets',
+            'v4',
+            http=self.http.get(),
+            requestBuilder=self.http.build_request,
+            client_options=client_options,
+        )
+
+    def get_sheet_data(self, sheet_type='SECONDARY', settings=None):
+        """Получение данных из таблицы.
+
+        429/5xx повторяются с backoff. Если Google так и не ответил, отдаём
+        последний удачный снимок со stale=True, а без снимка — SheetsFetchError.
+        settings — SHEET_SETTINGS[sheet_type] из снимка отчёта; None — текущие.
+        """
+        settings = settings or config.SHEET_SETTINGS[sheet_type]
+        range_name = f"'{settings['NAME']}'!{settings['STRUCTURE']['RANGE']}"
+
+        try:
+            with tracing.span("get_sheet_data", sheet=sheet_type):
+                result = self.values_get(settings['SPREADSHEET_ID'], range_name)
+        except SheetsFetchError as e:
+            snapshot = self.snapshots.get(sheet_type)
+            if snapshot is None or not (e.retryable or e.kind == 'circuit_open'):
+                logger.error(f"Error getting sheet data: {e}")
+                raise
+            logger.warning(
+                f"Google Sheets недоступен ({e.kind}), отдаём снимок от {snapshot.fetched_at}"
+            )
+            return SheetSnapshot(snapshot, fetched_at=snapshot.fetched_at, stale=True)
+
+        values = result.get('values', [])
+        if not values:
+            logger.warning(f"No data found in {sheet_type} sheet")
+            raise SheetsEmptyError(f"No data in {sheet_type.lower()} sheet")
+
+        snapshot = SheetSnapshot(values, fetched_at=self.now())
+        self.snapshots[sheet_type] = snapshot
+        return snapshot
+
+    def batch_get(self, spreadsheet_id, ranges):
+        """values.batchGet с повторами: values каждого диапазона в порядке ranges."""
+        with tracing.span("batch_get", ranges=len(ranges)):
+            response = call_with_retry(
+                lambda: self.service.spreadsheets().values().batchGet(
+                    spreadsheetId=spreadsheet_id,
+                    ranges=ranges,
+                    fields=SHEETS_BATCH_FIELDS,
+                ).execute(),
+                self.retry_policy,
+                self.breaker,
+            )
+        return [value_range.get('values', []) for value_range in response.get('valueRanges', [])]
+
+    def _history_columns(self, structure):
+        return {
+            'name': column_to_index(structure['PROJECT_COLUMN']),
+            'status': column_to_index(structure['STATUS_COLUMN']),
+            'volume': column_to_index(structure['VOLUME_COLUMN']),
+            'remaining': column_to_index(structure['REMAINING_COLUMN']),
+            'issued': column_to_index(structure['TOTAL_ISSUED_COLUMN']),
+            'data_start': column_to_index(structure['DATA_START_COLUMN']),
+        }
+
+    def get_history(self, sheet_type='SECONDARY', settings=None):
+        """Накопленные суммы по датам; снимок моложе SNAPSHOT_MAX_AGE не перечитываем.
+
+        Возвращает (HistoryMatrix, снимок). Матрица строится один раз на снимок.
+        С HISTORY_STORE — из файла на диске и только свежих колонок дат.
+        """
+        settings = settings or config.SHEET_SETTINGS[sheet_type]
+        max_age = config.RANGE_REPORT['SNAPSHOT_MAX_AGE']
+        now = self.now()
+        if config.HISTORY_STORE['ENABLED']:
+            if self.history is None or (now - self.history[0]).total_seconds() > max_age:
+                self.history = (now, self.sync_history(sheet_type, settings))
+            return self.history[1], SheetSnapshot([], fetched_at=self.history[0])
+
+        snapshot = self.snapshots.get(sheet_type)
+        if snapshot is None or (now - snapshot.fetched_at).total_seconds() > max_age:
+            snapshot = self.get_sheet_data(sheet_type, settings)
+
+        if self.history is None or self.history[0] != snapshot.fetched_at:
+            structure = settings['STRUCTURE']
+            with tracing.span("build_history_matrix", rows=len(snapshot)):
+                history = HistoryMatrix.from_values(snapshot, self._history_columns(structure))
+            self.history = (snapshot.fetched_at, history)
+        return self.history[1], snapshot
+
+    def sync_history(self, sheet_type='SECONDARY', settings=None):
+        """Догружает историю на диске до текущего листа и строит по ней HistoryMatrix.
+
+        Из Google — строка дат, колонки проектов до DATA_START_COLUMN и колонки дат
+        не старше watermark - REFETCH_DAYS. Поменялся список проектов или старые
+        даты — история собирается заново со всеми колонками.
+        """
+        settings = settings or config.SHEET_SETTINGS[sheet_type]
+        structure = settings['STRUCTURE']
+        columns = self._history_columns(structure)
+        sheet = f"'{settings['NAME']}'"
+        first_row = structure['DATE_ROW'] + 1
+        _, last_row = range_end(structure['RANGE'])
+
+        def fetch(ranges):
+            return self.batch_get(settings['SPREADSHEET_ID'], ranges)
+
+        header_values, project_rows = fetch([
+            f"{sheet}!{structure['DATE_ROW']}:{structure['DATE_ROW']}",
+            f"{sheet}!A{first_row}:{index_to_column(columns['data_start'] - 1)}{last_row}",
+        ])
+        dated = dated_columns(header_values[0] if header_values else [], columns['data_start'])
+        names = [row[columns['name']] if len(row) > columns['name'] else '' for row in project_rows]
+
+        stored = self.history_store.load()
+        keep = 0
+        if stored is not None and stored.names == names and stored.watermark is not None:
+            cutoff = stored.watermark - timedelta(days=config.HISTORY_STORE['REFETCH_DAYS'] - 1)
+            keep = bisect_left(stored.dates, cutoff)
+            if [header_date for header_date, _ in dated[:keep]] != stored.dates[:keep]:
+                logger.info("Даты в листе поменялись, история собирается заново")
+                keep = 0
+        fresh = dated[keep:]
+
+        by_date = np.zeros((len(fresh), len(names)), dtype=np.int32)
+        if fresh:
+            first = min(position for _, position in fresh)
+            last = max(position for _, position in fresh)
+            (date_rows,) = fetch([
+                f"{sheet}!{index_to_column(first)}{first_row}:{index_to_column(last)}{last_row}",
+            ])
+            date_rows = date_rows[:len(names)] + [[]] * (len(names) - len(date_rows))
+            matrix, _ = parse_int_matrix(date_rows, 0, last - first + 1)
+            by_date = matrix[:, [position - first for _, position in fresh]].T
+        logger.info(f"История: {keep} дат с диска, {len(fresh)} из Google")
+
+        stored = self.history_store.save(
+            names,
+            [header_date for header_date, _ in dated],
+            by_date,
+            keep=keep,
+        )
+        return HistoryMatrix.from_parts(project_rows, stored.dates, stored.matrix, columns)
+
+    def get_tariff_rows(self, sheet_type='SECONDARY'):
+        """Активные проекты с остатком и «сегодня» — для наблюдателя тарифов.
+
+        Один batchGet по колонкам имени, статуса, остатка и сегодняшней даты, а не весь лист.
+        Колонка сегодняшней даты ищется по строке дат раз в сутки.
+        """
+        with self.report_settings() as snapshot:
+            return self._tariff_rows(snapshot['SHEET_SETTINGS'][sheet_type])
+
+    def _tariff_rows(self, settings):
+        structure = settings['STRUCTURE']
+        sheet = f"'{settings['NAME']}'"
+        first_row = structure['DATE_ROW'] + 1
+        _, last_row = range_end(structure['RANGE'])
+
+        today_str = self.now().strftime('%d.%m.%y')
+        cached = self.today_column
+        if cached is None or cached[0] != today_str:
+            (header_values,) = self.batch_get(
+                settings['SPREADSHEET_ID'],
+                [f"{sheet}!{structure['DATE_ROW']}:{structure['DATE_ROW']}"],
+            )
+            headers = header_values[0] if header_values else []
+            today_col_idx = next(
+                (idx for idx, header in enumerate(headers) if today_str in header),
+                None,
+            )
+            if today_col_idx is None:
+                logger.warning(f"Не найдена колонка с датой {today_str}, «сегодня» считаем нулём")
+            cached = self.today_column = (today_str, today_col_idx)
+
+        letters = [
+            structure['PROJECT_COLUMN'],
+            structure['STATUS_COLUMN'],
+            structure['REMAINING_COLUMN'],
+        ]
+        if cached[1] is not None:
+            letters.append(index_to_column(cached[1]))
+        columns = self.batch_get(
+            settings['SPREADSHEET_ID'],
+            [f"{sheet}!{letter}{first_row}:{letter}{last_row}" for letter in letters],
+        )
+        # Одна колонка приходит строками [значение]; пустой хвост Google обрезает
+        cells = [[row[0] if row else '' for row in values] for values in columns]
+        names, statuses, remaining = cells[0], cells[1], cells[2]
+        today = cells[3] if len(cells) > 3 else []
+
+        projects = []
+        for number, status in enumerate(statuses):
+            if status != 'TRUE':
+                continue
+            projects.append({
+                'name': names[number] if number < len(names) else '',
+                'tariff_remaining': parse_sheet_int(remaining, number),
+                'today_data': parse_sheet_int(today, number),
+            })
+        return projects
+
+    def generate_range_report(self, date_from, date_to):
+        """Отчёт за период: сумма и среднее за день по каждому активному проекту.
+
+        Лист читается целиком и без потока: нужны все колонки дат.
+        """
         try:
-            settings = config.SHEET_SETTINGS[sheet_type]
-            range_name = f"'{settings['NAME']}'!{settings['STRUCTURE']['RANGE']}"
-            
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=settings['SPREADSHEET_ID'],
-                range=range_name
-            ).execute()
-            
-            values = result.get('values', [])
-            if not values:
-                logger.warning(f"No data found in {sheet_type} sheet")
-                return []
-            
-            return values
-            
+            with self.report_settings() as settings:
+                history, snapshot = self.get_history('SECONDARY', settings['SHEET_SETTINGS']['SECONDARY'])
+        except SheetsFetchError as e:
+            return {'success': False, 'error': str(e), 'error_type': e.kind}
         except Exception as e:
-            logger.error(f"Error getting sheet data: {e}")
-            return []
-    
+            logger.error(f"Error generating range report: {e}")
+            return {'success': False, 'error': str(e)}
+
+        projects, days = history.range_projects(date_from, date_to)
+        date_format = config.SHEET_STRUCTURE['DATE_FORMAT_OUT']
+        if not days:
+            return {
+                'success': False,
+                'error': f"В листе нет дат с {date_from.strftime(date_format)} по {date_to.strftime(date_format)}",
+            }
+        if not projects:
+            return {'success': False, 'error': 'Нет активных проектов'}
+
+        return {
+            'success': True,
+            'date_from': date_from,
+            'date_to': date_to,
+            'days': days,
+            'projects': projects,
+            'projects_data': render_projects_text(config.MESSAGES['RANGE_PROJECT_FORMAT'], projects),
+            'stale': getattr(snapshot, 'stale', False),
+            'fetched_at': getattr(snapshot, 'fetched_at', None),
+        }
+
+    def get_routing_rows(self, sheet_type='SECONDARY', settings=None):
+        """Вкладка маршрутов «проект | chat_id», не чаще раза в REFRESH_SECONDS.
+
+        None — перечитывать рано или Google не ответил: остаётся прежний индекс.
+        """
+        settings = settings or config.SHEET_SETTINGS[sheet_type]
+        routing = settings.get('ROUTING') or {}
+        if not routing.get('NAME'):
+            return None
+        now = time.monotonic()
+        if self.routing_fetched_at is not None and now - self.routing_fetched_at < routing['REFRESH_SECONDS']:
+            return None
+
+        try:
+            result = self.values_get(
+                settings['SPREADSHEET_ID'],
+                f"'{routing['NAME']}'!{routing['RANGE']}",
+            )
+        except SheetsFetchError as e:
+            logger.warning(f"Вкладка маршрутов не прочитана ({e.kind}), маршруты прежние: {e}")
+            return None
+        self.routing_fetched_at = now
+        return result.get('values', [])
+
+    def _route_projects(self, projects, settings):
+        """Проставляет проектам telegram_chat_id из колонки или вкладки маршрутов."""
+        routing = self.routing
+        if settings['STRUCTURE'].get('CHAT_ID_COLUMN'):
+            routing.update(
+                (project['name'], project.get('telegram_chat_id')) for project in projects
+            )
+        else:
+            rows = self.get_routing_rows('SECONDARY', settings)
+            if rows is not None:
+                routing.update((row[0], row[1] if len(row) > 1 else None) for row in rows if row)
+            elif routing.digest is None:
+                return
+        routing.route(projects)
+
+    def stream_sheet_rows(self, sheet_type='SECONDARY', settings=None):
+        """Строки листа по одной, прямо из HTTP-ответа (SHEETS_STREAMING).
+
+        Тело values.get не собирается целиком: iter_values_rows отдаёт строку,
+        как только она дочитана. Снимка для stale тут нет — только повторы и breaker.
+        """
+        settings = settings or config.SHEET_SETTINGS[sheet_type]
+        range_name = f"'{settings['NAME']}'!{settings['STRUCTURE']['RANGE']}"
+        base_url = (config.SHEETS_API_BASE_URL or SHEETS_API_DEFAULT_URL).rstrip('/')
+        url = (
+            f"{base_url}/v4/spreadsheets/{quote(settings['SPREADSHEET_ID'], safe='')}"
+            f"/values/{quote(range_name, safe='')}?fields={SHEETS_VALUES_FIELDS}"
+        )
+
+        def open_response():
+            response = self.session.get(url, stream=True, timeout=SHEETS_STREAM_TIMEOUT)
+            if response.status_code >= 400:
+                response.close()
+                response.raise_for_status()
+            return response
+
+        replay = self.capture_replay
+        if replay is not None:
+            try:
+                body = replay.next(range_name).body()
+            except KeyError as e:
+                raise SheetsClientError(str(e)) from e
+            yield from iter_values_rows(
+                body[offset:offset + SHEETS_STREAM_CHUNK_SIZE]
+                for offset in range(0, len(body), SHEETS_STREAM_CHUNK_SIZE)
+            )
+            return
+
+        started = time.perf_counter()
+        recorder = self.capture_recorder
+        response = call_with_retry(open_response, self.retry_policy, self.breaker)
+        try:
+            chunks = response.iter_content(SHEETS_STREAM_CHUNK_SIZE)
+            if recorder is not None:
+                received = []
+                chunks = _tee_chunks(chunks, received)
+            yield from iter_values_rows(chunks)
+        except SheetsFetchError:
+            raise
+        except Exception as e:
+            raise classify_error(e) from e
+        finally:
+            response.close()
+        if recorder is not None:
+            # время — до конца потока, вместе с разбором строк
+            recorder.record(range_name, json.loads(b''.join(received)), time.perf_counter() - started, self.now())
+
     def generate_secondary_report(self):
-        """Генерация отчета по второй таблице"""
+        """Генерация отчета по второй таблице.
+
+        Строки идут конвейером: лист → нужные ячейки → проекты. При SHEETS_STREAMING
+        лист читается потоком, и лишние колонки дат отбрасываются сразу.
+        Настройки листа, дельт и аномалий берутся одним снимком в начале отчёта.
+        """
+        with self.report_settings() as settings:
+            return self._secondary_report(settings)
+
+    def _secondary_report(self, settings):
+        sheet = settings['SHEET_SETTINGS']['SECONDARY']
         try:
-            data = self.get_sheet_data('SECONDARY')
-            logger.info(f"Получены данные из второй таблицы: {len(data) if data else 0} строк")
-            
-            if not data:
-                return {'success': False, 'error': 'No data in secondary sheet'}
-
-            # Получаем заголовки для определения индекса сегодняшней даты
-            headers = data[0]
-            today = datetime.now(self.moscow_tz)
-            today_str = today.strftime('%d.%m.%y')
-            
-            # Ищем индекс колонки с сегодняшней датой
-            today_col_idx = None
-            for idx, header in enumerate(headers):
-                if today_str in header:
-                    today_col_idx = idx
-                    break
+            try:
+                if config.SHEETS_STREAMING:
+                    data = self.stream_sheet_rows('SECONDARY', sheet)
+                else:
+                    data = self.get_sheet_data('SECONDARY', sheet)
+                    logger.info(f"Получены данные из второй таблицы: {len(data) if data else 0} строк")
+                # При SHEETS_STREAMING лист докачивается прямо во время разбора
+                with tracing.span("parse_sheet", streaming=config.SHEETS_STREAMING):
+                    rows = iter(data)
 
-            if today_col_idx is None:
-                logger.error(f"Не найдена колонка с датой {today_str}")
-                return {'success': False, 'error': f'Не найдены данные за {today_str}'}
+                    # Получаем заголовки для определения индекса сегодняшней даты
+                    headers = next(rows, None)
+                    if not headers:
+                        return {'success': False, 'error': 'No data in secondary sheet', 'error_type': 'empty'}
+
+                    today = self.now()
+                    today_str = today.strftime('%d.%m.%y')
 
-            structure = config.SHEET_SETTINGS['SECONDARY']['STRUCTURE']
-            idx_project = column_to_index(structure['PROJECT_COLUMN'])
-            idx_status = column_to_index(structure['STATUS_COLUMN'])
-            idx_volume = column_to_index(structure['VOLUME_COLUMN'])
-            idx_remaining = column_to_index(structure['REMAINING_COLUMN'])
-            idx_issued = column_to_index(structure['TOTAL_ISSUED_COLUMN'])
+                    # Ищем индекс колонки с сегодняшней датой
+                    today_col_idx = None
+                    for idx, header in enumerate(headers):
+                        if today_str in header:
+                            today_col_idx = idx
+                            break
+
+                    if today_col_idx is None:
+                        logger.error(f"Не найдена колонка с датой {today_str}")
+                        return {'success': False, 'error': f'Не найдены данные за {today_str}'}
+
+                    structure = sheet['STRUCTURE']
+                    columns = [
+                        column_to_index(structure['PROJECT_COLUMN']),
+                        column_to_index(structure['STATUS_COLUMN']),
+                        column_to_index(structure['VOLUME_COLUMN']),
+                        column_to_index(structure['REMAINING_COLUMN']),
+                        column_to_index(structure['TOTAL_ISSUED_COLUMN']),
+                        today_col_idx,
+                    ]
+                    if structure.get('CHAT_ID_COLUMN'):
+                        columns.append(column_to_index(structure['CHAT_ID_COLUMN']))
+                    extras = None
+                    if settings['REPORT_DELTAS']['ENABLED']:
+                        extras = {}
+                        for key, position in delta_columns(headers, structure, today.date()).items():
+                            if position is not None:
+                                columns.append(position)
+                                position = len(columns) - 1
+                            extras[key] = position
+                    history_start = None
+                    anomaly_day = history_days = None
+                    checked = (
+                        anomaly_columns(headers, structure, today.date(), settings['ANOMALIES'])
+                        if settings['ANOMALIES']['ENABLED'] else None
+                    )
+                    if checked is not None:
+                        anomaly_day, day_position, past = checked
+                        history_days = len(past)
+                        history_start = len(columns)
+                        columns.extend(past)
+                        if day_position is not None:
+                            columns.append(day_position)  # последней ячейкой за историей
+                    active_projects = list(
+                        iter_active_projects(keep_cells(rows, columns), history_start, extras)
+                    )
+                    self._route_projects(active_projects, sheet)
+            except SheetsFetchError as e:
+                return {'success': False, 'error': str(e), 'error_type': e.kind}
 
-            active_projects = []
             projects_to_disable = []  # Список проектов для отключения
             projects_to_reduce = []   # Список проектов для уменьшения лимитов
-            
-            for row in data[1:]:  # Пропускаем заголовок
-                if len(row) <= idx_status or row[idx_status] != 'TRUE':
-                    continue
-                try:
-                    project_data = {
-                        'name': row[idx_project] if len(row) > idx_project else '',
-                        'total_volume': parse_sheet_int(row, idx_volume),
-                        'tariff_remaining': parse_sheet_int(row, idx_remaining),
-                        'total_issued': parse_sheet_int(row, idx_issued),
-                        'today_data': parse_sheet_int(row, today_col_idx),
-                    }
-                    active_projects.append(project_data)
-
-                    # Проверяем остаток тарифа
-                    if project_data['tariff_remaining'] <= 0:
-                        projects_to_disable.append({
-                            'name': project_data['name'],
-                            'remaining': project_data['tariff_remaining'],
-                            'today_data': project_data['today_data'],
-                        })
-                    elif project_data['tariff_remaining'] <= project_data['today_data']:
-                        projects_to_reduce.append({
-                            'name': project_data['name'],
-                            'remaining': project_data['tariff_remaining'],
-                            'today_data': project_data['today_data'],
-                        })
-
-                except (ValueError, IndexError) as e:
-                    logger.error(f"Ошибка обработки строки {row}: {e}")
-                    continue
+
+            for project_data in active_projects:
+                # Проверяем остаток тарифа
+                level = tariff_level(project_data['tariff_remaining'], project_data['today_data'])
+                if level == DISABLE:
+                    projects_to_disable.append(warning_entry(project_data))
+                elif level == REDUCE:
+                    projects_to_reduce.append(warning_entry(project_data))
 
             if not active_projects:
                 return {'success': False, 'error': 'Нет активных проектов'}
 
-            projects_text = ""
-            for project in active_projects:
-                projects_text += config.MESSAGES['SECONDARY_PROJECT_FORMAT'].format(**project)
-                
-            # Формируем сообщение о проектах для отключения
-            disable_warning = ""
-            if projects_to_disable:
-                disable_warning = config.MESSAGES['PROJECTS_TO_DISABLE'].format(
-                    projects_list='\n'.join([
-                        f"*{project['name']}* - остаток: {project['remaining']}"
-                        for project in projects_to_disable
-                    ])
+            anomalies = []
+            if history_start is not None:
+                histories = [project.pop('history') for project in active_projects]
+                values = None
+                if anomaly_day != today.date():
+                    values = [parse_sheet_int(cells, history_days) for cells in histories]
+                    histories = [cells[:history_days] for cells in histories]
+                with tracing.span("find_anomalies", projects=len(active_projects)):
+                    anomalies = find_anomalies(active_projects, histories, settings['ANOMALIES'], values)
+
+            with tracing.span("render_projects_text", projects=len(active_projects)):
+                projects_text = render_projects_text(
+                    config.MESSAGES['SECONDARY_PROJECT_FORMAT'],
+                    active_projects,
                 )
                 
-            # Формируем сообщение о проектах для уменьшения лимитов
-            reduce_warning = ""
-            if projects_to_reduce:
-                reduce_warning = config.MESSAGES['PROJECTS_TO_REDUCE'].format(
-                    projects_list='\n'.join([f"*{project['name']}* - остаток: {project['remaining']}" for project in projects_to_reduce])
-                )
+            # Сообщения о проектах для отключения и для уменьшения лимитов
+            disable_warning = render_tariff_warning(config.MESSAGES['PROJECTS_TO_DISABLE'], projects_to_disable)
+            reduce_warning = render_tariff_warning(config.MESSAGES['PROJECTS_TO_REDUCE'], projects_to_reduce)
+            anomalies_warning = render_anomalies_warning(
+                config.MESSAGES['ANOMALIES'], anomalies, day_label(anomaly_day, today.date())
+            )
 
             return {
                 'success': True,
@@ -161,8 +787,13 @@ class DataProcessor:
                 'projects_to_disable': projects_to_disable,
                 'projects_to_reduce': projects_to_reduce,
                 'disable_warning': disable_warning,
-                'reduce_warning': reduce_warning
+                'reduce_warning': reduce_warning,
+                'anomalies': anomalies,
+                'anomalies_day': anomaly_day,
+                'anomalies_warning': anomalies_warning,
+                'stale': getattr(data, 'stale', False),
+                'fetched_at': getattr(data, 'fetched_at', None),
             }
         except Exception as e:
             logger.error(f"Error generating secondary report: {e}")
-            return {'success': False, 'error': str(e)} 
\ No newline at end of file
+            return {'success': False, 'error': str(e)}
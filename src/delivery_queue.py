@@ -0,0 +1,129 @@
+"""Очередь доставки отчёта: сначала срочное, по всем чатам сразу.
+
+Все сообщения одной рассылки встают в одну очередь с классом срочности:
+DISABLE (тарифы исчерпаны) → REDUCE (остаток меньше чем на день) → MAIN (основной
+отчёт) → ANOMALIES. Очередь общая для всех чатов, поэтому «тарифы исчерпаны» не
+ждёт, пока основные таблицы разойдутся по сотне чатов клиентов.
+
+Порядок внутри чата (DELIVERY_QUEUE['PER_CHAT_ORDER']):
+- 'fifo' — как поставили (отчёт, потом предупреждения), но чат, где ждёт срочное,
+  обслуживается раньше остальных чатов;
+- 'priority' — строго по срочности, предупреждения раньше отчёта своего же чата.
+
+Сколько сообщения ждали в очереди, копится по классам — wait_stats().
+"""
+
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DISABLE, REDUCE, MAIN, ANOMALIES = range(4)
+PRIORITY_NAMES = {DISABLE: 'disable', REDUCE: 'reduce', MAIN: 'main', ANOMALIES: 'anomalies'}
+
+VALID_PER_CHAT_ORDERS = {'fifo', 'priority'}
+
+
+@dataclass
+class Delivery:
+    priority: int
+    chat_id: object  # ключ порядка внутри чата; у рассылки пулом процессов — свой
+    send: Callable[[], Awaitable[object]]
+    seq: int
+    enqueued_at: float
+    result: object = field(default=None)  # что вернул send, после drain; упал — False
+    error: Optional[str] = field(default=None)  # почему send упал
+
+
+class DeliveryQueue:
+    """Сообщения рассылки с классами срочности; drain отправляет их по одному."""
+
+    def __init__(self, per_chat_order: str = 'fifo', clock: Callable[[], float] = time.monotonic):
+        if per_chat_order not in VALID_PER_CHAT_ORDERS:
+            raise ValueError(
+                f"DELIVERY_QUEUE['PER_CHAT_ORDER'] должен быть одним из "
+                f"{sorted(VALID_PER_CHAT_ORDERS)}, получено: {per_chat_order!r}"
+            )
+        self.per_chat_order = per_chat_order
+        self.clock = clock
+        self.waits: Dict[str, List[float]] = {name: [] for name in PRIORITY_NAMES.values()}
+        self._seq = itertools.count()
+        self._size = 0
+        # priority: куча (срочность, номер); fifo: очереди чатов и куча чатов по рангу
+        self._heap: List[Tuple[int, int, Delivery]] = []
+        self._chats: Dict[object, List[Delivery]] = {}
+        self._chat_heap: List[Tuple[Tuple[int, int], int, object]] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    def put(self, priority: int, chat_id, send: Callable[[], Awaitable[object]]) -> Delivery:
+        delivery = Delivery(priority, chat_id, send, next(self._seq), self.clock())
+        self._size += 1
+        if self.per_chat_order == 'priority':
+            heapq.heappush(self._heap, (priority, delivery.seq, delivery))
+        else:
+            self._chats.setdefault(chat_id, []).append(delivery)
+            self._push_chat(chat_id)
+        return delivery
+
+    def _chat_rank(self, chat_id) -> Tuple[int, int]:
+        """Чат идёт по самому срочному, что в нём ждёт; при равенстве — кто раньше встал."""
+        pending = self._chats[chat_id]
+        return min(delivery.priority for delivery in pending), pending[0].seq
+
+    def _push_chat(self, chat_id) -> None:
+        heapq.heappush(self._chat_heap, (self._chat_rank(chat_id), next(self._seq), chat_id))
+
+    def _pop(self) -> Delivery:
+        self._size -= 1
+        if self.per_chat_order == 'priority':
+            return heapq.heappop(self._heap)[2]
+        while True:
+            rank, _, chat_id = heapq.heappop(self._chat_heap)
+            pending = self._chats.get(chat_id)
+            # ранг устарел: в чат с тех пор добавили или из него уже отправили
+            if pending and rank == self._chat_rank(chat_id):
+                break
+        delivery = pending.pop(0)
+        if pending:
+            self._push_chat(chat_id)
+        else:
+            del self._chats[chat_id]
+        return delivery
+
+    async def drain(self) -> List[Delivery]:
+        """Отправляет всё, что в очереди; возвращает неудачные.
+
+        Ошибка одного сообщения — в лог, остальные всё равно уходят.
+        """
+        failed = []
+        while self._size:
+            delivery = self._pop()
+            self.waits[PRIORITY_NAMES[delivery.priority]].append(self.clock() - delivery.enqueued_at)
+            try:
+                delivery.result = await delivery.send()
+            except Exception as e:
+                logger.error("Delivery to %s (%s) failed: %s", delivery.chat_id, PRIORITY_NAMES[delivery.priority], e)
+                delivery.result = False
+                delivery.error = str(e)
+                failed.append(delivery)
+        return failed
+
+    def wait_stats(self) -> Dict[str, dict]:
+        """Ожидание в очереди по классам: сколько сообщений, медиана и максимум, мс."""
+        stats = {}
+        for name, waits in self.waits.items():
+            if not waits:
+                continue
+            ordered = sorted(waits)
+            stats[name] = {
+                'count': len(ordered),
+                'p50_ms': round(ordered[len(ordered) // 2] * 1000, 1),
+                'max_ms': round(ordered[-1] * 1000, 1),
+            }
+        return stats
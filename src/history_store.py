@@ -0,0 +1,91 @@
+"""История проекты × даты на диске: память процесса отображается на файл, а не читается.
+
+matrix.bin — int32 по строке на дату (строка = все проекты в порядке листа),
+index.json — имена проектов, даты по возрастанию и watermark (последняя дата).
+Новые даты добавляются в конец, последние даты (ещё меняются в листе) перечитываются.
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FORMAT_VERSION = 1
+_MATRIX_FILE = 'matrix.bin'
+_INDEX_FILE = 'index.json'
+
+
+@dataclass
+class StoredHistory:
+    names: List[str]
+    dates: List[date]
+    matrix: np.ndarray  # memmap: даты × проекты, int32, только чтение
+
+    @property
+    def watermark(self) -> Optional[date]:
+        return self.dates[-1] if self.dates else None
+
+
+class HistoryStore:
+    """Папка с matrix.bin и index.json. Битые или недописанные файлы — как пустое хранилище."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.matrix_path = os.path.join(directory, _MATRIX_FILE)
+        self.index_path = os.path.join(directory, _INDEX_FILE)
+
+    def load(self) -> Optional[StoredHistory]:
+        try:
+            with open(self.index_path, encoding='utf-8') as file:
+                index = json.load(file)
+            if index.get('version') != HISTORY_FORMAT_VERSION:
+                return None
+            names = index['names']
+            dates = [date.fromisoformat(text) for text in index['dates']]
+            shape = (len(dates), len(names))
+            expected_size = shape[0] * shape[1] * np.dtype(np.int32).itemsize
+            if os.path.getsize(self.matrix_path) != expected_size:
+                logger.warning("History matrix does not match its index, rebuilding")
+                return None
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"History store {self.directory} is unreadable, rebuilding: {e}")
+            return None
+
+        if expected_size == 0:
+            matrix = np.zeros(shape, dtype=np.int32)
+        else:
+            matrix = np.memmap(self.matrix_path, dtype=np.int32, mode='r', shape=shape)
+        return StoredHistory(names, dates, matrix)
+
+    def save(self, names: List[str], dates: List[date], rows: np.ndarray, keep: int = 0) -> StoredHistory:
+        """Первые keep дат из текущего файла + rows (даты × проекты) → новый файл и индекс.
+
+        Файл пишется рядом и подменяется os.replace: процесс, у которого старый файл
+        отображён в память, дочитает свою версию. Индекс подменяется последним;
+        если процесс упал между подменами, размер файла не сойдётся с индексом и load вернёт None.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        stored = self.load() if keep else None
+        temporary = f"{self.matrix_path}.tmp"
+        with open(temporary, 'wb') as file:
+            if stored is not None:
+                file.write(np.ascontiguousarray(stored.matrix[:keep]).tobytes())
+            file.write(np.ascontiguousarray(rows, dtype=np.int32).tobytes())
+        os.replace(temporary, self.matrix_path)
+
+        temporary = f"{self.index_path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({
+                'version': HISTORY_FORMAT_VERSION,
+                'names': names,
+                'dates': [value.isoformat() for value in dates],
+            }, file, ensure_ascii=False)
+        os.replace(temporary, self.index_path)
+        return self.load()
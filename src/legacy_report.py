@@ -0,0 +1,159 @@
+"""Старый текстовый отчёт (REPORTS_MESSAGE_FORMAT = "legacy") для sendMessage.
+
+Текст собирается одним join по шаблонам из config.MESSAGES,
+а длинный отчёт режется на минимум сообщений по 4096 символов,
+не разрывая Markdown-разметку (*жирный*, _курсив_, `код`, [ссылка](url)).
+"""
+
+from typing import Iterable, List, Optional
+
+# Лимит sendMessage на длину текста после разбора разметки; считаем с запасом по исходнику
+TELEGRAM_MESSAGE_MAX_CHARS = 4096
+
+# Самый длинный маркер — ```; при разрезе закрываем его в конце и открываем в начале
+_ENTITY_RESERVE = 6
+
+
+def render_projects_text(template: str, projects: Iterable[dict]) -> str:
+    """Блоки SECONDARY_PROJECT_FORMAT для всех проектов одним join."""
+    return "".join([template.format_map(project) for project in projects])
+
+
+def render_tariff_warning(template: str, projects: Iterable[dict]) -> str:
+    """PROJECTS_TO_DISABLE / PROJECTS_TO_REDUCE со списком проектов; без проектов — пусто."""
+    projects_list = '\n'.join([
+        f"*{project['name']}* - остаток: {project['remaining']}" for project in projects
+    ])
+    if not projects_list:
+        return ""
+    return template.format(projects_list=projects_list)
+
+
+def render_anomalies_warning(template: str, anomalies: Iterable[dict], label: str = "Сегодня") -> str:
+    """ANOMALIES со списком проектов: проверенный день (label) против обычного; без аномалий — пусто."""
+    projects_list = '\n'.join([
+        f"*{project['name']}* - {label.lower()}: {project['value']}, обычно: {project['median']:g}"
+        for project in anomalies
+    ])
+    if not projects_list:
+        return ""
+    return template.format(projects_list=projects_list)
+
+
+def _open_entity(text: str) -> Optional[str]:
+    """Какой Markdown-маркер остался незакрытым к концу text (None — всё закрыто)."""
+    entity = None
+    index = 0
+    length = len(text)
+    while index < length:
+        if entity == "```":
+            if text.startswith("```", index):
+                entity = None
+                index += 3
+            else:
+                index += 1
+            continue
+        character = text[index]
+        if entity == "`":
+            if character == "`":
+                entity = None
+            index += 1
+            continue
+        if character == "\\" and entity is None:
+            index += 2  # экранированный символ разметку не открывает
+            continue
+        if entity is None and text.startswith("```", index):
+            entity = "```"
+            index += 3
+            continue
+        if character in "*_`":
+            if entity is None:
+                entity = character
+            elif entity == character:
+                entity = None
+        index += 1
+    return entity
+
+
+def _safe_cut(line: str, limit: int) -> int:
+    """Где резать слишком длинную строку: по пробелу и не внутри [ссылки](url)."""
+    cut = line.rfind(" ", 0, limit)
+    if cut <= 0:
+        cut = limit
+    link_start = line.rfind("[", 0, cut)
+    if link_start > 0:
+        link_end = line.find(")", link_start)
+        if link_end >= cut:
+            cut = link_start
+    if cut > 0 and line[cut - 1] == "\\":
+        cut -= 1  # не отрываем обратный слэш от экранируемого символа
+    return cut if cut > 0 else limit
+
+
+def _split_long_line(line: str, limit: int) -> List[str]:
+    pieces = []
+    while len(line) > limit:
+        cut = _safe_cut(line, limit)
+        pieces.append(line[:cut])
+        line = line[cut:]
+    pieces.append(line)
+    return pieces
+
+
+def split_markdown_message(
+    text: str,
+    limit: int = TELEGRAM_MESSAGE_MAX_CHARS,
+    markdown: bool = True,
+) -> List[str]:
+    """Режет текст на минимум сообщений не длиннее limit.
+
+    Режем по строкам, жадно набивая каждое сообщение; строку длиннее лимита —
+    по пробелу. Если на разрезе осталась открытая разметка (*, _, `, ```),
+    закрываем её в конце сообщения и открываем заново в начале следующего.
+    """
+    if len(text) <= limit:
+        return [text] if text else []
+
+    budget = limit - _ENTITY_RESERVE if markdown else limit
+    pieces: List[str] = []
+    lines = text.split("\n")
+    for number, line in enumerate(lines):
+        if number < len(lines) - 1:
+            line += "\n"
+        if len(line) > budget:
+            pieces.extend(_split_long_line(line, budget))
+        else:
+            pieces.append(line)
+
+    messages: List[str] = []
+    current: List[str] = []
+    current_length = 0
+    reopen = ""
+
+    def flush():
+        nonlocal current, current_length, reopen
+        chunk = reopen + "".join(current).strip("\n")
+        reopen = ""
+        if markdown:
+            entity = _open_entity(chunk)
+            if entity:
+                chunk += entity
+                reopen = entity
+        if chunk.strip():
+            messages.append(chunk)
+        current = []
+        current_length = len(reopen)
+
+    for piece in pieces:
+        if current and current_length + len(piece) > budget:
+            flush()
+        current.append(piece)
+        current_length += len(piece)
+    if current:
+        flush()
+    return messages
+
+
+def strip_markdown(text: str) -> str:
+    """Текст без разметки — для повторной отправки, если Telegram не принял Markdown."""
+    return text.replace("*", "").replace("_", "").replace("`", "")
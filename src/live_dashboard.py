@@ -0,0 +1,171 @@
+"""Живой отчёт: одно закреплённое Rich-сообщение на чат, которое бот правит на месте.
+
+Вместо новой таблицы на каждый /secondary и cron — editMessageText по уже
+закреплённому сообщению. Одинаковый текст не отправляем вовсе, правки в один чат
+не чаще min_edit_interval: пришедшие в это окно сливаются в одну, с последними цифрами.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from src import rich_report
+
+logger = logging.getLogger(__name__)
+
+# Ответы editMessageText, после которых править нечего: шлём и закрепляем новое сообщение
+_LOST_MESSAGE_ERRORS = (
+    "message to edit not found",
+    "message can't be edited",
+    "message_id_invalid",
+)
+_NOT_MODIFIED_ERROR = "message is not modified"
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class LiveDashboard:
+    """message_id закрепа, хэш текста и время последней правки по каждому чату.
+
+    state_file — JSON, чтобы закреп переживал перезапуск бота и был общим с cron.
+    Перед каждой правкой чат перечитывается из файла: cron мог закрепить новое сообщение.
+    None — только в памяти.
+    """
+
+    def __init__(
+        self,
+        bot,
+        state_file: Optional[str] = None,
+        min_edit_interval: float = 3.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.bot = bot  # aiogram Bot: токен для Rich API и pin_chat_message
+        self.state_file = state_file
+        self.min_edit_interval = min_edit_interval
+        self.clock = clock
+        self.state: Dict[int, dict] = self._load_state()
+        self._pending: Dict[int, str] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    @classmethod
+    def from_config(cls, bot, settings: dict) -> "LiveDashboard":
+        return cls(
+            bot,
+            state_file=settings.get('STATE_FILE'),
+            min_edit_interval=settings['MIN_EDIT_INTERVAL'],
+        )
+
+    def _load_state(self) -> Dict[int, dict]:
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, encoding="utf-8") as file:
+                return {int(chat_id): entry for chat_id, entry in json.load(file).items()}
+        except (OSError, ValueError) as e:
+            logger.warning("Live dashboard state %s is unreadable, starting over: %s", self.state_file, e)
+            return {}
+
+    def _refresh(self, chat_id: int) -> Optional[dict]:
+        """Запись чата из state_file (её мог обновить другой процесс), иначе из памяти."""
+        if self.state_file:
+            entry = self._load_state().get(chat_id)
+            if entry is not None:
+                self.state[chat_id] = entry
+        return self.state.get(chat_id)
+
+    def _save_state(self) -> None:
+        if not self.state_file:
+            return
+        temporary = f"{self.state_file}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({str(chat_id): entry for chat_id, entry in self.state.items()}, file)
+        os.replace(temporary, self.state_file)
+
+    def _remember(self, chat_id: int, message_id: int, text: str) -> None:
+        if self.state_file:
+            # не затираем закрепы, которые другой процесс сохранил для других чатов
+            self.state.update(self._load_state())
+        self.state[chat_id] = {
+            'message_id': message_id,
+            'digest': text_digest(text),
+            'edited_at': self.clock(),
+        }
+        self._save_state()
+
+    async def publish(self, chat_id: int, text: str) -> str:
+        """Показывает text в живом сообщении чата.
+
+        Возвращает, что произошло: sent — новое сообщение и закреп, edited — правка,
+        unchanged — текст тот же, scheduled — правка уже ждёт окна и возьмёт этот текст.
+        """
+        chat_id = int(chat_id)
+        if chat_id in self._pending:
+            self._pending[chat_id] = text
+            return "scheduled"
+
+        lock = self._locks.setdefault(chat_id, asyncio.Lock())
+        async with lock:
+            entry = self._refresh(chat_id)
+            if entry is None:
+                return await self._send_new(chat_id, text)
+            if entry['digest'] == text_digest(text):
+                return "unchanged"
+
+            wait = entry['edited_at'] + self.min_edit_interval - self.clock()
+            if wait > 0:
+                self._pending[chat_id] = text
+                try:
+                    await asyncio.sleep(wait)
+                finally:
+                    text = self._pending.pop(chat_id)
+                entry = self._refresh(chat_id)
+                if entry['digest'] == text_digest(text):
+                    return "unchanged"
+            return await self._edit(chat_id, entry['message_id'], text)
+
+    async def _edit(self, chat_id: int, message_id: int, text: str) -> str:
+        try:
+            await asyncio.to_thread(
+                rich_report.edit_rich_telegram_message,
+                self.bot.token,
+                chat_id,
+                message_id,
+                text,
+            )
+        except RuntimeError as e:
+            description = str(e).lower()
+            if any(error in description for error in _LOST_MESSAGE_ERRORS):
+                logger.info("Live message %s in chat %s is gone, sending a new one", message_id, chat_id)
+                return await self._send_new(chat_id, text)
+            if _NOT_MODIFIED_ERROR not in description:
+                raise
+        self._remember(chat_id, message_id, text)
+        return "edited"
+
+    async def _send_new(self, chat_id: int, text: str) -> str:
+        message_id = await asyncio.to_thread(
+            rich_report.send_rich_telegram_message,
+            self.bot.token,
+            chat_id,
+            text,
+        )
+        if message_id is None:
+            logger.warning("sendRichMessage returned no message_id, live message in chat %s not saved", chat_id)
+            return "sent"
+        try:
+            await self.bot.pin_chat_message(
+                chat_id=chat_id,
+                message_id=message_id,
+                disable_notification=True,
+            )
+        except Exception as e:
+            # без прав на закреп сообщение всё равно правится — просто не наверху
+            logger.warning("Cannot pin live message in chat %s: %s", chat_id, e)
+        self._remember(chat_id, message_id, text)
+        return "sent"
@@ -0,0 +1,120 @@
+"""Логирование бота и cron-скрипта без записи на диск из event loop.
+
+Логгеры кладут записи в очередь (QueueHandler), в файл и консоль их пишет
+отдельный поток QueueListener. Файл ротируется по размеру. JSON-формат
+добавляет поля из extra: chat_id, stage, duration_ms и т.п.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Атрибуты, которые есть у любой LogRecord; всё остальное пришло через extra
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись — одна строка JSON: ts, level, logger, message и поля из extra."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def setup_logging(
+    log_file: Optional[str] = None,
+    json_format: bool = False,
+    level: str = 'INFO',
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+) -> logging.handlers.QueueListener:
+    """Корневой логгер → очередь → поток с консолью и (если задан log_file) ротируемым файлом.
+
+    Повторный вызов заменяет прежнюю настройку. Очередь дописывается при выходе из процесса.
+    """
+    global _listener
+    stop_logging()
+
+    formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding='utf-8',
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging() -> None:
+    """Дописывает очередь и останавливает поток; закрывает файлы."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+def setup_logging_from_config(settings: dict, log_file: Optional[str]) -> logging.handlers.QueueListener:
+    return setup_logging(
+        log_file=log_file,
+        json_format=settings['JSON'],
+        level=settings['LEVEL'],
+        max_bytes=settings['MAX_BYTES'],
+        backup_count=settings['BACKUP_COUNT'],
+    )
+
+
+@contextmanager
+def log_stage(logger: logging.Logger, stage: str, **fields):
+    """Пишет, сколько длился этап: «stage done in N ms» с stage, duration_ms и fields в extra."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(
+            "%s done in %.1f ms",
+            stage,
+            duration_ms,
+            extra={'stage': stage, 'duration_ms': duration_ms, **fields},
+        )
+
+
+atexit.register(stop_logging)
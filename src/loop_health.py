@@ -0,0 +1,145 @@
+"""Здоровье event loop бота: uvloop по желанию, задержка цикла и стек того, кто его держит.
+
+- run() запускает корутину на uvloop (LOOP_HEALTH['UVLOOP'], если пакет стоит) или на
+  обычном цикле; с DEBUG — режим отладки asyncio, он сам пишет в лог колбэки дольше
+  SLOW_CALLBACK секунд.
+- LoopMonitor раз в SAMPLE_INTERVAL засыпает и смотрит, насколько проснулся позже:
+  это задержка цикла, её перцентили — в лог и в /traces.
+- Сторожевой поток видит, что цикл не отзывался дольше BLOCK_THRESHOLD, и пишет стек
+  потока цикла: видно, какой синхронный вызов (generate_secondary_report,
+  requests.post не в потоке) его держит.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def loop_factory(use_uvloop: bool):
+    """Фабрика цикла: uvloop, если просили и он установлен, иначе None — обычный цикл."""
+    if not use_uvloop:
+        return None
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("LOOP_HEALTH['UVLOOP'] включён, но uvloop не установлен — обычный цикл")
+        return None
+    return uvloop.new_event_loop
+
+
+async def _with_slow_callback(coroutine, slow_callback: float):
+    asyncio.get_running_loop().slow_callback_duration = slow_callback
+    return await coroutine
+
+
+def run(coroutine, settings: dict):
+    """asyncio.run с настройками LOOP_HEALTH."""
+    factory = loop_factory(settings['UVLOOP'])
+    main = _with_slow_callback(coroutine, settings['SLOW_CALLBACK'])
+    if hasattr(asyncio, 'Runner'):
+        with asyncio.Runner(debug=settings['DEBUG'], loop_factory=factory) as runner:
+            return runner.run(main)
+    # Python < 3.11: без Runner цикл выбирается политикой
+    if factory is not None:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(main, debug=settings['DEBUG'])
+
+
+def percentiles_ms(samples) -> Dict[str, float]:
+    """p50/p95/p99/max выборки секунд, в миллисекундах."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def at(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 1)
+
+    return {'p50': at(0.5), 'p95': at(0.95), 'p99': at(0.99), 'max': round(ordered[-1] * 1000, 1)}
+
+
+class LoopMonitor:
+    """Сэмплер задержки цикла и сторожевой поток. start()/stop() — из работающего цикла."""
+
+    def __init__(
+        self,
+        interval: float,
+        block_threshold: float,
+        samples: int = 1200,
+        log_interval: Optional[float] = None,
+    ):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.log_interval = log_interval
+        self.lags = deque(maxlen=samples)
+        self.blocks = 0  # сколько раз цикл стоял дольше порога
+        self.heartbeat = time.monotonic()
+        self._loop_thread_id = None
+        self._task = None
+        self._stop = threading.Event()
+        self._watchdog = None
+
+    @classmethod
+    def from_config(cls, settings: dict) -> "LoopMonitor":
+        return cls(
+            settings['SAMPLE_INTERVAL'],
+            settings['BLOCK_THRESHOLD'],
+            settings['SAMPLES'],
+            settings['LOG_INTERVAL'],
+        )
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=self.interval + self.block_threshold)
+
+    def percentiles(self) -> Dict[str, float]:
+        return percentiles_ms(self.lags)
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        logged_at = loop.time()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            self.lags.append(max(0.0, now - started - self.interval))
+            self.heartbeat = time.monotonic()
+            if self.log_interval and now - logged_at >= self.log_interval:
+                logger.info("Event loop lag, ms: %s; blocked: %s", self.percentiles(), self.blocks)
+                logged_at = now
+
+    def _watch(self) -> None:
+        """Поток-сторож: цикл не отметился дольше порога — стек его потока в лог, раз на остановку."""
+        reported = None
+        while not self._stop.wait(self.block_threshold / 2):
+            heartbeat = self.heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled < self.block_threshold or reported == heartbeat:
+                continue
+            reported = heartbeat
+            self.blocks += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else '(нет стека)'
+            logger.warning("Event loop blocked for %.2fs, loop thread stack:\n%s", stalled, stack)
@@ -0,0 +1,131 @@
+"""Память бота-демона: RSS против бюджета и, по желанию, что растёт по tracemalloc.
+
+Бот под systemd живёт неделями: каждый отчёт — полная сетка values, словари
+проектов и готовые строки, плюс своё состояние у aiogram. Раз в INTERVAL секунд
+MemoryGuard.check():
+- сверяет RSS процесса с RSS_BUDGET_MB; перешли бюджет — одно предупреждение
+  (в ADMIN_CHAT_ID), следующее — только после того, как RSS опустится ниже;
+- с TRACEMALLOC снимает снимок аллокаций и пишет в лог TOP строк, выросших
+  сильнее всего с прошлого снимка.
+"""
+
+import asyncio
+import logging
+import os
+import tracemalloc
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MIB = 1024 * 1024
+
+
+def rss_bytes() -> Optional[int]:
+    """Текущий RSS процесса из /proc; без /proc (не Linux) — None.
+
+    Пиковый ru_maxrss не годится: он не уменьшается, и бюджет после первого
+    превышения не взводился бы снова.
+    """
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def top_growth(previous, current, limit: int) -> List[str]:
+    """Строки кода, у которых аллокации выросли сильнее всего между снимками."""
+    stats = current.compare_to(previous, 'lineno')
+    return [str(stat) for stat in stats[:limit] if stat.size_diff > 0]
+
+
+class MemoryGuard:
+    """Проверка памяти по MEMORY_GUARD; alert(text) — куда слать превышение бюджета."""
+
+    def __init__(
+        self,
+        settings: dict,
+        alert: Optional[Callable[[str], Awaitable[object]]] = None,
+        rss: Callable[[], Optional[int]] = rss_bytes,
+    ):
+        self.budget = settings['RSS_BUDGET_MB'] * MIB if settings['RSS_BUDGET_MB'] else None
+        self.trace = settings['TRACEMALLOC']
+        self.frames = settings['TRACEMALLOC_FRAMES']
+        self.top = settings['TOP']
+        self.alert = alert
+        self.rss = rss
+        self.over_budget = False
+        self.last_rss = None
+        self.last_growth: List[str] = []
+        self._snapshot = None
+
+    def start(self) -> None:
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def stop(self) -> None:
+        if self.trace and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._snapshot = None
+
+    def snapshot_growth(self) -> List[str]:
+        """Новый снимок tracemalloc и рост с прошлого; первый снимок — точка отсчёта."""
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+        previous, self._snapshot = self._snapshot, snapshot
+        if previous is None:
+            return []
+        self.last_growth = top_growth(previous, snapshot, self.top)
+        return self.last_growth
+
+    async def check(self) -> Optional[str]:
+        """Один обход; возвращает текст предупреждения, если бюджет только что превышен."""
+        if self.trace:
+            # снимок на большом heap — десятки мс, не в event loop
+            growth = await asyncio.to_thread(self.snapshot_growth)
+            if growth:
+                logger.info("Top memory growth since last snapshot:\n%s", '\n'.join(growth))
+
+        self.last_rss = self.rss()
+        if self.budget is None or self.last_rss is None:
+            return None
+        if self.last_rss < self.budget:
+            if self.over_budget:
+                logger.info("RSS back under budget: %.0f MiB", self.last_rss / MIB)
+            self.over_budget = False
+            return None
+        if self.over_budget:
+            return None
+
+        self.over_budget = True
+        text = (
+            f"⚠️ Бот занимает {self.last_rss / MIB:.0f} МБ памяти "
+            f"при бюджете {self.budget / MIB:.0f} МБ"
+        )
+        if self.last_growth:
+            text += "\n\nРастёт сильнее всего:\n" + '\n'.join(self.last_growth[:5])
+        logger.warning(text)
+        if self.alert is not None:
+            try:
+                await self.alert(text)
+            except Exception as e:
+                logger.error(f"Memory alert not sent: {e}")
+        return text
+
+    async def run(self, interval: float) -> None:
+        """Проверки раз в interval секунд, пока задачу не отменят."""
+        self.start()
+        try:
+            while True:
+                await self.check()
+                await asyncio.sleep(interval)
+        finally:
+            self.stop()
+
+    def summary(self) -> str:
+        rss = f"{self.last_rss / MIB:.0f} МБ" if self.last_rss is not None else "нет данных"
+        budget = f"{self.budget / MIB:.0f} МБ" if self.budget is not None else "не задан"
+        return f"Память: RSS {rss}, бюджет {budget}"
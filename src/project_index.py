@@ -0,0 +1,109 @@
+"""Поиск проекта по имени для /project и inline-режима.
+
+Индекс строится один раз по уже разобранному отчёту: код [LRn] → проекты,
+отсортированные ключи для поиска по префиксу и триграммы для запросов
+из середины названия или с неточным порядком слов.
+"""
+
+import re
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Set
+
+# [LR12], [lr 12], LR12 — код проекта в начале названия
+_CODE_RE = re.compile(r'\[\s*([^\W\d_]+)\s*(\d+)\s*\]')
+_BARE_CODE_RE = re.compile(r'\[?\s*([^\W\d_]+)\s*(\d+)\s*\]?')
+_SPACES_RE = re.compile(r'\s+')
+
+# Доля совпавших триграмм запроса, ниже которой проект не показываем
+TRIGRAM_MIN_SCORE = 0.5
+
+
+def normalize(text: str) -> str:
+    """Для сравнения: регистр, ё→е, лишние пробелы."""
+    return _SPACES_RE.sub(' ', str(text).casefold().replace('ё', 'е')).strip()
+
+
+def project_code(text: str, bare: bool = False):
+    """'[LR12] Альфа' → 'lr12'. bare=True — запрос целиком вида 'LR12' или 'lr 12'."""
+    match = (_BARE_CODE_RE.fullmatch if bare else _CODE_RE.search)(normalize(text))
+    if not match:
+        return None
+    return f"{match.group(1)}{int(match.group(2))}"
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class ProjectIndex:
+    """Проекты отчёта с поиском: код, префикс имени (с кодом и без), триграммы."""
+
+    def __init__(self, projects: List[dict]):
+        self.projects = list(projects)
+        self.by_code: Dict[str, List[int]] = {}
+        self.by_trigram: Dict[str, List[int]] = {}
+        keys = []
+        for number, project in enumerate(self.projects):
+            name = normalize(project['name'])
+            code = project_code(name)
+            if code:
+                self.by_code.setdefault(code, []).append(number)
+            keys.append((name, number))
+            without_code = _CODE_RE.sub('', name).strip()
+            if without_code and without_code != name:
+                keys.append((without_code, number))
+            for trigram in trigrams(name):
+                self.by_trigram.setdefault(trigram, []).append(number)
+        keys.sort()
+        self._keys = [key for key, _ in keys]
+        self._key_projects = [number for _, number in keys]
+
+    def __len__(self):
+        return len(self.projects)
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """Проекты по запросу: сначала точный код, потом префикс, потом похожие."""
+        text = normalize(query)
+        if not text:
+            return []
+        found: List[int] = []
+        seen: Set[int] = set()
+
+        def add(number):
+            if number not in seen:
+                seen.add(number)
+                found.append(number)
+
+        code = project_code(text) or project_code(text, bare=True)
+        for number in self.by_code.get(code, ()):
+            add(number)
+
+        position = bisect_left(self._keys, text)
+        while (
+            len(found) < limit
+            and position < len(self._keys)
+            and self._keys[position].startswith(text)
+        ):
+            add(self._key_projects[position])
+            position += 1
+
+        if len(found) < limit and len(text) >= 3:
+            query_trigrams = trigrams(text)
+            scores = Counter()
+            for trigram in query_trigrams:
+                scores.update(self.by_trigram.get(trigram, ()))
+            ranked = sorted(
+                (
+                    (-count / len(query_trigrams), len(self.projects[number]['name']), number)
+                    for number, count in scores.items()
+                    if count / len(query_trigrams) >= TRIGRAM_MIN_SCORE
+                ),
+            )
+            for _, _, number in ranked:
+                if len(found) >= limit:
+                    break
+                add(number)
+
+        return [self.projects[number] for number in found[:limit]]
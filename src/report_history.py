@@ -0,0 +1,154 @@
+"""Отчёт за период: сколько каждый проект получил с даты по дату.
+
+По снимку листа один раз строится матрица проекты × даты и её накопленные суммы
+по датам. Дальше сумма за любой период — разность двух колонок накопленных сумм,
+O(1) на проект независимо от длины периода.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.sheet_matrix import parse_int_matrix
+
+_HEADER_DATE_RE = re.compile(r'(\d{1,2})\.(\d{1,2})\.(\d{2}(?:\d{2})?)')
+_RANGE_RE = re.compile(
+    r'^\s*(\d{1,2})\.(\d{1,2})(?:\.(\d{2}(?:\d{2})?))?\s*[-–—]\s*'
+    r'(\d{1,2})\.(\d{1,2})(?:\.(\d{2}(?:\d{2})?))?\s*$'
+)
+
+
+def _full_year(text: str) -> int:
+    year = int(text)
+    return 2000 + year if year < 100 else year
+
+
+def parse_header_date(header) -> Optional[date]:
+    """'16.08.26' или '16.08.2026 (сб)' → date; не дата → None."""
+    match = _HEADER_DATE_RE.search(str(header or ''))
+    if not match:
+        return None
+    day, month, year = match.groups()
+    try:
+        return date(_full_year(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def dated_columns(headers: Sequence, data_start: int) -> List[Tuple[date, int]]:
+    """(дата, номер колонки) для заголовков-дат начиная с data_start, по возрастанию даты."""
+    dated = []
+    for position in range(data_start, len(headers)):
+        header_date = parse_header_date(headers[position])
+        if header_date is not None:
+            dated.append((header_date, position))
+    dated.sort()
+    return dated
+
+
+def parse_date_range(text: str, today: date) -> Tuple[date, date]:
+    """'01.10-15.10' или '01.10.25-15.10.25' → (с, по) включительно.
+
+    Без года — текущий год; если начало позже конца (20.12-05.01), начало в прошлом году.
+    """
+    match = _RANGE_RE.match(text or '')
+    if not match:
+        raise ValueError("Период пишется так: 01.10-15.10")
+    start_day, start_month, start_year, end_day, end_month, end_year = match.groups()
+    end_year = _full_year(end_year) if end_year else today.year
+    end = date(end_year, int(end_month), int(end_day))
+    if start_year:
+        start = date(_full_year(start_year), int(start_month), int(start_day))
+    else:
+        start = date(end_year, int(start_month), int(start_day))
+        if start > end:
+            start = date(end_year - 1, int(start_month), int(start_day))
+    if start > end:
+        raise ValueError("Начало периода позже конца")
+    return start, end
+
+
+class HistoryMatrix:
+    """Накопленные суммы по датам для активных проектов одного снимка листа.
+
+    prefix[:, k] — сумма первых k дат (по возрастанию); prefix[:, 0] = 0.
+    """
+
+    def __init__(self, dates: List[date], prefix: np.ndarray, projects: List[dict]):
+        self.dates = dates
+        self.prefix = prefix
+        self.projects = projects
+
+    @classmethod
+    def from_values(cls, values: Sequence[list], columns: dict) -> "HistoryMatrix":
+        """values листа (строка 0 — заголовки) → матрица.
+
+        columns — индексы колонок: name, status, volume, remaining, issued, data_start.
+        """
+        rows = values[1:]
+        dated = dated_columns(values[0] if values else [], columns['data_start'])
+        if dated:
+            first = min(position for _, position in dated)
+            last = max(position for _, position in dated)
+            matrix, _ = parse_int_matrix(rows, first, last - first + 1)
+            by_date = matrix[:, [position - first for _, position in dated]].T
+        else:
+            by_date = np.zeros((0, len(rows)), dtype=np.int32)
+        return cls.from_parts(rows, [header_date for header_date, _ in dated], by_date, columns)
+
+    @classmethod
+    def from_parts(
+        cls,
+        rows: Sequence[list],
+        dates: List[date],
+        by_date: np.ndarray,
+        columns: dict,
+    ) -> "HistoryMatrix":
+        """Строки проектов (хватит колонок до выдано) + числа даты × все строки, как в HistoryStore."""
+        active = [
+            number for number, row in enumerate(rows)
+            if len(row) > columns['status'] and row[columns['status']] == 'TRUE'
+        ]
+        active_rows = [rows[number] for number in active]
+        summary, _ = parse_int_matrix(
+            active_rows,
+            0,
+            max(columns['volume'], columns['remaining'], columns['issued']) + 1,
+        )
+        projects = [
+            {
+                'name': row[columns['name']] if len(row) > columns['name'] else '',
+                'total_volume': int(summary[number, columns['volume']]),
+                'tariff_remaining': int(summary[number, columns['remaining']]),
+                'total_issued': int(summary[number, columns['issued']]),
+            }
+            for number, row in enumerate(active_rows)
+        ]
+
+        prefix = np.zeros((len(active), len(dates) + 1), dtype=np.int64)
+        if dates and active:
+            prefix[:, 1:] = np.cumsum(by_date[:, active], axis=0, dtype=np.int64).T
+        return cls(dates, prefix, projects)
+
+    def range_totals(self, start: date, end: date) -> Tuple[np.ndarray, int]:
+        """Суммы по проектам за [start, end] и сколько дат периода есть в листе."""
+        low = bisect_left(self.dates, start)
+        high = bisect_right(self.dates, end)
+        if high <= low:
+            return np.zeros(len(self.projects), dtype=np.int64), 0
+        return self.prefix[:, high] - self.prefix[:, low], high - low
+
+    def range_projects(self, start: date, end: date) -> Tuple[List[dict], int]:
+        """Проекты с total и average за период; average — на дату, что есть в листе."""
+        totals, days = self.range_totals(start, end)
+        projects = []
+        for project, total in zip(self.projects, totals.tolist()):
+            projects.append({
+                **project,
+                'total': total,
+                'average': round(total / days, 1) if days else 0,
+            })
+        return projects, days
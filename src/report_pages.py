@@ -0,0 +1,142 @@
+"""Постраничный отчёт: одно сообщение с кнопками ◀/▶ вместо пачки сообщений.
+
+Страницы — те же куски, что режет build_rich_report_messages, — рендерятся один
+раз на снимок и лежат в LRU-кэше по ключу (снимок, чат, страница). Снимок —
+хэш страниц чата: тот же отчёт даёт тот же ключ. Листание — попадание в кэш и
+один editMessageText, без похода в Google.
+
+Отчёт из cron уходит другим процессом, поэтому с directory страницы ещё пишутся
+на диск: бот, не найдя страницу в памяти, читает её оттуда.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CALLBACK_PREFIX = "page"
+# Кнопка-счётчик «2/5» ничего не делает
+NOOP_CALLBACK = "page:noop"
+# callback_data присылает клиент Telegram: снимок идёт в путь файла, поэтому только hex
+_SNAPSHOT_RE = re.compile(r"[0-9a-f]{12}")
+# файлы, которые пишет ReportPages: <снимок>_<chat_id>.json
+_FILE_RE = re.compile(r"[0-9a-f]{12}_-?\d+\.json")
+
+
+def snapshot_id(pages: List[str]) -> str:
+    digest = hashlib.sha1()
+    for page in pages:
+        digest.update(page.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:12]
+
+
+def page_callback(snapshot: str, page: int) -> str:
+    return f"{CALLBACK_PREFIX}:{snapshot}:{page}"
+
+
+def parse_page_callback(data: str) -> Optional[Tuple[str, int]]:
+    """'page:<снимок>:<страница>' → (снимок, страница); не наше, счётчик или чужой снимок — None."""
+    parts = (data or "").split(":")
+    if len(parts) != 3 or parts[0] != CALLBACK_PREFIX or not parts[2].isdigit():
+        return None
+    if not _SNAPSHOT_RE.fullmatch(parts[1]):
+        return None
+    return parts[1], int(parts[2])
+
+
+def page_keyboard(snapshot: str, page: int, total: int) -> dict:
+    """reply_markup Bot API: ◀ 2/5 ▶; на краях стрелки листают по кругу."""
+    return {
+        "inline_keyboard": [[
+            {"text": "◀", "callback_data": page_callback(snapshot, (page - 1) % total)},
+            {"text": f"{page + 1}/{total}", "callback_data": NOOP_CALLBACK},
+            {"text": "▶", "callback_data": page_callback(snapshot, (page + 1) % total)},
+        ]]
+    }
+
+
+class ReportPages:
+    """LRU (снимок, чат, страница) → (текст, всего страниц) на capacity страниц.
+
+    directory — копия на диске, не больше disk_reports отчётов (файл на отчёт чата).
+    """
+
+    def __init__(self, capacity: int, directory: Optional[str] = None, disk_reports: int = 200):
+        self.capacity = capacity
+        self.directory = directory
+        self.disk_reports = disk_reports
+        self.hits = 0
+        self.misses = 0
+        self._pages: "OrderedDict[Tuple[str, int, int], Tuple[str, int]]" = OrderedDict()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def store(self, chat_id: int, pages: List[str]) -> str:
+        """Кладёт страницы отчёта чата, возвращает снимок для callback_data."""
+        snapshot = snapshot_id(pages)
+        self._remember(snapshot, chat_id, pages)
+        if self.directory:
+            self._save(snapshot, chat_id, pages)
+        return snapshot
+
+    def get(self, snapshot: str, chat_id: int, page: int) -> Optional[Tuple[str, int]]:
+        key = (snapshot, chat_id, page)
+        entry = self._pages.get(key)
+        if entry is None and self.directory:
+            pages = self._load(snapshot, chat_id)
+            if pages is not None:
+                self._remember(snapshot, chat_id, pages)
+                entry = self._pages.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._pages.move_to_end(key)
+        return entry
+
+    def _remember(self, snapshot: str, chat_id: int, pages: List[str]) -> None:
+        for page, text in enumerate(pages):
+            self._pages[(snapshot, chat_id, page)] = (text, len(pages))
+            self._pages.move_to_end((snapshot, chat_id, page))
+        while len(self._pages) > self.capacity:
+            self._pages.popitem(last=False)
+
+    def _path(self, snapshot: str, chat_id: int) -> str:
+        return os.path.join(self.directory, f"{snapshot}_{chat_id}.json")
+
+    def _save(self, snapshot: str, chat_id: int, pages: List[str]) -> None:
+        path = self._path(snapshot, chat_id)
+        temporary = f"{path}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as file:
+                json.dump(pages, file, ensure_ascii=False)
+            os.replace(temporary, path)
+            self._prune()
+        except OSError as e:
+            logger.warning("Report pages %s not saved: %s", path, e)
+
+    def _prune(self) -> None:
+        """На диске — не больше disk_reports своих файлов, старые удаляются первыми."""
+        paths = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if _FILE_RE.fullmatch(name)
+        ]
+        if len(paths) <= self.disk_reports:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self.disk_reports]:
+            os.remove(path)
+
+    def _load(self, snapshot: str, chat_id: int) -> Optional[List[str]]:
+        try:
+            with open(self._path(snapshot, chat_id), encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
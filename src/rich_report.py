@@ -5,18 +5,27 @@
 """
 
 from datetime import date
-from typing import Dict, Iterable, List, Optional, Tuple
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 import requests
 
+from src import tracing
+
 # Лимиты официального Rich Message API
 RICH_MESSAGE_MAX_BYTES = 32768
 RICH_TABLE_MAX_DATA_ROWS = 498
 
+# Адрес Bot API. Бенчмарки подменяют его на локальный фейковый сервер.
+TELEGRAM_API_URL = "https://api.telegram.org"
+
 VALID_MESSAGE_FORMATS = {"legacy", "rich"}
 
 # Одна строка отчёта: имя, сегодня, использовано, лимит, остаток
-ReportRow = Tuple[str, int, Optional[int], Optional[int], Optional[int]]
+BaseReportRow = Tuple[str, int, Optional[int], Optional[int], Optional[int]]
+# С REPORT_DELTAS ещё вчера и Δ неделя (сегодня минус неделю назад)
+DeltaReportRow = Tuple[str, int, Optional[int], Optional[int], Optional[int], Optional[int], Optional[int]]
+ReportRow = Union[BaseReportRow, DeltaReportRow]
 
 
 def get_message_format(message_format: str) -> str:
@@ -52,14 +61,30 @@ def has_today_data(today_data: object) -> bool:
 
 
 def project_to_row(project: dict) -> ReportRow:
-    """Превращает словарь проекта из data_processor в строку Rich-таблицы."""
-    return (
+    """Превращает словарь проекта из data_processor в строку Rich-таблицы.
+
+    Если data_processor прочитал вчера и неделю назад (REPORT_DELTAS), строка длиннее.
+    """
+    row = (
         project["name"],
         int(project["today_data"]),
         project.get("total_issued"),
         project.get("total_volume"),
         project.get("tariff_remaining"),
     )
+    if "yesterday_data" not in project:
+        return row
+    week_ago = project.get("week_ago_data")
+    week_delta = row[1] - week_ago if week_ago is not None else None
+    return (*row, project["yesterday_data"], week_delta)
+
+
+def _optional(value: Optional[int]) -> str:
+    return str(value) if value is not None else "—"
+
+
+def _delta(value: Optional[int]) -> str:
+    return f"{value:+d}" if value is not None else "—"
 
 
 def group_projects_by_chat(
@@ -88,9 +113,13 @@ def group_projects_by_chat(
 
 
 def format_rich_report_message(report_date: date, rows: List[ReportRow]) -> str:
-    """Формирует одно Rich Markdown-сообщение вечернего отчёта."""
+    """Формирует одно Rich Markdown-сообщение вечернего отчёта.
+
+    Строки с вчера и Δ неделя (см. project_to_row) дают две лишние колонки.
+    """
+    with_deltas = bool(rows) and len(rows[0]) > 5
     if len(rows) == 1:
-        project_name, today_value, tariff_used, tariff_limit, remain = rows[0]
+        project_name, today_value, tariff_used, tariff_limit, remain = rows[0][:5]
         tariff = (
             f"{tariff_used if tariff_used is not None else '—'}/"
             f"{tariff_limit if tariff_limit is not None else '—'}"
@@ -101,26 +130,40 @@ def format_rich_report_message(report_date: date, rows: List[ReportRow]) -> str:
             f"| Проект | {escape_rich_table_cell(project_name)} |",
             "|:--|:--|",
             f"| Сегодня | {today_value} |",
+        ]
+        if with_deltas:
+            yesterday, week_delta = rows[0][5:]
+            lines.append(f"| Вчера | {_optional(yesterday)} |")
+            lines.append(f"| Δ неделя | {_delta(week_delta)} |")
+        lines.extend([
             f"| Тариф | {escape_rich_table_cell(tariff)} |",
             f"| Остаток | {remain if remain is not None else '—'} |",
-        ]
+        ])
         return "\n".join(lines)
 
-    lines = [
-        f"## Отчёт · {report_date.strftime('%d.%m')}",
-        "",
-        "| Проект | Сегодня | Тариф | Остаток |",
-        "|:--|--:|--:|--:|",
-    ]
-    for project_name, today_value, tariff_used, tariff_limit, remain in rows:
+    if with_deltas:
+        header = [
+            "| Проект | Сегодня | Вчера | Δ неделя | Тариф | Остаток |",
+            "|:--|--:|--:|--:|--:|--:|",
+        ]
+    else:
+        header = [
+            "| Проект | Сегодня | Тариф | Остаток |",
+            "|:--|--:|--:|--:|",
+        ]
+    lines = [f"## Отчёт · {report_date.strftime('%d.%m')}", "", *header]
+    for row in rows:
+        project_name, today_value, tariff_used, tariff_limit, remain = row[:5]
         tariff = (
             f"{tariff_used if tariff_used is not None else '—'} / "
             f"{tariff_limit if tariff_limit is not None else '—'}"
         )
+        deltas = f"{_optional(row[5])} | {_delta(row[6])} | " if with_deltas else ""
         lines.append(
             "| "
             f"{escape_rich_table_cell(project_name)} | "
             f"{today_value} | "
+            f"{deltas}"
             f"{escape_rich_table_cell(tariff)} | "
             f"{remain if remain is not None else '—'} |"
         )
@@ -164,10 +207,64 @@ def build_rich_report_messages(
     rows: List[ReportRow],
 ) -> List[str]:
     """Режет основной отчёт на несколько сообщений, если не влезает в лимит API."""
-    return _split_rich_messages(
-        rows,
-        lambda chunk: format_rich_report_message(report_date, chunk),
-    )
+    with tracing.span("build_rich_report_messages", rows=len(rows)):
+        return _split_rich_messages(
+            rows,
+            lambda chunk: format_rich_report_message(report_date, chunk),
+        )
+
+
+def format_range_report_message(
+    date_from: date,
+    date_to: date,
+    rows: List[Tuple[str, int, float, Optional[int]]],
+) -> str:
+    """Отчёт за период: проект, всего, в среднем за день, остаток."""
+    title = f"## Период · {date_from.strftime('%d.%m')}–{date_to.strftime('%d.%m')}"
+    if len(rows) == 1:
+        project_name, total, average, remain = rows[0]
+        lines = [
+            title,
+            "",
+            f"| Проект | {escape_rich_table_cell(project_name)} |",
+            "|:--|:--|",
+            f"| Всего | {total} |",
+            f"| В день | {average} |",
+            f"| Остаток | {remain if remain is not None else '—'} |",
+        ]
+        return "\n".join(lines)
+
+    lines = [
+        title,
+        "",
+        "| Проект | Всего | В день | Остаток |",
+        "|:--|--:|--:|--:|",
+    ]
+    for project_name, total, average, remain in rows:
+        lines.append(
+            f"| {escape_rich_table_cell(project_name)} | {total} | {average} | "
+            f"{remain if remain is not None else '—'} |"
+        )
+    return "\n".join(lines)
+
+
+def build_range_report_messages(
+    date_from: date,
+    date_to: date,
+    rows: List[Tuple[str, int, float, Optional[int]]],
+) -> List[str]:
+    with tracing.span("build_range_report_messages", rows=len(rows)):
+        return _split_rich_messages(
+            rows,
+            lambda chunk: format_range_report_message(date_from, date_to, chunk),
+        )
+
+
+def range_projects_to_rows(projects: Iterable[dict]) -> List[Tuple[str, int, float, Optional[int]]]:
+    return [
+        (project["name"], project["total"], project["average"], project.get("tariff_remaining"))
+        for project in projects
+    ]
 
 
 def format_disable_warning_message(rows: List[Tuple[str, int]]) -> str:
@@ -218,12 +315,47 @@ def format_reduce_warning_message(rows: List[Tuple[str, int]]) -> str:
     return "\n".join(lines)
 
 
+def format_anomalies_message(rows: List[Tuple[str, int, float, float]], label: str = "Сегодня") -> str:
+    """Таблица «аномалии»: проект, проверенный день (label), обычно (медиана истории) и z."""
+    if len(rows) == 1:
+        project_name, value, median, score = rows[0]
+        lines = [
+            "## Внимание · аномалии",
+            "",
+            f"| Проект | {escape_rich_table_cell(project_name)} |",
+            "|:--|:--|",
+            f"| {label} | {value} |",
+            f"| Обычно | {median:g} |",
+            f"| z | {score:+g} |",
+        ]
+        return "\n".join(lines)
+
+    lines = [
+        "## Внимание · аномалии",
+        "",
+        f"| Проект | {label} | Обычно | z |",
+        "|:--|--:|--:|--:|",
+    ]
+    for project_name, value, median, score in rows:
+        lines.append(
+            f"| {escape_rich_table_cell(project_name)} | {value} | {median:g} | {score:+g} |"
+        )
+    return "\n".join(lines)
+
+
 def build_disable_warning_messages(rows: List[Tuple[str, int]]) -> List[str]:
-    return _split_rich_messages(rows, format_disable_warning_message)
+    with tracing.span("build_disable_warning_messages", rows=len(rows)):
+        return _split_rich_messages(rows, format_disable_warning_message)
 
 
 def build_reduce_warning_messages(rows: List[Tuple[str, int]]) -> List[str]:
-    return _split_rich_messages(rows, format_reduce_warning_message)
+    with tracing.span("build_reduce_warning_messages", rows=len(rows)):
+        return _split_rich_messages(rows, format_reduce_warning_message)
+
+
+def build_anomalies_messages(rows: List[Tuple[str, int, float, float]], label: str = "Сегодня") -> List[str]:
+    with tracing.span("build_anomalies_messages", rows=len(rows)):
+        return _split_rich_messages(rows, partial(format_anomalies_message, label=label))
 
 
 def disable_projects_to_rows(projects: Iterable[dict]) -> List[Tuple[str, int]]:
@@ -234,20 +366,62 @@ def reduce_projects_to_rows(projects: Iterable[dict]) -> List[Tuple[str, int]]:
     return disable_projects_to_rows(projects)
 
 
-def ensure_telegram_response_ok(response) -> None:
-    """Проверяет HTTP-статус и поле ok в ответе Bot API."""
-    response.raise_for_status()
+def anomalies_to_rows(anomalies: Iterable[dict]) -> List[Tuple[str, int, float, float]]:
+    return [
+        (anomaly["name"], anomaly["value"], anomaly["median"], anomaly["score"])
+        for anomaly in anomalies
+    ]
+
+
+def ensure_telegram_response_ok(response) -> dict:
+    """Проверяет поле ok и HTTP-статус ответа Bot API, возвращает тело ответа.
+
+    Описание ошибки от Telegram ("message is not modified" и т.п.) важнее голого 400,
+    поэтому ok=false проверяем раньше статуса.
+    """
     try:
         payload = response.json()
     except (TypeError, ValueError):
         payload = None
     if isinstance(payload, dict) and payload.get("ok") is False:
         raise RuntimeError(payload.get("description") or "Telegram вернул ok=false")
+    response.raise_for_status()
+    return payload if isinstance(payload, dict) else {}
 
 
-def send_rich_telegram_message(bot_token: str, chat_id: int, text: str) -> None:
-    """Отправляет Rich Markdown через официальный sendRichMessage."""
-    url = f"https://api.telegram.org/bot{bot_token}/sendRichMessage"
+def send_rich_telegram_message(
+    bot_token: str,
+    chat_id: int,
+    text: str,
+    reply_markup: Optional[dict] = None,
+) -> Optional[int]:
+    """Отправляет Rich Markdown через официальный sendRichMessage. Возвращает message_id."""
+    url = f"{TELEGRAM_API_URL}/bot{bot_token}/sendRichMessage"
     payload = {"chat_id": chat_id, "rich_message": {"markdown": text}}
-    response = requests.post(url, json=payload, timeout=15)
-    ensure_telegram_response_ok(response)
+    if reply_markup is not None:
+        payload["reply_markup"] = reply_markup
+    with tracing.span("send_rich_telegram_message", chat_id=chat_id):
+        response = requests.post(url, json=payload, timeout=15)
+        result = ensure_telegram_response_ok(response).get("result")
+    return result.get("message_id") if isinstance(result, dict) else None
+
+
+def edit_rich_telegram_message(
+    bot_token: str,
+    chat_id: int,
+    message_id: int,
+    text: str,
+    reply_markup: Optional[dict] = None,
+) -> None:
+    """Правит уже отправленное Rich-сообщение на месте через editMessageText."""
+    url = f"{TELEGRAM_API_URL}/bot{bot_token}/editMessageText"
+    payload = {
+        "chat_id": chat_id,
+        "message_id": message_id,
+        "rich_message": {"markdown": text},
+    }
+    if reply_markup is not None:
+        payload["reply_markup"] = reply_markup
+    with tracing.span("edit_rich_telegram_message", chat_id=chat_id):
+        response = requests.post(url, json=payload, timeout=15)
+        ensure_telegram_response_ok(response)
@@ -0,0 +1,119 @@
+"""Рассылка Rich-отчёта по тысячам чатов клиентов пулом процессов.
+
+Чаты делятся на шарды примерно поровну по числу строк; каждый процесс сам
+рендерит свои таблицы и шлёт их синхронно. Общий на все процессы бюджет
+RATE_PER_SECOND держит суммарный темп в лимитах Bot API. Итоги шардов
+сводятся в один словарь для лога send_secondary_report.py.
+"""
+
+import heapq
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from src import rich_report
+
+logger = logging.getLogger(__name__)
+
+Shard = List[Tuple[int, List[rich_report.ReportRow]]]
+
+_limiter = None  # SharedRateLimiter процесса-воркера, ставит _init_worker
+
+
+class SharedRateLimiter:
+    """Не больше rate сообщений в секунду на все процессы сразу.
+
+    Общий счётчик «следующий свободный слот» в разделяемой памяти: каждый
+    acquire забирает слот и спит до него.
+    """
+
+    def __init__(self, rate: float, context=None):
+        context = context or multiprocessing.get_context()
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = context.Value('d', 0.0)
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._next_slot.get_lock():
+            now = time.monotonic()
+            slot = max(now, self._next_slot.value)
+            self._next_slot.value = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def partition_chats(rows_by_chat: Dict[int, list], shards: int) -> List[Shard]:
+    """Раскладывает чаты по шардам: самые большие — в наименее загруженный шард."""
+    shards = max(1, min(shards, len(rows_by_chat)))
+    heap = [(0, number) for number in range(shards)]
+    result: List[Shard] = [[] for _ in range(shards)]
+    ordered = sorted(rows_by_chat.items(), key=lambda item: len(item[1]), reverse=True)
+    for chat_id, rows in ordered:
+        load, number = heapq.heappop(heap)
+        result[number].append((chat_id, rows))
+        heapq.heappush(heap, (load + len(rows), number))
+    return [shard for shard in result if shard]
+
+
+def _init_worker(limiter: SharedRateLimiter, api_url: str) -> None:
+    global _limiter
+    _limiter = limiter
+    rich_report.TELEGRAM_API_URL = api_url
+
+
+def deliver_shard(bot_token: str, report_date: date, shard: Shard) -> dict:
+    """Рендерит и шлёт таблицы своих чатов. Ошибка одного чата не останавливает остальные."""
+    summary = {'chats': 0, 'messages': 0, 'failed': {}}
+    for chat_id, rows in shard:
+        try:
+            for text in rich_report.build_rich_report_messages(report_date, rows):
+                if _limiter is not None:
+                    _limiter.acquire()
+                rich_report.send_rich_telegram_message(bot_token, chat_id, text)
+                summary['messages'] += 1
+            summary['chats'] += 1
+        except Exception as e:
+            summary['failed'][chat_id] = str(e)
+    return summary
+
+
+def deliver_sharded(
+    bot_token: str,
+    report_date: date,
+    rows_by_chat: Dict[int, List[rich_report.ReportRow]],
+    workers: int,
+    rate_per_second: Optional[float],
+) -> dict:
+    """Рассылает основной отчёт по чатам пулом из workers процессов.
+
+    Возвращает сводку: chats и messages — доставлено, failed — chat_id → ошибка,
+    shards — сколько процессов работало, seconds — сколько заняло.
+    """
+    started = time.monotonic()
+    shards = partition_chats(rows_by_chat, workers)
+    summary = {'chats': 0, 'messages': 0, 'failed': {}, 'shards': len(shards)}
+    if shards:
+        # spawn: бот держит потоки и event loop, fork из такого процесса небезопасен
+        context = multiprocessing.get_context('spawn')
+        limiter = SharedRateLimiter(rate_per_second, context)
+        with ProcessPoolExecutor(
+            max_workers=len(shards),
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(limiter, rich_report.TELEGRAM_API_URL),
+        ) as pool:
+            futures = [
+                pool.submit(deliver_shard, bot_token, report_date, shard)
+                for shard in shards
+            ]
+            for future in futures:
+                shard_summary = future.result()
+                summary['chats'] += shard_summary['chats']
+                summary['messages'] += shard_summary['messages']
+                summary['failed'].update(shard_summary['failed'])
+    summary['seconds'] = round(time.monotonic() - started, 3)
+    return summary
@@ -0,0 +1,159 @@
+"""Весь лист проектов × дат в числа за один векторный проход NumPy.
+
+parse_sheet_int читает одну ячейку; для истории, прогнозов и сводов по нескольким
+листам нужна вся матрица сразу. parse_int_matrix даёт то же самое, что
+parse_sheet_int по каждой ячейке, но без Python-цикла по обычным числам.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+INT32_MIN = np.iinfo(np.int32).min
+INT32_MAX = np.iinfo(np.int32).max
+
+# Ячейки длиннее разбираем медленным путём: в дневных числах столько символов не бывает
+PLAIN_MAX_CHARS = 24
+
+
+# Длинную ячейку в матрицу не кладём: NumPy растянул бы под неё каждый элемент
+_LONG_CELL = 'x'
+
+
+def _longest(cells: list) -> int:
+    try:
+        return max(map(len, cells), default=0)
+    except TypeError:  # числа и bool из UNFORMATTED_VALUE
+        return max((len(str(cell)) for cell in cells), default=0)
+
+
+def _pad_rows(
+    rows: Sequence[list], start: int, width: int
+) -> Tuple[List[list], List[Tuple[int, str]]]:
+    """Ровный прямоугольник: срез [start, start + width), короткие строки добиваем ''.
+
+    Ячейки длиннее PLAIN_MAX_CHARS (заметки, формулы с текстом) заменяются
+    коротким мусором и возвращаются отдельно: [(плоский индекс, текст)] для медленного пути.
+    """
+    end = start + width
+    padded = []
+    long_cells = []
+    for number, row in enumerate(rows):
+        cells = row[start:end]
+        if None in cells:
+            cells = ['' if cell is None else cell for cell in cells]
+        if len(cells) < width:
+            cells = list(cells) + [''] * (width - len(cells))
+        if _longest(cells) > PLAIN_MAX_CHARS:
+            cells = list(cells)
+            for column, cell in enumerate(cells):
+                if len(str(cell)) > PLAIN_MAX_CHARS:
+                    long_cells.append((number * width + column, str(cell)))
+                    cells[column] = _LONG_CELL
+        padded.append(cells)
+    return padded, long_cells
+
+
+def _parse_float(raw: str) -> float:
+    """Медленный путь — ровно как parse_sheet_int до int(): NaN, если не число."""
+    cleaned = raw.replace('\xa0', '').replace(' ', '').strip()
+    if cleaned == '':
+        return np.nan
+    try:
+        return float(cleaned)
+    except ValueError:
+        return np.nan
+
+
+def parse_int_matrix(
+    rows: Sequence[list],
+    start: int = 0,
+    width: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """values → (int32-матрица, маска). Строки — проекты, колонки — [start, start + width).
+
+    Где mask True, значение совпадает с parse_sheet_int(row, start + j).
+    Где False — пусто, нет ячейки, мусор (parse_sheet_int вернул бы 0)
+    или число не влезает в int32.
+    """
+    if width is None:
+        width = max((len(row) - start for row in rows), default=0)
+    width = max(width, 0)
+    shape = (len(rows), width)
+    if not rows or width == 0:
+        return np.zeros(shape, dtype=np.int32), np.zeros(shape, dtype=bool)
+
+    padded, long_cells = _pad_rows(rows, start, width)
+    text = np.array(padded, dtype=str).reshape(shape)
+    numbers, parsed = _parse_plain_integers(text)
+
+    # Остальное (1.9, 1e3, юникод-цифры, мусор) — редкость, разбираем
+    # тем же float(), что и parse_sheet_int
+    flat_numbers = numbers.reshape(-1)
+    leftovers = np.flatnonzero(~parsed)
+    parsed_cells = {}  # мусор в листе повторяется: «—», «н/д», #REF!
+    for index, raw in zip(leftovers.tolist(), text.reshape(-1)[leftovers].tolist()):
+        if raw not in parsed_cells:
+            parsed_cells[raw] = _parse_float(raw)
+        flat_numbers[index] = parsed_cells[raw]
+    for index, raw in long_cells:
+        flat_numbers[index] = _parse_float(raw)
+
+    truncated = np.trunc(numbers)  # int(float(x)) режет к нулю
+    with np.errstate(invalid='ignore'):
+        mask = np.isfinite(truncated) & (truncated >= INT32_MIN) & (truncated <= INT32_MAX)
+    matrix = np.where(mask, truncated, 0).astype(np.int32)
+    return matrix, mask
+
+
+def _parse_plain_integers(text: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Целые из ASCII-цифр со знаком, пробелами и NBSP — прямо по кодам символов.
+
+    Возвращает (числа, разобрано). Пустые ячейки тоже считаются разобранными (NaN).
+    Всё, что сложнее, остаётся parsed=False для медленного пути.
+    """
+    short = np.char.str_len(text) <= PLAIN_MAX_CHARS
+    if text.dtype.itemsize // 4 > PLAIN_MAX_CHARS:
+        text = text.astype(f'<U{PLAIN_MAX_CHARS}')
+    width = text.dtype.itemsize // 4
+    numbers = np.full(text.shape, np.nan)
+    if width == 0:
+        return numbers, np.ones(text.shape, dtype=bool)
+
+    # Коды символов в uint8 (не-Latin-1 → 255, уходит в медленный путь),
+    # по строке на позицию символа: дальше все операции над плоскими массивами ячеек
+    codes = np.minimum(text.view(np.uint32).reshape(-1, width), 255).astype(np.uint8)
+    codes = np.ascontiguousarray(codes.T)
+
+    cells = codes.shape[1]
+    values = np.zeros(cells, dtype=np.int64)
+    digit_count = np.zeros(cells, dtype=np.int16)
+    sign_count = np.zeros(cells, dtype=np.int16)
+    first_code = np.zeros(cells, dtype=np.uint8)  # первый символ, кроме пробелов
+    foreign = np.zeros(cells, dtype=bool)         # буквы, точки, прочий мусор
+    for position_codes in codes:
+        is_digit = (position_codes >= 48) & (position_codes <= 57)
+        is_sign = (position_codes == 43) | (position_codes == 45)
+        is_separator = (position_codes == 0x20) | (position_codes == 0xA0) | (position_codes == 0)
+        foreign |= ~(is_digit | is_sign | is_separator)
+        first_code = np.where((first_code == 0) & ~is_separator, position_codes, first_code)
+        # схема Горнера: value = value * 10 + цифра
+        values = np.where(is_digit, values * 10 + (position_codes - 48), values)
+        digit_count += is_digit
+        sign_count += is_sign
+
+    # знак допустим один и только первым значимым символом: ' -1 234' → -1234
+    signed = (first_code == 43) | (first_code == 45)
+    plain = (
+        short.reshape(-1)
+        & ~foreign
+        & (sign_count == signed)
+        & (digit_count > 0)
+        & (digit_count <= 18)
+    )
+    values = np.where(first_code == 45, -values, values)
+
+    flat_numbers = numbers.reshape(-1)
+    flat_numbers[plain] = values[plain]
+    empty = short.reshape(-1) & (first_code == 0)
+    return numbers, (plain | empty).reshape(text.shape)
@@ -0,0 +1,116 @@
+"""Запись и воспроизведение ответов Sheets values.get для повторяемых замеров.
+
+Запись (SHEETS_CAPTURE['RECORD']): каждый ответ Google — файл NNNNNN.json в папке:
+диапазон, когда записан (по Москве), сколько шёл ответ и тело ответа как есть.
+Воспроизведение (DataProcessor.from_capture): ответы отдаются с диска по кругу
+вместо Google, «сейчас» для отчёта — время записи ответа. Разбор, сборка таблиц
+и доставка — те же, что в бою, поэтому медленный день из прода можно прогнать
+офлайн на разных версиях (python -m benchmarks.replay).
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+CAPTURE_FORMAT_VERSION = 1
+
+
+@dataclass
+class Capture:
+    range: str
+    recorded_at: datetime
+    seconds: float  # сколько шёл ответ Google, с повторами
+    response: dict
+
+    def body(self) -> bytes:
+        """Тело ответа, как его отдал бы HTTP: для потокового разбора."""
+        return json.dumps(self.response, ensure_ascii=False).encode('utf-8')
+
+
+class SheetsRecorder:
+    """Складывает ответы в directory по порядку; номер продолжает уже записанные."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._count = len(_capture_files(directory))
+
+    def record(self, range_name: str, response: dict, seconds: float, recorded_at: datetime) -> str:
+        with self._lock:
+            self._count += 1
+            path = os.path.join(self.directory, f"{self._count:06d}.json")
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({
+                'version': CAPTURE_FORMAT_VERSION,
+                'range': range_name,
+                'recorded_at': recorded_at.isoformat(),
+                'seconds': round(seconds, 6),
+                'response': response,
+            }, file, ensure_ascii=False)
+        os.replace(temporary, path)
+        return path
+
+
+def _capture_files(directory: str) -> List[str]:
+    return sorted(name for name in os.listdir(directory) if name.endswith('.json'))
+
+
+def load_captures(directory: str) -> List[Capture]:
+    """Все записи папки по порядку записи. Чужие версии формата — ValueError."""
+    captures = []
+    for name in _capture_files(directory):
+        with open(os.path.join(directory, name), encoding='utf-8') as file:
+            data = json.load(file)
+        if data.get('version') != CAPTURE_FORMAT_VERSION:
+            raise ValueError(f"{name}: неизвестная версия записи {data.get('version')}")
+        captures.append(Capture(
+            range=data['range'],
+            recorded_at=datetime.fromisoformat(data['recorded_at']),
+            seconds=data['seconds'],
+            response=data['response'],
+        ))
+    return captures
+
+
+class SheetsReplay:
+    """Отдаёт записанные ответы по диапазону, по кругу. realtime — ждать, сколько ждали Google."""
+
+    def __init__(
+        self,
+        captures: List[Capture],
+        realtime: bool = False,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if not captures:
+            raise ValueError("Нет записанных ответов Sheets")
+        self.by_range: Dict[str, List[Capture]] = {}
+        for capture in captures:
+            self.by_range.setdefault(capture.range, []).append(capture)
+        self.realtime = realtime
+        self.sleep = sleep
+        self.recorded_at: Optional[datetime] = captures[0].recorded_at
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_directory(cls, directory: str, realtime: bool = False) -> "SheetsReplay":
+        return cls(load_captures(directory), realtime=realtime)
+
+    def next(self, range_name: str) -> Capture:
+        captures = self.by_range.get(range_name)
+        if not captures:
+            raise KeyError(f"Нет записи для диапазона {range_name}")
+        with self._lock:
+            position = self._positions.get(range_name, 0)
+            self._positions[range_name] = position + 1
+        capture = captures[position % len(captures)]
+        self.recorded_at = capture.recorded_at
+        if self.realtime:
+            self.sleep(capture.seconds)
+        return capture
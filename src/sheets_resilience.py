@@ -0,0 +1,214 @@
+"""Повторы и circuit breaker для запросов к Google Sheets.
+
+Временные сбои (429, 5xx, сеть) повторяем с экспоненциальной задержкой и full jitter.
+Если Google падает подряд, breaker размыкается, и DataProcessor отдаёт
+последний удачный снимок листа с пометкой stale вместо новых запросов.
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+try:
+    from httplib2 import HttpLib2Error
+except ImportError:  # транспорт без httplib2
+    HttpLib2Error = ()
+
+
+class SheetsFetchError(Exception):
+    """Ошибка чтения листа. kind уходит в result['error_type']."""
+
+    kind = "fetch_failed"
+    retryable = False
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class SheetsRateLimitError(SheetsFetchError):
+    kind = "rate_limited"
+    retryable = True
+
+
+class SheetsServerError(SheetsFetchError):
+    kind = "server_error"
+    retryable = True
+
+
+class SheetsNetworkError(SheetsFetchError):
+    kind = "network_error"
+    retryable = True
+
+
+class SheetsClientError(SheetsFetchError):
+    """400/403/404: диапазон, права, id таблицы. Повтор не поможет."""
+
+    kind = "client_error"
+
+
+class SheetsCircuitOpenError(SheetsFetchError):
+    kind = "circuit_open"
+
+
+class SheetsEmptyError(SheetsFetchError):
+    kind = "empty"
+
+
+def _http_status(exc: BaseException) -> Optional[int]:
+    """HTTP-статус из ошибки googleapiclient (resp.status) или requests (response.status_code)."""
+    resp = getattr(exc, "resp", None)
+    status = getattr(resp, "status", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(exc: BaseException) -> SheetsFetchError:
+    """Превращает исключение транспорта в одну из ошибок SheetsFetchError."""
+    if isinstance(exc, SheetsFetchError):
+        return exc
+    status = _http_status(exc)
+    if status == 429:
+        return SheetsRateLimitError(
+            "Google Sheets: превышена квота запросов (429), попробуйте позже", status
+        )
+    if status is not None and status >= 500:
+        return SheetsServerError(f"Google Sheets временно недоступен ({status})", status)
+    if status is not None:
+        return SheetsClientError(f"Google Sheets отклонил запрос ({status}): {exc}", status)
+    if isinstance(exc, (OSError, HttpLib2Error)):
+        return SheetsNetworkError(f"Нет связи с Google Sheets: {exc}")
+    return SheetsFetchError(f"Ошибка чтения Google Sheets: {exc}")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Сколько раз пробовать и как долго ждать между попытками."""
+
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    @classmethod
+    def from_config(cls, settings: dict) -> "RetryPolicy":
+        return cls(
+            max_attempts=int(settings['MAX_ATTEMPTS']),
+            base_delay=float(settings['BASE_DELAY']),
+            max_delay=float(settings['MAX_DELAY']),
+        )
+
+    def backoff(self, attempt: int, rng: random.Random = random) -> float:
+        """Full jitter: случайно от 0 до base * 2^attempt, но не больше max_delay."""
+        return rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Размыкается после failure_threshold сбоев подряд, через reset_timeout пускает пробный запрос."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._state = self.CLOSED
+
+    @classmethod
+    def from_config(cls, settings: dict) -> "CircuitBreaker":
+        return cls(
+            failure_threshold=int(settings['FAILURE_THRESHOLD']),
+            reset_timeout=float(settings['RESET_TIMEOUT']),
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Можно ли идти в Google. В half_open пропускаем один пробный запрос."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN:
+                # пробный запрос один: остальные ждут его результата как при open
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+
+def call_with_retry(
+    func: Callable[[], object],
+    policy: RetryPolicy,
+    breaker: Optional[CircuitBreaker] = None,
+    sleep: Callable[[float], None] = time.sleep,
+    rng: random.Random = random,
+):
+    """Вызывает func с повторами. Наружу — только SheetsFetchError и его наследники."""
+    if breaker is not None and not breaker.allow():
+        raise SheetsCircuitOpenError("Google Sheets недоступен, повтор позже (circuit open)")
+
+    attempt = 0
+    while True:
+        try:
+            result = func()
+        except Exception as exc:
+            error = classify_error(exc)
+            if not error.retryable:
+                # 4xx — ответ от живого Google: для breaker это успех, иначе пробный
+                # запрос в half_open оставил бы его разомкнутым ещё на reset_timeout
+                if breaker is not None and isinstance(error, SheetsClientError):
+                    breaker.record_success()
+                raise error from exc
+            attempt += 1
+            if attempt >= policy.max_attempts:
+                if breaker is not None:
+                    breaker.record_failure()
+                raise error from exc
+            sleep(policy.backoff(attempt, rng))
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+
+class SheetSnapshot(list):
+    """values листа плюс когда их получили и не из кэша ли они (stale)."""
+
+    def __init__(self, values, fetched_at: Optional[datetime] = None, stale: bool = False):
+        super().__init__(values)
+        self.fetched_at = fetched_at
+        self.stale = stale
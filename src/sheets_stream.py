@@ -0,0 +1,112 @@
+"""Потоковый разбор ответа values.get.
+
+Ответ Sheets API — {"range": ..., "majorDimension": ..., "values": [[...], ...]}.
+Вместо json.loads всего тела читаем его кусками и отдаём строки values по одной:
+в памяти одновременно только текущий кусок и текущая строка.
+"""
+
+import codecs
+import json
+from typing import Iterable, Iterator, List
+
+_WHITESPACE = " \t\n\r"
+_DECODER = json.JSONDecoder()
+
+
+class _ChunkBuffer:
+    """Текст из потока байтов с курсором; дочитывает, когда элемент не влез."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Дочитывает следующий кусок. False — поток кончился."""
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                # прочитанное отбрасываем, чтобы буфер не рос
+                self.text = self.text[self.pos:] + text
+                self.pos = 0
+                return True
+        self.text = self.text[self.pos:] + self._decoder.decode(b"", final=True)
+        self.pos = 0
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        """Первый непробельный символ с курсора ('' — конец потока)."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, character: str) -> None:
+        found = self.peek()
+        if found != character:
+            raise ValueError(f"Ответ Sheets API: ожидали {character!r}, получили {found!r}")
+        self.pos += 1
+
+    def decode_value(self):
+        """Один JSON-элемент с курсора. Обрезан границей куска — дочитываем и пробуем снова."""
+        while True:
+            self.peek()
+            try:
+                value, end = _DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # число на границе куска могло обрезаться: "12" из "123"
+            if end == len(self.text) and not isinstance(value, (list, dict, str)) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_values_rows(chunks: Iterable[bytes]) -> Iterator[List[str]]:
+    """Строки массива values из тела ответа, по мере чтения кусков."""
+    buffer = _ChunkBuffer(chunks)
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        return
+    while True:
+        key = buffer.decode_value()
+        buffer.expect(":")
+        if key == "values":
+            buffer.expect("[")
+            if buffer.peek() == "]":
+                buffer.pos += 1
+            else:
+                while True:
+                    yield buffer.decode_value()
+                    separator = buffer.peek()
+                    buffer.pos += 1
+                    if separator == "]":
+                        break
+                    if separator != ",":
+                        raise ValueError(f"Ответ Sheets API: неожиданный символ {separator!r} в values")
+        else:
+            buffer.decode_value()
+
+        separator = buffer.peek()
+        buffer.pos += 1
+        if separator == "}":
+            return
+        if separator != ",":
+            raise ValueError(f"Ответ Sheets API: неожиданный символ {separator!r}")
+
+
+def keep_cells(rows: Iterable[list], indexes: List[int]) -> Iterator[list]:
+    """От каждой строки оставляет только ячейки indexes; нет ячейки — None."""
+    for row in rows:
+        size = len(row)
+        yield [row[index] if index < size else None for index in indexes]
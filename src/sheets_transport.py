@@ -0,0 +1,43 @@
+"""Потокобезопасный транспорт для клиента Sheets API.
+
+googleapiclient по умолчанию ходит через один httplib2.Http, а он не
+потокобезопасен: два запроса из разных потоков портят соединение. Здесь у
+каждого потока свой AuthorizedHttp: внутри потока соединение переиспользуется
+(keep-alive), между потоками ничего общего, кроме credentials — их обновление
+google-auth делает под блокировкой. gzip включает сам googleapiclient
+(accept-encoding и «(gzip)» в user-agent), маски fields задаёт DataProcessor.
+"""
+
+import threading
+from typing import Optional
+
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.http import HttpRequest
+
+# Google отдаёт gzip, только если в user-agent есть «gzip»
+SHEETS_USER_AGENT = 'Project_data_bot (gzip)'
+
+
+class ThreadLocalHttp:
+    """AuthorizedHttp на поток; build_request — requestBuilder для googleapiclient.build."""
+
+    def __init__(self, credentials, timeout: Optional[float] = None):
+        self.credentials = credentials
+        self.timeout = timeout
+        self.created = 0  # сколько соединений открыто — для тестов и логов
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def get(self) -> AuthorizedHttp:
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=self.timeout))
+            self._local.http = http
+            with self._lock:
+                self.created += 1
+        return http
+
+    def build_request(self, http, *args, **kwargs) -> HttpRequest:
+        """Общий http, что передал googleapiclient, подменяется http текущего потока."""
+        return HttpRequest(self.get(), *args, **kwargs)
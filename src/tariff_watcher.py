@@ -0,0 +1,67 @@
+"""Наблюдатель тарифов: предупреждение сразу, как проект исчерпал тариф.
+
+Бот раз в несколько минут читает только колонки имени, статуса, остатка
+и сегодняшней даты и сравнивает с прошлым опросом. Предупреждение уходит
+только по проектам, которые с прошлого опроса перешли порог: остаток ≤ 0
+(«отключить») или остаток ≤ выдано за сегодня («уменьшить лимиты»).
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DISABLE = 'disable'
+REDUCE = 'reduce'
+
+_SEVERITY = {None: 0, REDUCE: 1, DISABLE: 2}
+
+
+def tariff_level(remaining: int, today_data: int) -> Optional[str]:
+    """DISABLE — тариф исчерпан, REDUCE — остатка меньше чем на день, None — всё в порядке."""
+    if remaining <= 0:
+        return DISABLE
+    if remaining <= today_data:
+        return REDUCE
+    return None
+
+
+def warning_entry(project: dict) -> dict:
+    """Проект в виде строки предупреждения, как в generate_secondary_report."""
+    return {
+        'name': project['name'],
+        'remaining': project['tariff_remaining'],
+        'today_data': project['today_data'],
+    }
+
+
+class TariffWatcher:
+    """Уровни проектов с прошлого опроса. Первый опрос — точка отсчёта, без предупреждений."""
+
+    def __init__(self):
+        self.levels: Optional[Dict[str, Optional[str]]] = None
+
+    def update(self, projects: Iterable[dict]) -> Tuple[List[dict], List[dict]]:
+        """Новый опрос → (только что исчерпали тариф, только что ушли в «меньше чем на день»).
+
+        Проект попадает в список, если его уровень вырос. Тот же уровень — молчим;
+        уровень упал (тариф пополнили) — запоминаем, следующий рост снова предупредит.
+        """
+        previous = self.levels
+        levels: Dict[str, Optional[str]] = {}
+        to_disable: List[dict] = []
+        to_reduce: List[dict] = []
+        for project in projects:
+            level = tariff_level(project['tariff_remaining'], project['today_data'])
+            levels[project['name']] = level
+            if previous is None or _SEVERITY[level] <= _SEVERITY[previous.get(project['name'])]:
+                continue
+            (to_disable if level == DISABLE else to_reduce).append(warning_entry(project))
+        if previous is None:
+            logger.info(
+                "Наблюдатель тарифов: точка отсчёта, %s проектов, за порогом %s",
+                len(levels),
+                sum(1 for level in levels.values() if level is not None),
+            )
+        self.levels = levels
+        return to_disable, to_reduce
@@ -1,27 +1,91 @@
 import logging
 from aiogram import Bot, Dispatcher
-from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery, BotCommand
-from aiogram.filters import Command
+from aiogram.types import (
+    Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery, BotCommand,
+    InlineQuery, InlineQueryResultArticle, InputTextMessageContent,
+)
+from aiogram.filters import Command, CommandObject
 from datetime import datetime
+from functools import partial
 import pytz
 import asyncio
+import time
 
 import src.config as config
-from src import rich_report
+from src import legacy_report, report_pages, rich_report, sharded_delivery, tracing
+from src.anomalies import day_label
+from src.config_reload import ConfigReloader
+from src.delivery_queue import ANOMALIES, DISABLE, MAIN, REDUCE, DeliveryQueue
+from src.live_dashboard import LiveDashboard
+from src.loop_health import LoopMonitor
+from src.memory_guard import MemoryGuard
+from src.logging_setup import log_stage
+from src.project_index import ProjectIndex, normalize, project_code
+from src.report_history import parse_date_range
+from src.tariff_watcher import TariffWatcher
+from src.throttling import ReportThrottlingMiddleware
 
 
 logger = logging.getLogger(__name__)
 
+# Ключ чата в очереди доставки для рассылки пулом процессов: она идёт одним куском
+SHARDED_CHATS = 'sharded'
+
 class TelegramBot:
     def __init__(self, token, data_processor):
         self.bot = Bot(token=token)
         self.dp = Dispatcher()
         self.data_processor = data_processor
+        self.live_dashboard = (
+            LiveDashboard.from_config(self.bot, config.LIVE_DASHBOARD)
+            if config.LIVE_DASHBOARD['ENABLED'] else None
+        )
+        self.last_delivery_summary = None  # сводка последней рассылки пулом процессов
+        self.last_delivery_waits = None  # ожидание в очереди доставки по классам, см. delivery_queue
+        self.loop_monitor = None  # задержка event loop, запускается в start()
+        self.config_reloader = (
+            ConfigReloader(
+                config.CONFIG_RELOAD['FILE'],
+                on_change=self._config_changed,
+                lock=data_processor.settings_lock,
+            )
+            if config.CONFIG_RELOAD['ENABLED'] else None
+        )
+        self.memory_guard = (
+            MemoryGuard(config.MEMORY_GUARD, alert=self._alert_admin)
+            if config.MEMORY_GUARD['ENABLED'] else None
+        )
+        self.project_index = None  # поиск /project, строится лениво по project_index_report
+        self.project_index_report = None  # последний удачный отчёт
+        self.project_index_built_at = None
+        # готовые сообщения последнего отчёта по чатам — для SERVE_LAST:
+        # {'report_date': дата, 'format': 'rich' | 'legacy', 'chats': {chat_id: [текст, ...]}}
+        self.last_report_messages = None
+        self.tariff_watcher = TariffWatcher() if config.TARIFF_WATCHER['ENABLED'] else None
+        self.report_pages = (
+            report_pages.ReportPages(
+                config.PAGINATED_REPORT['CACHE_PAGES'],
+                config.PAGINATED_REPORT['DIRECTORY'],
+                config.PAGINATED_REPORT['DISK_REPORTS'],
+            )
+            if config.PAGINATED_REPORT['ENABLED'] else None
+        )
         
+        self.throttling = (
+            ReportThrottlingMiddleware(config.REPORT_THROTTLING, serve_last=self.serve_last_report)
+            if config.REPORT_THROTTLING['ENABLED'] else None
+        )
+        if self.throttling is not None:
+            self.dp.message.middleware(self.throttling)
+            self.dp.callback_query.middleware(self.throttling)
+
         # Регистрация обработчиков
         self.dp.message.register(self.cmd_start, Command("start"))
         self.dp.message.register(self.cmd_secondary, Command("secondary"))
+        self.dp.message.register(self.cmd_project, Command("project"))
+        self.dp.message.register(self.cmd_traces, Command("traces"))
         self.dp.callback_query.register(self.callback_handler)
+        self.dp.inline_query.register(self.inline_project_query)
 
         # Основная клавиатура
         self.inline_kb = InlineKeyboardMarkup(inline_keyboard=[
@@ -39,15 +103,244 @@ class TelegramBot:
         """Обработчик нажатий на inline-кнопки"""
         if callback.data == "secondary":
             await self.cmd_secondary(callback.message)
+        elif callback.data == report_pages.NOOP_CALLBACK:
+            pass
+        elif report_pages.parse_page_callback(callback.data) is not None:
+            await self.turn_report_page(callback)
+            return
         await callback.answer()
 
-    async def cmd_secondary(self, message: Message):
-        """Обработчик команды /secondary"""
-        result = self.data_processor.generate_secondary_report()
-        await self.deliver_secondary_report(
-            chat_id=message.chat.id,
-            result=result,
-            notify_empty=True,
+    async def turn_report_page(self, callback: CallbackQuery):
+        """◀/▶ постраничного отчёта: страница из кэша и один editMessageText."""
+        snapshot, page = report_pages.parse_page_callback(callback.data)
+        chat_id = callback.message.chat.id
+        entry = self.report_pages.get(snapshot, chat_id, page) if self.report_pages else None
+        if entry is None:
+            await callback.answer("Отчёт устарел, запросите /secondary", show_alert=True)
+            return
+        text, total = entry
+        with tracing.trace("turn_report_page", chat_id=chat_id, page=page):
+            try:
+                await asyncio.to_thread(
+                    rich_report.edit_rich_telegram_message,
+                    self.bot.token,
+                    chat_id,
+                    callback.message.message_id,
+                    text,
+                    report_pages.page_keyboard(snapshot, page, total),
+                )
+            except RuntimeError as e:
+                # двойное нажатие: страница уже на экране
+                if "message is not modified" not in str(e):
+                    raise
+        await callback.answer()
+
+    async def cmd_secondary(self, message: Message, command: CommandObject = None):
+        """Обработчик команды /secondary; /secondary 01.10-15.10 — отчёт за период"""
+        period = ((command.args if command else None) or '').strip()
+        chat_id = message.chat.id
+        if period:
+            today = datetime.now(pytz.timezone(config.REPORT_TIME['TIMEZONE'])).date()
+            try:
+                date_from, date_to = parse_date_range(period, today)
+            except ValueError as e:
+                await message.answer(f"{e}. Например: /secondary 01.10-15.10")
+                return
+            with tracing.trace("cmd_secondary", chat_id=chat_id, period=period):
+                result = await asyncio.to_thread(
+                    self.data_processor.generate_range_report, date_from, date_to
+                )
+                await self.deliver_range_report(
+                    chat_id=chat_id,
+                    result=result,
+                    notify_empty=True,
+                )
+            return
+
+        with tracing.trace("cmd_secondary", chat_id=chat_id):
+            with log_stage(logger, "generate_secondary_report", chat_id=chat_id):
+                result = await asyncio.to_thread(self.data_processor.generate_secondary_report)
+            if result.get('success'):
+                self._update_project_index(result)
+            with log_stage(logger, "deliver_secondary_report", chat_id=chat_id):
+                await self.deliver_secondary_report(
+                    chat_id=chat_id,
+                    result=result,
+                    notify_empty=True,
+                )
+
+    def _config_changed(self, changed):
+        """Новая разметка листа — старые снимки и индексы колонок больше не годятся.
+
+        Вызывается под settings_lock; идут отчёты — сброс дождётся их конца.
+        """
+        if 'SHEET_SETTINGS' in changed:
+            self.data_processor.reset_sheet_caches()
+
+    async def _alert_admin(self, text):
+        """Служебное предупреждение в ADMIN_CHAT_ID; не задан — только лог."""
+        if config.ADMIN_CHAT_ID is None:
+            return
+        await self.bot.send_message(chat_id=config.ADMIN_CHAT_ID, text=text)
+
+    async def serve_last_report(self, chat_id):
+        """Сообщения последнего собранного сегодня отчёта для этого чата — без Google (для throttling).
+
+        Только основной отчёт самого чата: другие чаты и предупреждения не повторяются.
+        Готовых сообщений для чата нет — False, throttling ответит коротко.
+        """
+        cached = self.last_report_messages
+        today = datetime.now(pytz.timezone(config.REPORT_TIME['TIMEZONE'])).date()
+        if cached is None or cached['report_date'] != today:
+            return False
+        messages = cached['chats'].get(chat_id)
+        if not messages:
+            return False
+        queue = DeliveryQueue(config.DELIVERY_QUEUE['PER_CHAT_ORDER'])
+        if cached['format'] == "legacy":
+            for text in messages:
+                queue.put(MAIN, chat_id, partial(self._send_markdown_chunks, chat_id, text))
+        else:
+            self._queue_chat_messages(queue, chat_id, messages)
+        await self._drain(queue)
+        return True
+
+    async def cmd_traces(self, message: Message, command: CommandObject = None):
+        """/traces [n] — последние трассы отчёта, по шагам. Только для ADMIN_CHAT_ID."""
+        if config.ADMIN_CHAT_ID is None or config.ADMIN_CHAT_ID not in (
+            message.chat.id,
+            message.from_user.id if message.from_user else None,
+        ):
+            return
+        ring = tracing.ring_buffer()
+        if ring is None:
+            await message.answer("Трассировка выключена: TRACING['ENABLED'] в config")
+            return
+        argument = ((command.args if command else None) or '').strip()
+        limit = int(argument) if argument.isdigit() else config.TRACING['SHOW_TRACES']
+        traces = ring.recent_traces(max(1, limit))
+        if not traces:
+            await message.answer("Трасс пока нет: отчёт с запуска бота не собирался")
+            return
+        text = '\n\n'.join(tracing.format_trace(spans) for spans in traces)
+        if self.throttling is not None:
+            text = f"Лимит запросов отчёта: {self.throttling.counters()}\n\n{text}"
+        if self.config_reloader is not None:
+            text = f"{self.config_reloader.summary()}\n\n{text}"
+        if self.memory_guard is not None:
+            text = f"{self.memory_guard.summary()}\n\n{text}"
+        if self.loop_monitor is not None:
+            text = (
+                f"Задержка event loop, мс: {self.loop_monitor.percentiles()}; "
+                f"стоял дольше порога: {self.loop_monitor.blocks}\n\n{text}"
+            )
+        for chunk in legacy_report.split_markdown_message(text, markdown=False):
+            await message.answer(chunk)
+
+    def _update_project_index(self, result):
+        """Запоминает свежий удачный отчёт; индекс /project построится при первом поиске."""
+        self.project_index = None
+        self.project_index_report = result
+        self.project_index_built_at = time.monotonic()
+
+    async def _get_project_index(self):
+        """Индекс по отчёту не старше PROJECT_LOOKUP['MAX_AGE']; старый — перечитываем лист."""
+        built_at = self.project_index_built_at
+        if built_at is None or time.monotonic() - built_at > config.PROJECT_LOOKUP['MAX_AGE']:
+            result = await asyncio.to_thread(self.data_processor.generate_secondary_report)
+            if result.get('success'):
+                self._update_project_index(result)
+            elif self.project_index_report is None:
+                return None, result
+        if self.project_index is None:
+            self.project_index = ProjectIndex(self.project_index_report.get('projects') or [])
+        return self.project_index, self.project_index_report
+
+    async def cmd_project(self, message: Message, command: CommandObject = None):
+        """Обработчик команды /project <часть названия или код LRn>"""
+        query = ((command.args if command else None) or '').strip()
+        if not query:
+            await message.answer("Напишите часть названия или код проекта: /project LR12")
+            return
+
+        index, result = await self._get_project_index()
+        if index is None:
+            await message.answer(f"Ошибка: {result.get('error')}")
+            return
+
+        matches = index.search(query, config.PROJECT_LOOKUP['MAX_RESULTS'])
+        if not matches:
+            await message.answer(f"Проект «{query}» не найден")
+            return
+
+        best = matches[0]
+        code = project_code(query) or project_code(query, bare=True)
+        exact = (
+            len(matches) == 1
+            or normalize(best['name']) == normalize(query)
+            or (code is not None and project_code(best['name']) == code)
+        )
+        if not exact:
+            names = "\n".join(project['name'] for project in matches)
+            await message.answer(f"Нашлось несколько проектов, уточните запрос:\n{names}")
+            return
+
+        report_date = result.get('report_date')
+        if report_date is None:
+            report_date = datetime.now(pytz.timezone(config.REPORT_TIME['TIMEZONE'])).date()
+        text = rich_report.format_rich_report_message(report_date, [rich_report.project_to_row(best)])
+        await asyncio.to_thread(
+            rich_report.send_rich_telegram_message,
+            self.bot.token,
+            message.chat.id,
+            text,
+        )
+
+    async def _inline_allowed(self, user_id):
+        """Inline-поиск — только ADMIN_CHAT_ID и участникам GROUP_CHAT_ID."""
+        if user_id == config.ADMIN_CHAT_ID:
+            return True
+        if config.GROUP_CHAT_ID is None:
+            return False
+        try:
+            member = await self.bot.get_chat_member(chat_id=config.GROUP_CHAT_ID, user_id=user_id)
+        except Exception as e:
+            logger.warning("Inline query from %s: membership check failed: %s", user_id, e)
+            return False
+        return member.status not in ('left', 'kicked')
+
+    async def inline_project_query(self, inline_query: InlineQuery):
+        """Inline-поиск проекта: @бот LR12. Ответы кэширует Telegram на INLINE_CACHE_TIME.
+
+        Кэш личный для каждого пользователя; ответ — простой текст, названия без экранирования.
+        """
+        if not await self._inline_allowed(inline_query.from_user.id):
+            await inline_query.answer(
+                [], cache_time=config.PROJECT_LOOKUP['INLINE_CACHE_TIME'], is_personal=True
+            )
+            return
+        index, _ = await self._get_project_index()
+        matches = index.search(inline_query.query, config.PROJECT_LOOKUP['MAX_RESULTS']) if index else []
+        # Жирный из шаблона снимается до подстановки: в {total_issued} и т.п. есть «_»
+        template = config.MESSAGES['SECONDARY_PROJECT_FORMAT'].replace('*', '')
+        results = [
+            InlineQueryResultArticle(
+                id=str(number),
+                title=project['name'],
+                description=(
+                    f"Сегодня: {project['today_data']} · остаток: {project['tariff_remaining']}"
+                ),
+                input_message_content=InputTextMessageContent(
+                    message_text=template.format_map(project).strip(),
+                    parse_mode=None,
+                ),
+            )
+            for number, project in enumerate(matches)
+        ]
+        await inline_query.answer(
+            results,
+            cache_time=config.PROJECT_LOOKUP['INLINE_CACHE_TIME'],
+            is_personal=True,
         )
 
     async def deliver_secondary_report(self, chat_id, result, notify_empty=False):
@@ -60,18 +353,30 @@ class TelegramBot:
             if notify_empty:
                 await self.bot.send_message(chat_id=chat_id, text=f"Ошибка: {result['error']}")
             else:
-                logger.error("Secondary report failed: %s", result.get('error'))
+                logger.error(
+                    "Secondary report failed (%s): %s",
+                    result.get('error_type'),
+                    result.get('error'),
+                )
             return False
 
+        if result.get('stale'):
+            await self._send_stale_notice(chat_id, result)
+
         message_format = rich_report.get_message_format(config.REPORTS_MESSAGE_FORMAT)
+        queue = DeliveryQueue(config.DELIVERY_QUEUE['PER_CHAT_ORDER'])
 
         try:
             if message_format == "legacy":
-                sent = await self._send_legacy_secondary_report(chat_id, result)
+                reports = self._queue_legacy_secondary_report(queue, chat_id, result)
             else:
-                sent = await self._send_rich_secondary_report(
-                    chat_id, result, notify_empty=notify_empty
+                reports = await self._queue_rich_secondary_report(
+                    queue, chat_id, result, notify_empty=notify_empty
                 )
+            # рассылка пулом — один элемент очереди под своим ключом, предупреждения — под чатами
+            # получателей: срочные уходят раньше всей рассылки и в 'fifo'
+            self._queue_report_warnings(queue, chat_id, result, message_format)
+            failed = await self._drain(queue)
         except Exception as e:
             logger.error("Error sending secondary report: %s", e)
             if notify_empty:
@@ -82,28 +387,112 @@ class TelegramBot:
                 return False
             raise
 
-        await self._send_report_warnings(chat_id, result, message_format)
-        return sent
+        if failed and notify_empty:
+            await self.bot.send_message(
+                chat_id=chat_id,
+                text=f"Ошибка отправки отчёта: {failed[0].error}",
+            )
+        # рассылка пулом процессов возвращает False, если не ушло ни одного сообщения
+        return not failed and bool(reports) and all(delivery.result is not False for delivery in reports)
+
+    async def _drain(self, queue):
+        """Отправляет очередь рассылки и запоминает, сколько ждали сообщения каждого класса.
+
+        Возвращает неудачные доставки: одна ошибка не останавливает остальные.
+        """
+        failed = await queue.drain()
+        self.last_delivery_waits = queue.wait_stats()
+        if self.last_delivery_waits:
+            logger.info("Ожидание в очереди доставки: %s", self.last_delivery_waits)
+        return failed
+
+    async def _send_rich(self, chat_id, text, reply_markup=None):
+        extra = (reply_markup,) if reply_markup is not None else ()
+        return await asyncio.to_thread(
+            rich_report.send_rich_telegram_message,
+            self.bot.token,
+            chat_id,
+            text,
+            *extra,
+        )
+
+    async def deliver_range_report(self, chat_id, result, notify_empty=False):
+        """Отчёт за период целиком в chat_id: rich — таблица, legacy — текст."""
+        if not result.get('success'):
+            if notify_empty:
+                await self.bot.send_message(chat_id=chat_id, text=f"Ошибка: {result['error']}")
+            else:
+                logger.error(
+                    "Range report failed (%s): %s",
+                    result.get('error_type'),
+                    result.get('error'),
+                )
+            return False
+
+        if result.get('stale'):
+            await self._send_stale_notice(chat_id, result)
 
-    async def _send_legacy_secondary_report(self, chat_id, result):
-        """Старый формат: один текст со всеми проектами через sendMessage."""
+        date_from, date_to = result['date_from'], result['date_to']
+        if rich_report.get_message_format(config.REPORTS_MESSAGE_FORMAT) == "legacy":
+            date_format = config.SHEET_STRUCTURE['DATE_FORMAT_OUT']
+            text = config.MESSAGES['RANGE_REPORT'].format(
+                date_from=date_from.strftime(date_format),
+                date_to=date_to.strftime(date_format),
+                days=result['days'],
+                projects_data=result['projects_data'],
+            )
+            await self._send_markdown_chunks(chat_id, text)
+            return True
+
+        rows = rich_report.range_projects_to_rows(result['projects'])
+        for text in rich_report.build_range_report_messages(date_from, date_to, rows):
+            await asyncio.to_thread(
+                rich_report.send_rich_telegram_message,
+                self.bot.token,
+                chat_id,
+                text,
+            )
+        return True
+
+    async def _send_stale_notice(self, chat_id, result):
+        """Google не ответил — предупреждаем, что цифры из последнего удачного снимка."""
+        fetched_at = result.get('fetched_at')
+        when = fetched_at.strftime('%d.%m %H:%M') if fetched_at else 'неизвестно когда'
+        await self.bot.send_message(
+            chat_id=chat_id,
+            text=f"⚠️ Google Sheets не отвечает, отчёт по снимку от {when}",
+        )
+
+    async def _send_markdown_chunks(self, chat_id, text):
+        """Длинный Markdown-текст — минимумом сообщений по 4096 символов.
+
+        Если Telegram не принял разметку куска, этот кусок уходит без неё.
+        """
+        for chunk in legacy_report.split_markdown_message(text):
+            with tracing.span("send_message", chat_id=chat_id):
+                try:
+                    await self.bot.send_message(chat_id=chat_id, text=chunk, parse_mode="Markdown")
+                except Exception as e:
+                    logger.error(f"Error with Markdown formatting: {e}")
+                    await self.bot.send_message(
+                        chat_id=chat_id,
+                        text=legacy_report.strip_markdown(chunk),
+                    )
+
+    def _queue_legacy_secondary_report(self, queue, chat_id, result):
+        """Старый формат: текст со всеми проектами через sendMessage, длинный — частями."""
         text = config.MESSAGES['SECONDARY_REPORT'].format(
             date=result['date'],
             projects_data=result['projects_data']
         )
-        try:
-            await self.bot.send_message(chat_id=chat_id, text=text, parse_mode="Markdown")
-            return True
-        except Exception as e:
-            logger.error(f"Error with Markdown formatting: {e}")
-            await self.bot.send_message(
-                chat_id=chat_id,
-                text=text.replace('*', '').replace('_', '').replace('`', '')
-            )
-            return True
+        self._remember_report_messages(result.get('report_date'), "legacy", {chat_id: [text]})
+        return [queue.put(MAIN, chat_id, partial(self._send_markdown_chunks, chat_id, text))]
+
+    async def _queue_rich_secondary_report(self, queue, chat_id, result, notify_empty=False):
+        """Rich-формат: одна таблица на чат через sendRichMessage. Возвращает поставленное в очередь.
 
-    async def _send_rich_secondary_report(self, chat_id, result, notify_empty=False):
-        """Rich-формат: одна таблица на чат через sendRichMessage."""
+        С живым отчётом таблица, влезающая в одно сообщение, правит закреп чата.
+        """
         grouped = rich_report.group_projects_by_chat(
             result.get('projects') or [],
             default_chat_id=chat_id,
@@ -112,45 +501,109 @@ class TelegramBot:
         if report_date is None:
             report_date = datetime.now(pytz.timezone(config.REPORT_TIME['TIMEZONE'])).date()
 
+        rows_by_chat = {
+            dest_chat_id: [rich_report.project_to_row(project) for project in projects]
+            for dest_chat_id, projects in grouped.items()
+        }
+
         if not grouped:
+            self._remember_report_messages(report_date, "rich", {})
             logger.info("Rich report skipped: no projects with data for today")
             if notify_empty:
                 await self.bot.send_message(
                     chat_id=chat_id,
                     text="Нет проектов с данными за сегодня",
                 )
-            return False
+            return []
 
-        bot_token = self.bot.token
-        for dest_chat_id, projects in grouped.items():
-            rows = [rich_report.project_to_row(project) for project in projects]
-            for text in rich_report.build_rich_report_messages(report_date, rows):
-                await asyncio.to_thread(
-                    rich_report.send_rich_telegram_message,
-                    bot_token,
-                    dest_chat_id,
-                    text,
-                )
-        return True
+        sharding = config.SHARDED_DELIVERY
+        if (
+            sharding['ENABLED']
+            and self.live_dashboard is None
+            and len(grouped) >= sharding['MIN_CHATS']
+        ):
+            # пул процессов рендерит и рассылает чаты сам; здесь — только чат запроса, для SERVE_LAST
+            own = rows_by_chat.get(chat_id)
+            self._remember_report_messages(report_date, "rich", {
+                chat_id: rich_report.build_rich_report_messages(report_date, own)
+            } if own else {})
+            return [queue.put(MAIN, SHARDED_CHATS, partial(self._send_sharded_report, report_date, rows_by_chat))]
+
+        messages_by_chat = {
+            dest_chat_id: rich_report.build_rich_report_messages(report_date, rows)
+            for dest_chat_id, rows in rows_by_chat.items()
+        }
+        self._remember_report_messages(report_date, "rich", messages_by_chat)
+        reports = []
+        for dest_chat_id, messages in messages_by_chat.items():
+            reports.extend(self._queue_chat_messages(queue, dest_chat_id, messages))
+        return reports
+
+    def _queue_chat_messages(self, queue, chat_id, messages):
+        """Rich-сообщения отчёта одного чата: закреп живого отчёта, страницы или по одному."""
+        if self.live_dashboard is not None and len(messages) == 1:
+            return [queue.put(MAIN, chat_id, partial(self._publish_live, chat_id, messages[0]))]
+        if self.report_pages is not None and len(messages) > 1:
+            snapshot = self.report_pages.store(chat_id, messages)
+            keyboard = report_pages.page_keyboard(snapshot, 0, len(messages))
+            return [queue.put(MAIN, chat_id, partial(self._send_rich, chat_id, messages[0], keyboard))]
+        return [queue.put(MAIN, chat_id, partial(self._send_rich, chat_id, text)) for text in messages]
+
+    def _remember_report_messages(self, report_date, message_format, messages_by_chat):
+        self.last_report_messages = {
+            'report_date': report_date,
+            'format': message_format,
+            'chats': messages_by_chat,
+        }
+
+    async def _publish_live(self, chat_id, text):
+        with tracing.span("live_dashboard.publish", chat_id=chat_id):
+            status = await self.live_dashboard.publish(chat_id, text)
+        logger.info("Live report in chat %s: %s", chat_id, status)
+        return status
+
+    async def _send_sharded_report(self, report_date, rows_by_chat):
+        """Основной отчёт по многим чатам — пулом процессов, см. sharded_delivery."""
+        with tracing.span("deliver_sharded", chats=len(rows_by_chat)):
+            summary = await asyncio.to_thread(
+                sharded_delivery.deliver_sharded,
+                self.bot.token,
+                report_date,
+                rows_by_chat,
+                config.SHARDED_DELIVERY['WORKERS'],
+                config.SHARDED_DELIVERY['RATE_PER_SECOND'],
+            )
+        self.last_delivery_summary = summary
+        logger.info(
+            "Sharded delivery: %s chats, %s messages, %s failed, %s shards, %.1fs",
+            summary['chats'],
+            summary['messages'],
+            len(summary['failed']),
+            summary['shards'],
+            summary['seconds'],
+        )
+        for dest_chat_id, error in summary['failed'].items():
+            logger.error("Report not delivered to chat %s: %s", dest_chat_id, error)
+        return summary['messages'] > 0
 
     async def _send_report_warnings(self, chat_id, result, message_format):
-        """Предупреждения: rich — две отдельные таблицы, legacy — старый текст."""
+        """Только предупреждения, своей очередью — для наблюдателя тарифов."""
+        queue = DeliveryQueue(config.DELIVERY_QUEUE['PER_CHAT_ORDER'])
+        self._queue_report_warnings(queue, chat_id, result, message_format)
+        return not await self._drain(queue)
+
+    def _queue_report_warnings(self, queue, chat_id, result, message_format):
+        """Предупреждения: rich — отдельные таблицы (тарифы, аномалии), legacy — старый текст."""
         if message_format == "legacy":
-            if result.get('disable_warning'):
-                await self.bot.send_message(
-                    chat_id=chat_id,
-                    text=result['disable_warning'],
-                    parse_mode="Markdown",
-                )
-            if result.get('reduce_warning'):
-                await self.bot.send_message(
-                    chat_id=chat_id,
-                    text=result['reduce_warning'],
-                    parse_mode="Markdown",
-                )
+            for priority, key in (
+                (DISABLE, 'disable_warning'),
+                (REDUCE, 'reduce_warning'),
+                (ANOMALIES, 'anomalies_warning'),
+            ):
+                if result.get(key):
+                    queue.put(priority, chat_id, partial(self._send_markdown_chunks, chat_id, result[key]))
             return
 
-        bot_token = self.bot.token
         disable_grouped = rich_report.group_projects_by_chat(
             result.get('projects_to_disable') or [],
             default_chat_id=chat_id,
@@ -165,36 +618,103 @@ class TelegramBot:
         for dest_chat_id, projects in disable_grouped.items():
             rows = rich_report.disable_projects_to_rows(projects)
             for text in rich_report.build_disable_warning_messages(rows):
-                await asyncio.to_thread(
-                    rich_report.send_rich_telegram_message,
-                    bot_token,
-                    dest_chat_id,
-                    text,
-                )
+                queue.put(DISABLE, dest_chat_id, partial(self._send_rich, dest_chat_id, text))
 
         for dest_chat_id, projects in reduce_grouped.items():
             rows = rich_report.reduce_projects_to_rows(projects)
             for text in rich_report.build_reduce_warning_messages(rows):
-                await asyncio.to_thread(
-                    rich_report.send_rich_telegram_message,
-                    bot_token,
-                    dest_chat_id,
-                    text,
-                )
+                queue.put(REDUCE, dest_chat_id, partial(self._send_rich, dest_chat_id, text))
+
+        # аномалии — для нас, не для клиентов: всегда в чат отчёта
+        rows = rich_report.anomalies_to_rows(result.get('anomalies') or [])
+        label = day_label(result.get('anomalies_day'), result.get('report_date'))
+        for text in rich_report.build_anomalies_messages(rows, label):
+            queue.put(ANOMALIES, chat_id, partial(self._send_rich, chat_id, text))
+
+    async def poll_tariffs(self):
+        """Один опрос тарифов: предупреждения только по проектам, только что перешедшим порог.
+
+        Новые уровни остаются, только если предупреждение ушло: иначе следующий
+        опрос увидит тот же переход и предупредит снова.
+        """
+        chat_id = config.TARIFF_WATCHER['CHAT_ID'] or config.GROUP_CHAT_ID
+        if chat_id is None:
+            logger.warning("Tariff watcher poll skipped: neither TARIFF_WATCHER['CHAT_ID'] nor GROUP_CHAT_ID is set")
+            return False
+        with tracing.trace("poll_tariffs"):
+            projects = await asyncio.to_thread(self.data_processor.get_tariff_rows)
+            previous = self.tariff_watcher.levels
+            to_disable, to_reduce = self.tariff_watcher.update(projects)
+            if not to_disable and not to_reduce:
+                return False
+            logger.info(
+                "Тарифы: исчерпаны %s, меньше чем на день %s — предупреждаем чат %s",
+                len(to_disable),
+                len(to_reduce),
+                chat_id,
+            )
+            result = {
+                'projects_to_disable': to_disable,
+                'projects_to_reduce': to_reduce,
+                'disable_warning': legacy_report.render_tariff_warning(
+                    config.MESSAGES['PROJECTS_TO_DISABLE'], to_disable
+                ),
+                'reduce_warning': legacy_report.render_tariff_warning(
+                    config.MESSAGES['PROJECTS_TO_REDUCE'], to_reduce
+                ),
+            }
+            message_format = rich_report.get_message_format(config.REPORTS_MESSAGE_FORMAT)
+            sent = False
+            try:
+                sent = await self._send_report_warnings(chat_id, result, message_format)
+            finally:
+                if not sent:
+                    self.tariff_watcher.levels = previous
+            return sent
+
+    async def watch_tariffs(self):
+        """Опрос тарифов раз в TARIFF_WATCHER['INTERVAL'] секунд, пока бот запущен."""
+        while True:
+            try:
+                await self.poll_tariffs()
+            except Exception as e:
+                logger.error(f"Tariff watcher poll failed: {e}")
+            await asyncio.sleep(config.TARIFF_WATCHER['INTERVAL'])
 
     async def set_commands(self):
         """Установка команд бота в меню"""
         commands = [
             BotCommand(command="start", description="🔄 Открыть главное меню"),
-            BotCommand(command="secondary", description="📊 Отчет за сегодня"),
+            BotCommand(command="secondary", description="📊 Отчет за сегодня или за период: /secondary 01.10-15.10"),
+            BotCommand(command="project", description="🔎 Один проект: /project LR12"),
         ]
         await self.bot.set_my_commands(commands)
 
     async def start(self):
-        """Запуск бота: команды и поллинг. Расписание отчёта — в cron, не здесь."""
+        """Запуск бота: команды, поллинг и наблюдатель тарифов. Расписание отчёта — в cron, не здесь."""
         logger.info("Bot started...")
+        watcher_task = None
+        if self.tariff_watcher is not None:
+            watcher_task = asyncio.create_task(self.watch_tariffs())
+        memory_task = None
+        reload_task = None
+        if self.config_reloader is not None:
+            reload_task = asyncio.create_task(self.config_reloader.run(config.CONFIG_RELOAD['INTERVAL']))
+        if self.memory_guard is not None:
+            memory_task = asyncio.create_task(self.memory_guard.run(config.MEMORY_GUARD['INTERVAL']))
+        if config.LOOP_HEALTH['ENABLED']:
+            self.loop_monitor = LoopMonitor.from_config(config.LOOP_HEALTH)
+            self.loop_monitor.start()
         try:
             await self.set_commands()
             await self.dp.start_polling(self.bot)
         finally:
+            if watcher_task is not None:
+                watcher_task.cancel()
+            if memory_task is not None:
+                memory_task.cancel()
+            if reload_task is not None:
+                reload_task.cancel()
+            if self.loop_monitor is not None:
+                await self.loop_monitor.stop()
             await self.bot.session.close() 
\ No newline at end of file
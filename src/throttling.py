@@ -0,0 +1,157 @@
+"""Ограничение частоты /secondary и кнопки «📊 Отчет».
+
+Каждое нажатие — полный поход в Google и несколько sendRichMessage: квота Sheets и
+лимит Telegram на флуд. Middleware считает запросы отчёта в скользящем окне
+отдельно по пользователю и по чату. Сверх лимита отчёт не собирается: в ответ
+короткое «уже отправлен N с назад» или, с SERVE_LAST, последний собранный отчёт.
+Сколько запросов погашено и по какому лимиту — counters().
+"""
+
+import logging
+import re
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, Message
+
+logger = logging.getLogger(__name__)
+
+REPORT_CALLBACK = "secondary"
+_REPORT_COMMAND_RE = re.compile(r'^/secondary(?:@\w+)?(?:\s+(.*))?$', re.DOTALL)
+
+
+class SlidingWindow:
+    """Не больше limit событий на ключ за последние window секунд.
+
+    Ключи, у которых всё вышло из окна, удаляются: раз в window секунд record
+    обходит словарь, иначе он рос бы с каждым новым пользователем.
+    """
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._hits: Dict[Any, Deque[float]] = {}
+        self._swept_at: Optional[float] = None
+
+    def _recent(self, key, now: float) -> Deque[float]:
+        hits = self._hits.get(key)
+        if hits is None:
+            return deque()
+        while hits and now - hits[0] >= self.window:
+            hits.popleft()
+        if not hits:
+            del self._hits[key]
+        return hits
+
+    def allows(self, key, now: float) -> bool:
+        return len(self._recent(key, now)) < self.limit
+
+    def record(self, key, now: float) -> None:
+        if self._swept_at is None or now - self._swept_at >= self.window:
+            self._sweep(now)
+        self._hits.setdefault(key, deque()).append(now)
+
+    def _sweep(self, now: float) -> None:
+        self._swept_at = now
+        idle = [key for key, hits in self._hits.items() if now - hits[-1] >= self.window]
+        for key in idle:
+            del self._hits[key]
+
+    def __len__(self) -> int:
+        return len(self._hits)
+
+    def last(self, key) -> Optional[float]:
+        hits = self._hits.get(key)
+        return hits[-1] if hits else None
+
+
+def report_request(event) -> Optional[dict]:
+    """Запрос отчёта: {'user_id', 'chat_id', 'period'}; остальные события — None."""
+    if isinstance(event, CallbackQuery):
+        if event.data != REPORT_CALLBACK or event.message is None:
+            return None
+        chat_id, period = event.message.chat.id, False
+    elif isinstance(event, Message):
+        match = _REPORT_COMMAND_RE.match(event.text or '')
+        if not match:
+            return None
+        chat_id, period = event.chat.id, bool((match.group(1) or '').strip())
+    else:
+        return None
+    user_id = event.from_user.id if event.from_user else None
+    return {'user_id': user_id, 'chat_id': chat_id, 'period': period}
+
+
+class ReportThrottlingMiddleware(BaseMiddleware):
+    """Middleware для dp.message и dp.callback_query: лимиты REPORT_THROTTLING.
+
+    serve_last(chat_id) — отправить в чат последний собранный отчёт без похода
+    в Google; True — отправлен, иначе ответ коротким сообщением.
+    """
+
+    def __init__(
+        self,
+        settings: dict,
+        serve_last: Optional[Callable[[int], Awaitable[bool]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.per_user = SlidingWindow(settings['USER_LIMIT'], settings['WINDOW'])
+        self.per_chat = SlidingWindow(settings['CHAT_LIMIT'], settings['WINDOW'])
+        self.serve_last = serve_last if settings['SERVE_LAST'] else None
+        self.clock = clock
+        self.allowed = 0
+        self.suppressed: Counter = Counter()
+
+    def counters(self) -> Dict[str, int]:
+        return {
+            'allowed': self.allowed,
+            'suppressed_user': self.suppressed['user'],
+            'suppressed_chat': self.suppressed['chat'],
+            'served_last': self.suppressed['served_last'],
+        }
+
+    def check(self, user_id, chat_id) -> Optional[str]:
+        """None — запрос пропускаем и запоминаем; иначе какой лимит сработал: 'user' или 'chat'."""
+        now = self.clock()
+        if user_id is not None and not self.per_user.allows(user_id, now):
+            return 'user'
+        if not self.per_chat.allows(chat_id, now):
+            return 'chat'
+        if user_id is not None:
+            self.per_user.record(user_id, now)
+        self.per_chat.record(chat_id, now)
+        return None
+
+    async def __call__(self, handler, event, data):
+        request = report_request(event)
+        if request is None:
+            return await handler(event, data)
+        limit = self.check(request['user_id'], request['chat_id'])
+        if limit is None:
+            self.allowed += 1
+            return await handler(event, data)
+
+        self.suppressed[limit] += 1
+        logger.info(
+            "Report request throttled by %s limit (user %s, chat %s): %s",
+            limit,
+            request['user_id'],
+            request['chat_id'],
+            self.counters(),
+        )
+        if self.serve_last is not None and not request['period']:
+            if await self.serve_last(request['chat_id']):
+                self.suppressed['served_last'] += 1
+                if isinstance(event, CallbackQuery):
+                    await event.answer()
+                return None
+
+        window = self.per_user if limit == 'user' else self.per_chat
+        key = request['user_id'] if limit == 'user' else request['chat_id']
+        last = window.last(key)
+        ago = int(self.clock() - last) if last is not None else 0
+        # у кнопки это всплывающая подсказка, у команды — сообщение в чат
+        await event.answer(f"Отчёт уже запрашивали {ago} с назад, попробуйте чуть позже")
+        return None
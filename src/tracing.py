@@ -0,0 +1,215 @@
+"""Трассировка отчёта: от команды или cron до последнего отправленного сообщения.
+
+trace() открывает трассу, span() внутри неё — этап (чтение листа, разбор,
+сборка таблиц, каждая отправка). Текущий этап лежит в contextvars, поэтому
+asyncio.to_thread и задачи event loop видят родителя без явной передачи.
+span() вне трассы ничего не пишет: воркеры рассылки и тесты не шумят.
+
+Готовые этапы уходят в экспортёры: кольцевой буфер для /traces и JSONL-файл.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar('current_span', default=None)
+
+_exporters: list = []
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    start: float  # time.time() начала
+    attributes: Dict[str, object] = field(default_factory=dict)
+    duration_ms: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class RingBufferExporter:
+    """Последние capacity этапов в памяти процесса бота."""
+
+    def __init__(self, capacity: int = 2000):
+        self._spans = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def recent_traces(self, limit: int = 3) -> List[List[Span]]:
+        """Последние limit трасс, у которых уже закрыт корень; этапы — по времени начала."""
+        by_trace: "OrderedDict[str, List[Span]]" = OrderedDict()
+        finished = []
+        for span in self.spans():
+            by_trace.setdefault(span.trace_id, []).append(span)
+            if span.parent_id is None:
+                finished.append(span.trace_id)
+        return [
+            sorted(by_trace[trace_id], key=lambda span: span.start)
+            for trace_id in finished[-limit:]
+        ]
+
+    def close(self) -> None:
+        pass
+
+
+class JsonLinesExporter:
+    """По строке JSON на этап. Файл пишет отдельный поток, ротация по размеру."""
+
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 2):
+        handler = logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding='utf-8',
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        self._queue = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(self._queue, handler)
+        self._listener.start()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        self._queue.put(logging.makeLogRecord({'msg': line}))
+
+    def close(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+
+
+def configure_tracing(exporters: list) -> None:
+    """Заменяет экспортёры. Пустой список — трассировка выключена."""
+    global _exporters
+    for exporter in _exporters:
+        exporter.close()
+    _exporters = list(exporters)
+
+
+def configure_tracing_from_config(settings: dict, trace_file: Optional[str]) -> Optional[RingBufferExporter]:
+    """Экспортёры по TRACING из config. Возвращает кольцевой буфер для /traces (или None)."""
+    if not settings['ENABLED']:
+        configure_tracing([])
+        return None
+    ring = RingBufferExporter(settings['RING_SIZE'])
+    exporters = [ring]
+    if trace_file:
+        exporters.append(JsonLinesExporter(trace_file, settings['MAX_BYTES'], settings['BACKUP_COUNT']))
+    configure_tracing(exporters)
+    return ring
+
+
+def ring_buffer() -> Optional[RingBufferExporter]:
+    """Кольцевой буфер среди экспортёров (для /traces) или None."""
+    for exporter in _exporters:
+        if isinstance(exporter, RingBufferExporter):
+            return exporter
+    return None
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def _run_span(span: Span):
+    token = _current_span.set(span)
+    started = time.perf_counter()
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        _current_span.reset(token)
+        for exporter in _exporters:
+            exporter.export(span)
+
+
+@contextmanager
+def trace(name: str, **attributes):
+    """Новая трасса с корнем name. Без экспортёров — ничего не делает."""
+    if not _exporters:
+        yield None
+        return
+    root = Span(os.urandom(8).hex(), os.urandom(4).hex(), None, name, time.time(), attributes)
+    with _run_span(root) as span:
+        yield span
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Этап внутри текущей трассы; вне трассы — ничего не делает."""
+    parent = _current_span.get()
+    if parent is None or not _exporters:
+        yield None
+        return
+    child = Span(parent.trace_id, os.urandom(4).hex(), parent.span_id, name, time.time(), attributes)
+    with _run_span(child) as current:
+        yield current
+
+
+def format_trace(spans: List[Span]) -> str:
+    """Дерево этапов одной трассы. Одинаковые соседние этапы (отправки) — одной строкой."""
+    children: Dict[Optional[str], List[Span]] = {}
+    for item in spans:
+        children.setdefault(item.parent_id, []).append(item)
+    roots = children.get(None, [])
+    lines = []
+
+    def describe(item: Span) -> str:
+        attributes = ' '.join(f"{key}={value}" for key, value in item.attributes.items())
+        error = f" ✗ {item.error}" if item.error else ''
+        return f"{item.name} {item.duration_ms:.0f} ms {attributes}".rstrip() + error
+
+    def walk(parent_id: str, depth: int) -> None:
+        groups: "OrderedDict[str, List[Span]]" = OrderedDict()
+        for item in children.get(parent_id, []):
+            groups.setdefault(item.name, []).append(item)
+        for name, items in groups.items():
+            indent = '  ' * depth
+            if len(items) == 1:
+                lines.append(indent + describe(items[0]))
+                walk(items[0].span_id, depth + 1)
+                continue
+            durations = [item.duration_ms for item in items]
+            failed = sum(1 for item in items if item.error)
+            lines.append(
+                f"{indent}{name} ×{len(items)}: {sum(durations):.0f} ms, "
+                f"max {max(durations):.0f} ms" + (f", ошибок {failed}" if failed else '')
+            )
+
+    for root in roots:
+        started = time.strftime('%d.%m %H:%M:%S', time.localtime(root.start))
+        lines.append(f"{started} trace {root.trace_id}")
+        lines.append(describe(root))
+        walk(root.span_id, 1)
+    return '\n'.join(lines)
+
+
+atexit.register(configure_tracing, [])
@@ -0,0 +1,133 @@
+import unittest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+import numpy as np
+import pytz
+
+from benchmarks.fake_servers import FakeSheetsServer
+from benchmarks.synthetic import HEADERS
+import src.config as config
+from src import rich_report
+from src.anomalies import find_anomalies, history_matrix, robust_z_scores
+from src.data_processor import DataProcessor
+
+SETTINGS = {"WINDOW": 28, "THRESHOLD": 3.5, "MIN_DAYS": 7, "MIN_MAD": 1.0, "DAY": "today"}
+TODAY = date(2026, 10, 12)
+MOSCOW = pytz.timezone("Europe/Moscow")
+
+
+class RobustScoreTests(unittest.TestCase):
+    def test_drop_and_spike_are_flagged_and_noise_is_not(self):
+        steady = [str(100 + offset % 5) for offset in range(20)]
+        projects = [
+            {"name": "Провал", "today_data": 0},
+            {"name": "Всплеск", "today_data": 900},
+            {"name": "Как обычно", "today_data": 103},
+        ]
+
+        anomalies = find_anomalies(projects, [steady, steady, steady], SETTINGS)
+
+        self.assertEqual([anomaly["name"] for anomaly in anomalies], ["Всплеск", "Провал"])
+        self.assertEqual(anomalies[1]["median"], 102.0)
+        self.assertLess(anomalies[1]["score"], -3.5)
+
+    def test_short_history_and_missing_cells_are_skipped(self):
+        history = history_matrix([["5", "", "н/д", "5"], ["5"] * 10])
+        scores, medians = robust_z_scores(history, np.array([500.0, 500.0]), min_days=7, min_mad=1.0)
+
+        self.assertTrue(np.isnan(scores[0]))
+        self.assertEqual(medians[1], 5.0)
+        self.assertAlmostEqual(scores[1], 0.6745 * 495)  # ровный ряд: разброс не меньше MIN_MAD
+
+    def test_full_year_for_500_projects(self):
+        rng = np.random.default_rng(0)
+        history = rng.integers(0, 2500, size=(500, 365)).astype(np.float64)
+        history[rng.random(history.shape) < 0.15] = np.nan
+        today = rng.integers(0, 2500, size=500).astype(np.float64)
+
+        scores, medians = robust_z_scores(history, today, min_days=7, min_mad=1.0)
+
+        np.testing.assert_allclose(medians, np.nanmedian(history, axis=1))
+        mad = np.nanmedian(np.abs(history - medians[:, None]), axis=1)
+        np.testing.assert_allclose(scores, 0.6745 * (today - medians) / mad)
+
+
+class ReportAnomaliesTests(unittest.TestCase):
+    def setUp(self):
+        dates = [TODAY - timedelta(days=offset) for offset in range(30, -1, -1)]
+        headers = HEADERS + [day.strftime("%d.%m.%y") for day in dates]
+        summary = ["1000", "", "500", "100"]
+        values = [
+            headers,
+            ["[LR1] Провал", "TRUE"] + summary + ["80"] * 30 + ["0"],
+            ["[LR2] Ровно", "TRUE"] + summary + ["80"] * 30 + ["81"],
+            # к 13:40 набрано полдня, вчера — провал
+            ["[LR3] Полдня", "TRUE"] + summary + ["80"] * 29 + ["0", "40"],
+        ]
+        sheet_settings = {**config.SHEET_SETTINGS["SECONDARY"], "SPREADSHEET_ID": "sheet"}
+        sheet_settings["STRUCTURE"] = {**sheet_settings["STRUCTURE"], "RANGE": "A1:AK4"}
+        self.server = FakeSheetsServer({"sheet": {sheet_settings["NAME"]: values}})
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        for patcher in (
+            patch.object(config, "SHEETS_API_BASE_URL", self.server.url),
+            patch.object(config, "CREDENTIALS_FILE", None),
+            patch.dict(config.SHEET_SETTINGS, {"SECONDARY": sheet_settings}),
+            patch.dict(config.ANOMALIES, {**SETTINGS, "ENABLED": True}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def generate(self, streaming):
+        with patch("src.data_processor.datetime") as datetime_mock, patch.object(
+            config, "SHEETS_STREAMING", streaming
+        ):
+            datetime_mock.now.return_value = MOSCOW.localize(datetime(2026, 10, 12, 13, 40))
+            return DataProcessor().generate_secondary_report()
+
+    def test_report_lists_anomalies_in_both_read_modes(self):
+        for streaming in (False, True):
+            with self.subTest(streaming=streaming):
+                report = self.generate(streaming)
+
+                self.assertTrue(report["success"])
+                self.assertEqual(
+                    [anomaly["name"] for anomaly in report["anomalies"]], ["[LR1] Провал", "[LR3] Полдня"]
+                )
+                self.assertNotIn("history", report["projects"][0])
+                self.assertIn("обычно: 80", report["anomalies_warning"])
+
+    def test_anomalies_table_is_rich(self):
+        report = self.generate(False)
+
+        (text,) = rich_report.build_anomalies_messages(rich_report.anomalies_to_rows(report["anomalies"]))
+
+        self.assertIn("## Внимание · аномалии", text)
+        self.assertIn("| Проект | Сегодня | Обычно | z |", text)
+        self.assertIn("| \\[LR1\\] Провал | 0 | 80 |", text)
+
+    def test_midday_report_checks_last_full_day(self):
+        with patch.dict(config.ANOMALIES, {"DAY": "yesterday"}):
+            report = self.generate(False)
+
+        self.assertEqual(report["anomalies_day"], TODAY - timedelta(days=1))
+        (anomaly,) = report["anomalies"]
+        self.assertEqual((anomaly["name"], anomaly["value"], anomaly["median"]), ("[LR3] Полдня", 0, 80.0))
+        self.assertIn("вчера: 0", report["anomalies_warning"])
+        (text,) = rich_report.build_anomalies_messages(
+            rich_report.anomalies_to_rows(report["anomalies"]), "Вчера"
+        )
+        self.assertIn("| Вчера | 0 |", text)
+
+    def test_disabled_detection_leaves_report_as_before(self):
+        with patch.dict(config.ANOMALIES, {"ENABLED": False}):
+            report = self.generate(False)
+
+        self.assertEqual(report["anomalies"], [])
+        self.assertEqual(report["anomalies_warning"], "")
+        self.assertEqual(report["projects"][0]["today_data"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import date, datetime
+from unittest.mock import patch
+
+import requests
+
+from benchmarks.fake_servers import (
+    FakeSheetsServer,
+    FakeTelegramServer,
+    SheetsFaults,
+    clip_values,
+    parse_a1_range,
+)
+from benchmarks.run_benchmarks import percentile
+from benchmarks.synthetic import make_sheet
+from src import rich_report
+import src.config as config
+from src.data_processor import DataProcessor, index_to_column
+
+
+class SyntheticSheetTests(unittest.TestCase):
+    def test_sheet_has_requested_shape_and_today_last(self):
+        rows = make_sheet(projects=20, dates=7, today=date(2026, 8, 16))
+
+        self.assertEqual(21, len(rows))
+        self.assertEqual(6 + 7, len(rows[0]))
+        self.assertEqual("16.08.26", rows[0][-1])
+        self.assertTrue(all(row[0].startswith(f"[LR{index}]") for index, row in enumerate(rows[1:], 1)))
+
+    def test_sheet_is_deterministic_for_seed(self):
+        first = make_sheet(projects=5, dates=3, today=date(2026, 8, 16), seed=7)
+        second = make_sheet(projects=5, dates=3, today=date(2026, 8, 16), seed=7)
+        self.assertEqual(first, second)
+
+
+class FakeServerTests(unittest.TestCase):
+    def test_sheets_server_serves_values_get(self):
+        rows = [["Проект"], ["[LR1] Альфа"]]
+        with FakeSheetsServer({"sheet": rows}) as server:
+            response = requests.get(f"{server.url}/v4/spreadsheets/sheet/values/A1:B2", timeout=5)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(rows, response.json()["values"])
+        self.assertEqual(1, server.requests_count)
+
+    def test_sheets_server_clips_range_and_serves_batch_get(self):
+        rows = [["Проект", "Статус", "Объем"], ["[LR1] Альфа", "TRUE", "100"], ["[LR2] Бета", "FALSE", "200"]]
+        with FakeSheetsServer({"sheet": {"Лист": rows}}) as server:
+            response = requests.get(
+                f"{server.url}/v4/spreadsheets/sheet/values:batchGet",
+                params={"ranges": ["'Лист'!A2:A3", "'Лист'!C1:C2"]},
+                timeout=5,
+            )
+
+        value_ranges = response.json()["valueRanges"]
+        self.assertEqual([["[LR1] Альфа"], ["[LR2] Бета"]], value_ranges[0]["values"])
+        self.assertEqual([["Объем"], ["100"]], value_ranges[1]["values"])
+
+    def test_sheets_server_injects_scripted_failures(self):
+        faults = SheetsFaults()
+        faults.fail_next(429, 503)
+        with FakeSheetsServer({"sheet": [["A"]]}, faults=faults) as server:
+            statuses = [
+                requests.get(f"{server.url}/v4/spreadsheets/sheet/values/A1", timeout=5).status_code
+                for _ in range(3)
+            ]
+
+        self.assertEqual([429, 503, 200], statuses)
+        self.assertEqual({429: 1, 503: 1}, server.errors_count)
+
+    def test_data_processor_reads_from_configured_base_url(self):
+        today = date.today()
+        rows = make_sheet(projects=5, dates=2, today=today)
+        sheet_settings = {
+            **config.SHEET_SETTINGS["SECONDARY"],
+            "SPREADSHEET_ID": "sheet",
+        }
+        with FakeSheetsServer({"sheet": {sheet_settings["NAME"]: rows}}) as server, patch.object(
+            config, "SHEETS_API_BASE_URL", server.url
+        ), patch.object(config, "CREDENTIALS_FILE", None), patch.dict(
+            config.SHEET_SETTINGS, {"SECONDARY": sheet_settings}
+        ):
+            values = DataProcessor().get_sheet_data("SECONDARY")
+
+        self.assertEqual(rows, values)
+        self.assertEqual(1, server.requests_count)
+
+    def test_rich_sender_talks_to_fake_telegram(self):
+        with FakeTelegramServer() as server, patch.object(
+            rich_report, "TELEGRAM_API_URL", server.url
+        ):
+            rich_report.send_rich_telegram_message("123:abc", 100, "## Отчёт")
+
+        self.assertEqual(1, server.requests_count)
+
+
+class ReplayBenchmarkTests(unittest.TestCase):
+    def test_replay_run_reports_same_scenarios_as_benchmark(self):
+        from benchmarks.replay import main as replay_main
+        from src.sheets_capture import SheetsRecorder
+
+        values = make_sheet(projects=20, dates=5, today=date(2026, 10, 12))
+        range_name = "'{}'!{}".format(
+            config.SHEET_SETTINGS["SECONDARY"]["NAME"],
+            config.SHEET_SETTINGS["SECONDARY"]["STRUCTURE"]["RANGE"],
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            SheetsRecorder(directory).record(
+                range_name,
+                {"range": range_name, "majorDimension": "ROWS", "values": values},
+                0.25,
+                datetime.fromisoformat("2026-10-12T13:40:00+03:00"),
+            )
+            with redirect_stderr(io.StringIO()), redirect_stdout(io.StringIO()):
+                report = replay_main([directory, "--iterations", "1"])
+
+        scenarios = {item["scenario"]: item for item in report["results"]}
+        self.assertEqual(
+            set(scenarios),
+            {
+                "generate_secondary_report",
+                "generate_secondary_report_streaming",
+                "build_rich_report_messages",
+                "deliver_secondary_report",
+            },
+        )
+        self.assertEqual(scenarios["generate_secondary_report"]["projects"], 20)
+        self.assertEqual(scenarios["generate_secondary_report"]["dates"], 5)
+        self.assertGreaterEqual(scenarios["deliver_secondary_report"]["messages_per_delivery"], 1)
+
+
+class RangeTests(unittest.TestCase):
+    def test_parse_a1_range(self):
+        self.assertEqual(parse_a1_range("'[учет данных] 2025'!A1:ZZ227"), ("[учет данных] 2025", 0, 0, 227, 702))
+        self.assertEqual(parse_a1_range("Лист!E:E"), ("Лист", 0, 4, None, 5))
+        self.assertEqual(parse_a1_range("B2"), (None, 1, 1, 2, 2))
+
+    def test_clip_values_drops_empty_tails(self):
+        values = [["a", "b", ""], ["c"], [""], []]
+        self.assertEqual(clip_values(values, "A1:C4"), [["a", "b"], ["c"]])
+
+
+class HelperTests(unittest.TestCase):
+    def test_percentile_interpolates(self):
+        self.assertEqual(percentile([1.0, 2.0, 3.0, 4.0], 0.5), 2.5)
+        self.assertEqual(percentile([5.0], 0.99), 5.0)
+
+    def test_index_to_column_round_trip(self):
+        self.assertEqual(index_to_column(0), "A")
+        self.assertEqual(index_to_column(25), "Z")
+        self.assertEqual(index_to_column(26), "AA")
+        self.assertEqual(index_to_column(701), "ZZ")
+
+
+if __name__ == "__main__":
+    unittest.main()
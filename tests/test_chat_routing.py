@@ -0,0 +1,98 @@
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+from benchmarks.fake_servers import FakeSheetsServer
+from benchmarks.synthetic import make_sheet
+from src import rich_report
+from src.chat_routing import ChatRoutingIndex, parse_chat_id
+import src.config as config
+from src.data_processor import DataProcessor
+
+
+class ChatRoutingIndexTests(unittest.TestCase):
+    def test_parse_chat_id(self):
+        self.assertEqual(-100123, parse_chat_id(" -100 123 "))
+        self.assertEqual(-100123, parse_chat_id("-100\xa0123"))
+        self.assertIsNone(parse_chat_id(""))
+        self.assertIsNone(parse_chat_id(None))
+        self.assertIsNone(parse_chat_id("чат Альфы"))
+
+    def test_rebuilds_only_when_pairs_change(self):
+        index = ChatRoutingIndex()
+        pairs = [("[LR1] Alpha", "-101"), ("[LR2] Beta", ""), ("[LR3] Gamma", "oops")]
+
+        self.assertTrue(index.update(pairs))
+        self.assertFalse(index.update(list(pairs)))
+        self.assertEqual(1, index.rebuilds)
+        self.assertEqual({"[LR1] Alpha": -101}, index.chat_by_project)
+
+        self.assertTrue(index.update([("[LR1] Alpha", "-102")]))
+        self.assertEqual(-102, index.chat_for(" [LR1] Alpha "))
+
+    def test_route_sets_and_clears_chat(self):
+        index = ChatRoutingIndex()
+        index.update([("A", "-1")])
+        projects = [{"name": "A"}, {"name": "B", "telegram_chat_id": "junk"}]
+
+        index.route(projects)
+
+        self.assertEqual([{"name": "A", "telegram_chat_id": -1}, {"name": "B"}], projects)
+
+
+class ReportRoutingTests(unittest.TestCase):
+    def run_report(self, sheets, structure=None, routing=None, reports=1):
+        sheet_settings = {
+            **config.SHEET_SETTINGS["SECONDARY"],
+            "SPREADSHEET_ID": "sheet",
+            "STRUCTURE": {**config.SHEET_SETTINGS["SECONDARY"]["STRUCTURE"], **(structure or {})},
+            "ROUTING": {**config.SHEET_SETTINGS["SECONDARY"]["ROUTING"], **(routing or {})},
+        }
+        with FakeSheetsServer({"sheet": sheets}) as server, patch.object(
+            config, "SHEETS_API_BASE_URL", server.url
+        ), patch.object(config, "CREDENTIALS_FILE", None), patch.dict(
+            config.SHEET_SETTINGS, {"SECONDARY": sheet_settings}
+        ):
+            processor = DataProcessor()
+            results = [processor.generate_secondary_report() for _ in range(reports)]
+            return processor, results, server.requests_count
+
+    def test_chat_id_column_routes_projects(self):
+        rows = make_sheet(projects=9, dates=2, today=date.today())
+        for row, chat in zip(rows[1:], ["-101", "", "-103"] * 3):
+            row[3] = chat  # колонка D в листе не используется отчётом
+        name = config.SHEET_SETTINGS["SECONDARY"]["NAME"]
+
+        _, (result,), _ = self.run_report({name: rows}, structure={"CHAT_ID_COLUMN": "D"})
+
+        chats = {project["name"]: project.get("telegram_chat_id") for project in result["projects"]}
+        active = {row[0]: row[3] for row in rows[1:] if row[1] == "TRUE"}
+        self.assertTrue(active)
+        for project_name, raw_chat in active.items():
+            self.assertEqual(int(raw_chat) if raw_chat else None, chats[project_name])
+
+        grouped = rich_report.group_projects_by_chat(
+            result["projects"], default_chat_id=-100, require_today_data=False
+        )
+        self.assertEqual(len(active), sum(len(projects) for projects in grouped.values()))
+
+    def test_routing_tab_is_cached_between_reports(self):
+        rows = make_sheet(projects=3, dates=2, today=date.today())
+        name = config.SHEET_SETTINGS["SECONDARY"]["NAME"]
+        routing_rows = [["Проект", "chat_id"]] + [[row[0], f"-{100 + number}"] for number, row in enumerate(rows[1:], 1)]
+
+        processor, results, requests_count = self.run_report(
+            {name: rows, "Маршруты": routing_rows},
+            routing={"NAME": "Маршруты"},
+            reports=3,
+        )
+
+        self.assertEqual(4, requests_count)  # три отчёта + одно чтение вкладки
+        self.assertEqual(1, processor.routing.rebuilds)
+        for project in results[-1]["projects"]:
+            self.assertEqual(processor.routing.chat_for(project["name"]), project["telegram_chat_id"])
+            self.assertIsNotNone(project["telegram_chat_id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import copy
+import json
+import os
+import tempfile
+import types
+import unittest
+
+import src.config as config
+from src.config_reload import RELOADABLE, ConfigReloader
+from src.data_processor import DataProcessor
+
+
+def fake_config():
+    """Свой модуль с копией настроек: тесты не трогают настоящий src.config."""
+    module = types.ModuleType("fake_config")
+    for key in RELOADABLE:
+        setattr(module, key, copy.deepcopy(getattr(config, key)))
+    module.REPORTS_MESSAGE_FORMAT = "rich"
+    return module
+
+
+class ConfigReloaderTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "config_overrides.json")
+        self.module = fake_config()
+        self.changes = []
+        self.reloader = ConfigReloader(self.path, on_change=self.changes.append, module=self.module)
+        self.version = 0
+
+    def write(self, payload):
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write(payload if isinstance(payload, str) else json.dumps(payload))
+        # mtime файловой системы бывает грубым: новая версия — новый mtime
+        self.version += 1
+        os.utime(self.path, ns=(self.version * 10**9, self.version * 10**9))
+
+    def structure(self):
+        return self.module.SHEET_SETTINGS["SECONDARY"]["STRUCTURE"]
+
+    def test_overrides_are_merged_and_swapped_in(self):
+        settings_before = self.module.SHEET_SETTINGS
+        self.write({
+            "REPORTS_MESSAGE_FORMAT": "legacy",
+            "SHEET_SETTINGS": {"SECONDARY": {"STRUCTURE": {"RANGE": "A1:ZZ300", "CHAT_ID_COLUMN": "D"}}},
+        })
+
+        self.assertEqual(self.reloader.check(), ["REPORTS_MESSAGE_FORMAT", "SHEET_SETTINGS"])
+
+        self.assertEqual(self.module.REPORTS_MESSAGE_FORMAT, "legacy")
+        self.assertEqual(self.structure()["RANGE"], "A1:ZZ300")
+        self.assertEqual(self.structure()["DATA_START_COLUMN"], "G")
+        self.assertIsNot(self.module.SHEET_SETTINGS, settings_before)
+        self.assertEqual(settings_before["SECONDARY"]["STRUCTURE"]["RANGE"], "A1:ZZ227")
+        self.assertEqual(self.changes, [["REPORTS_MESSAGE_FORMAT", "SHEET_SETTINGS"]])
+
+    def test_unchanged_file_is_not_reread(self):
+        self.write({"REPORTS_MESSAGE_FORMAT": "legacy"})
+        self.reloader.check()
+        self.module.REPORTS_MESSAGE_FORMAT = "rich"
+
+        self.assertEqual(self.reloader.check(), [])
+        self.assertEqual(self.module.REPORTS_MESSAGE_FORMAT, "rich")
+
+    def test_invalid_file_keeps_current_settings(self):
+        cases = {
+            "unknown format": {"REPORTS_MESSAGE_FORMAT": "html"},
+            "two-letter column": {"SHEET_SETTINGS": {"SECONDARY": {"STRUCTURE": {"STATUS_COLUMN": "AB"}}}},
+            "column after dates": {"SHEET_SETTINGS": {"SECONDARY": {"STRUCTURE": {"REMAINING_COLUMN": "H"}}}},
+            "typo in key": {"SHEET_SETTINGS": {"SECONDARY": {"STRUCTURE": {"RANGES": "A1:B2"}}}},
+            "not reloadable": {"BOT_TOKEN": "x"},
+            "per chat order": {"DELIVERY_QUEUE": {"PER_CHAT_ORDER": "random"}},
+            "broken json": '{"REPORTS_MESSAGE_FORMAT": ',
+        }
+        for number, (name, payload) in enumerate(cases.items(), 1):
+            with self.subTest(name):
+                self.write(payload)
+                with self.assertLogs("src.config_reload", "ERROR"):
+                    self.assertEqual(self.reloader.check(), [])
+                self.assertEqual(self.reloader.errors, number)
+                self.assertEqual(self.module.REPORTS_MESSAGE_FORMAT, "rich")
+                self.assertEqual(self.structure()["STATUS_COLUMN"], "B")
+
+        self.write({"REPORTS_MESSAGE_FORMAT": "legacy"})
+        self.assertEqual(self.reloader.check(), ["REPORTS_MESSAGE_FORMAT"])
+
+    def test_removed_file_restores_defaults(self):
+        self.write({"ANOMALIES": {"THRESHOLD": 5.0}})
+        self.reloader.check()
+        os.remove(self.path)
+
+        self.assertEqual(self.reloader.check(), ["ANOMALIES"])
+        self.assertEqual(self.module.ANOMALIES, config.ANOMALIES)
+
+    def test_sheet_caches_reset_keeps_warm_client(self):
+        processor = DataProcessor.__new__(DataProcessor)
+        processor._init_state()
+        processor.service = object()
+        processor.snapshots = {"SECONDARY": "old snapshot"}
+        processor.history = ("fetched", "matrix")
+        processor.today_column = ("19.10.26", 30)
+        service = processor.service
+
+        processor.reset_sheet_caches()
+
+        self.assertIs(processor.service, service)
+        self.assertEqual(processor.snapshots, {})
+        self.assertIsNone(processor.history)
+        self.assertIsNone(processor.today_column)
+
+
+    def test_running_report_keeps_its_snapshot_and_defers_cache_reset(self):
+        processor = DataProcessor.__new__(DataProcessor)
+        processor._init_state()
+        processor.snapshots = {"SECONDARY": "old snapshot"}
+        reloader = ConfigReloader(
+            self.path,
+            on_change=lambda changed: processor.reset_sheet_caches(),
+            lock=processor.settings_lock,
+        )
+        before = config.SHEET_SETTINGS
+        self.addCleanup(setattr, config, "SHEET_SETTINGS", before)
+        self.write({"SHEET_SETTINGS": {"SECONDARY": {"STRUCTURE": {"RANGE": "A1:ZZ300"}}}})
+
+        with processor.report_settings() as settings:
+            self.assertEqual(reloader.check(), ["SHEET_SETTINGS"])
+            self.assertIs(settings["SHEET_SETTINGS"], before)
+            self.assertEqual(processor.snapshots, {"SECONDARY": "old snapshot"})
+
+        self.assertEqual(processor.snapshots, {})
+        with processor.report_settings() as settings:
+            self.assertEqual(settings["SHEET_SETTINGS"]["SECONDARY"]["STRUCTURE"]["RANGE"], "A1:ZZ300")
+
+if __name__ == "__main__":
+    unittest.main()
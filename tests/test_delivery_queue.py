@@ -0,0 +1,95 @@
+import asyncio
+import unittest
+
+from src.delivery_queue import ANOMALIES, DISABLE, MAIN, REDUCE, DeliveryQueue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fill(queue, sent, clock=None):
+    """Основной отчёт в три чата, потом предупреждения в чат -100, как в deliver_secondary_report."""
+
+    def sender(label):
+        async def send():
+            sent.append(label)
+            if clock is not None:
+                clock.now += 1.0
+            return label
+        return send
+
+    for chat_id in (100, 200, -100):
+        queue.put(MAIN, chat_id, sender(f"main {chat_id}"))
+    queue.put(ANOMALIES, -100, sender("anomalies -100"))
+    queue.put(REDUCE, -100, sender("reduce -100"))
+    queue.put(DISABLE, -100, sender("disable -100"))
+
+
+class DeliveryQueueTests(unittest.TestCase):
+    def test_priority_order_is_global_across_chats(self):
+        sent = []
+        queue = DeliveryQueue("priority")
+        fill(queue, sent)
+
+        asyncio.run(queue.drain())
+
+        self.assertEqual(
+            sent,
+            ["disable -100", "reduce -100", "main 100", "main 200", "main -100", "anomalies -100"],
+        )
+        self.assertEqual(len(queue), 0)
+
+    def test_fifo_keeps_chat_order_but_serves_urgent_chat_first(self):
+        sent = []
+        queue = DeliveryQueue("fifo")
+        fill(queue, sent)
+
+        asyncio.run(queue.drain())
+
+        self.assertEqual(
+            sent,
+            ["main -100", "anomalies -100", "reduce -100", "disable -100", "main 100", "main 200"],
+        )
+
+    def test_wait_time_is_measured_per_priority(self):
+        clock = FakeClock()
+        queue = DeliveryQueue("priority", clock=clock)
+        deliveries = []
+        fill(queue, deliveries, clock)
+
+        asyncio.run(queue.drain())
+        stats = queue.wait_stats()
+
+        self.assertEqual(stats["disable"], {"count": 1, "p50_ms": 0.0, "max_ms": 0.0})
+        self.assertEqual(stats["main"], {"count": 3, "p50_ms": 3000.0, "max_ms": 4000.0})
+        self.assertEqual(stats["anomalies"]["max_ms"], 5000.0)
+
+    def test_failed_send_is_logged_and_the_rest_still_goes(self):
+        async def fail():
+            raise RuntimeError("Bot API недоступен")
+
+        sent = []
+        queue = DeliveryQueue("priority")
+        fill(queue, sent)
+        broken = queue.put(DISABLE, 300, fail)
+
+        with self.assertLogs("src.delivery_queue", "ERROR"):
+            failed = asyncio.run(queue.drain())
+
+        self.assertEqual(failed, [broken])
+        self.assertEqual((broken.result, broken.error), (False, "Bot API недоступен"))
+        self.assertEqual(len(sent), 6)
+        self.assertEqual(len(queue), 0)
+
+    def test_unknown_per_chat_order_fails_clearly(self):
+        with self.assertRaises(ValueError):
+            DeliveryQueue("random")
+
+
+if __name__ == "__main__":
+    unittest.main()
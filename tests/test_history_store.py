@@ -0,0 +1,121 @@
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import numpy as np
+
+from benchmarks.fake_servers import FakeSheetsServer
+from benchmarks.synthetic import make_sheet
+import src.config as config
+from src.data_processor import DataProcessor, range_end
+from src.history_store import HistoryStore
+from src.report_history import HistoryMatrix
+
+COLUMNS = {"name": 0, "status": 1, "volume": 2, "remaining": 4, "issued": 5, "data_start": 6}
+
+
+class HistoryStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.store = HistoryStore(self.directory.name)
+
+    def test_empty_store_loads_none(self):
+        self.assertIsNone(self.store.load())
+
+    def test_save_keeps_prefix_and_appends(self):
+        dates = [date(2026, 10, day) for day in (1, 2, 3)]
+        self.store.save(["a", "b"], dates, np.array([[1, 2], [3, 4], [5, 6]]))
+
+        stored = self.store.save(
+            ["a", "b"],
+            dates + [date(2026, 10, 4)],
+            np.array([[50, 60], [70, 80]]),
+            keep=2,
+        )
+
+        self.assertIsInstance(stored.matrix, np.memmap)
+        self.assertEqual([[1, 2], [3, 4], [50, 60], [70, 80]], stored.matrix.tolist())
+        self.assertEqual(date(2026, 10, 4), stored.watermark)
+
+    def test_matrix_not_matching_index_is_ignored(self):
+        self.store.save(["a"], [date(2026, 10, 1)], np.array([[1]]))
+        with open(self.store.matrix_path, "ab") as file:
+            file.write(b"\0\0\0\0")
+
+        self.assertIsNone(self.store.load())
+
+
+class SyncHistoryTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.today = date.today()
+        self.values = make_sheet(projects=20, dates=40, today=self.today)
+        sheet_settings = {**config.SHEET_SETTINGS["SECONDARY"], "SPREADSHEET_ID": "sheet"}
+        sheet_settings["STRUCTURE"] = {**sheet_settings["STRUCTURE"], "RANGE": "A1:ZZ21"}
+        self.server = FakeSheetsServer({"sheet": {sheet_settings["NAME"]: self.values}})
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        for patcher in (
+            patch.object(config, "SHEETS_API_BASE_URL", self.server.url),
+            patch.object(config, "CREDENTIALS_FILE", None),
+            patch.dict(config.SHEET_SETTINGS, {"SECONDARY": sheet_settings}),
+            patch.dict(config.HISTORY_STORE, {"ENABLED": True, "DIRECTORY": self.directory.name, "REFETCH_DAYS": 2}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def assert_matches_full_parse(self, history):
+        expected = HistoryMatrix.from_values(self.values, COLUMNS)
+        self.assertEqual(expected.dates, history.dates)
+        self.assertEqual(expected.prefix.tolist(), history.prefix.tolist())
+        self.assertEqual(expected.projects, history.projects)
+
+    def test_cold_start_fetches_only_columns_after_watermark(self):
+        self.assert_matches_full_parse(DataProcessor().sync_history())
+
+        # назавтра: в листе новая колонка, вчерашняя цифра поправилась
+        self.values[0].append((self.today + timedelta(days=1)).strftime("%d.%m.%y"))
+        for row in self.values[1:]:
+            row.extend([""] * (len(self.values[0]) - 1 - len(row)))
+            row[-1] = "7"
+            row.append("11")
+
+        saved = []
+        original_save = HistoryStore.save
+
+        def spy_save(store, names, dates, rows, keep=0):
+            saved.append((keep, rows.shape[0]))
+            return original_save(store, names, dates, rows, keep=keep)
+
+        with patch.object(HistoryStore, "save", spy_save):
+            history = DataProcessor().sync_history()
+
+        self.assertEqual([(38, 3)], saved)  # две последние сохранённые даты + новая
+        self.assert_matches_full_parse(history)
+
+    def test_changed_project_list_rebuilds_everything(self):
+        DataProcessor().sync_history()
+        self.values[5][0] = "[LR999] Новый"
+
+        history = DataProcessor().sync_history()
+
+        self.assert_matches_full_parse(history)
+
+    def test_range_report_uses_store(self):
+        processor = DataProcessor()
+        result = processor.generate_range_report(self.today - timedelta(days=6), self.today)
+
+        self.assertTrue(result["success"])
+        self.assertEqual(7, result["days"])
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, "index.json")))
+
+    def test_range_end(self):
+        self.assertEqual(("ZZ", 227), range_end("A1:ZZ227"))
+
+
+if __name__ == "__main__":
+    unittest.main()
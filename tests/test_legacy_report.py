@@ -0,0 +1,119 @@
+import unittest
+
+import src.config as config
+from src.legacy_report import (
+    TELEGRAM_MESSAGE_MAX_CHARS,
+    render_projects_text,
+    split_markdown_message,
+    strip_markdown,
+)
+
+
+def make_project(number):
+    return {
+        "name": f"[LR{number}] Project_{number}",
+        "total_volume": 1000,
+        "tariff_remaining": 1000 - number,
+        "total_issued": number,
+        "today_data": number % 7,
+    }
+
+
+class RenderProjectsTextTests(unittest.TestCase):
+    def test_matches_str_format(self):
+        templates = [
+            config.MESSAGES["SECONDARY_PROJECT_FORMAT"],
+            "{{literal}} {name!r} {total_volume:>6}",
+            "{name[0]} {total_volume}",
+            "no fields",
+        ]
+        project = make_project(5)
+        for template in templates:
+            with self.subTest(template=template):
+                self.assertEqual(template.format(**project), render_projects_text(template, [project]))
+
+    def test_errors_match_str_format(self):
+        cases = {
+            "missing field": ("{name} {absent}", KeyError),
+            "unknown conversion": ("{name!z}", ValueError),
+            "bad spec": ("{name:d}", ValueError),
+            "unbalanced brace": ("{name", ValueError),
+        }
+        project = make_project(5)
+        for name, (template, error) in cases.items():
+            with self.subTest(name):
+                with self.assertRaises(error):
+                    template.format(**project)
+                with self.assertRaises(error):
+                    render_projects_text(template, [project])
+
+    def test_keyword_field_names(self):
+        self.assertEqual(render_projects_text("{class}/{def}", [{"class": 1, "def": 2}]), "1/2")
+
+    def test_render_projects_text_equals_concatenation(self):
+        template = config.MESSAGES["SECONDARY_PROJECT_FORMAT"]
+        projects = [make_project(number) for number in range(50)]
+        expected = ""
+        for project in projects:
+            expected += template.format(**project)
+        self.assertEqual(expected, render_projects_text(template, projects))
+
+
+class SplitMarkdownMessageTests(unittest.TestCase):
+    def test_short_text_is_single_message(self):
+        self.assertEqual(["*hi*"], split_markdown_message("*hi*"))
+        self.assertEqual([], split_markdown_message(""))
+
+    def test_large_report_uses_minimum_messages(self):
+        projects_text = render_projects_text(
+            config.MESSAGES["SECONDARY_PROJECT_FORMAT"],
+            [make_project(number) for number in range(500)],
+        )
+        text = config.MESSAGES["SECONDARY_REPORT"].format(date="16.08.2026", projects_data=projects_text)
+
+        messages = split_markdown_message(text)
+
+        self.assertTrue(all(len(message) <= TELEGRAM_MESSAGE_MAX_CHARS for message in messages))
+        self.assertLessEqual(len(messages), len(text) // (TELEGRAM_MESSAGE_MAX_CHARS - 200) + 1)
+        # разрез только по строкам: склеив, получаем исходные строки
+        self.assertEqual(
+            [line for line in text.split("\n") if line],
+            [line for message in messages for line in message.split("\n") if line],
+        )
+
+    def test_open_entity_is_closed_and_reopened(self):
+        text = "*" + "\n".join(f"line {number}" for number in range(40)) + "*"
+        messages = split_markdown_message(text, limit=100)
+
+        self.assertGreater(len(messages), 1)
+        for message in messages:
+            self.assertLessEqual(len(message), 100)
+            self.assertTrue(message.startswith("*") and message.endswith("*"), message)
+            self.assertEqual(0, message.count("*") % 2)
+
+    def test_code_block_is_closed_and_reopened(self):
+        text = "```\n" + "\n".join("x_y*z" for _ in range(60)) + "\n```"
+        messages = split_markdown_message(text, limit=80)
+
+        for message in messages:
+            self.assertLessEqual(len(message), 80)
+            self.assertTrue(message.startswith("```") and message.endswith("```"), message)
+
+    def test_escaped_markers_do_not_open_entities(self):
+        line = r"\[LR1\] a\_b \*"
+        for message in split_markdown_message("\n".join([line] * 30), limit=60):
+            self.assertEqual({line}, set(message.split("\n")))
+
+    def test_long_line_is_cut_at_spaces_not_inside_links(self):
+        text = " ".join(["word"] * 40 + ["[link text](https://example.com/a_b)"] + ["word"] * 40)
+        messages = split_markdown_message(text, limit=100, markdown=False)
+
+        self.assertTrue(all(len(message) <= 100 for message in messages))
+        self.assertTrue(any("[link text](https://example.com/a_b)" in message for message in messages))
+
+    def test_strip_markdown(self):
+        self.assertEqual("a b c", strip_markdown("*a* _b_ `c`"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.live_dashboard import LiveDashboard
+
+_real_sleep = asyncio.sleep
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+        await _real_sleep(0)
+
+
+def make_bot():
+    bot = MagicMock()
+    bot.token = "123:abc"
+    bot.pin_chat_message = AsyncMock()
+    return bot
+
+
+class LiveDashboardTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.clock = FakeClock()
+        self.bot = make_bot()
+        self.dashboard = LiveDashboard(self.bot, min_edit_interval=3, clock=self.clock)
+        self.sent = []
+        self.edits = []
+        patches = [
+            patch(
+                "src.rich_report.send_rich_telegram_message",
+                side_effect=lambda token, chat_id, text: self.sent.append((chat_id, text)) or 77,
+            ),
+            patch(
+                "src.rich_report.edit_rich_telegram_message",
+                side_effect=lambda token, chat_id, message_id, text: self.edits.append((chat_id, message_id, text)),
+            ),
+            patch("src.live_dashboard.asyncio.sleep", side_effect=self.clock.sleep),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_first_publish_sends_and_pins(self):
+        self.assertEqual("sent", await self.dashboard.publish(-100, "v1"))
+
+        self.assertEqual([(-100, "v1")], self.sent)
+        self.bot.pin_chat_message.assert_awaited_once_with(
+            chat_id=-100, message_id=77, disable_notification=True
+        )
+
+    async def test_same_text_is_skipped_and_new_text_is_edited(self):
+        await self.dashboard.publish(-100, "v1")
+        self.clock.now += 10
+
+        self.assertEqual("unchanged", await self.dashboard.publish(-100, "v1"))
+        self.assertEqual("edited", await self.dashboard.publish(-100, "v2"))
+        self.assertEqual([(-100, 77, "v2")], self.edits)
+        self.assertEqual(1, len(self.sent))
+
+    async def test_edits_inside_window_are_throttled_and_coalesced(self):
+        await self.dashboard.publish(-100, "v1")
+        started = self.clock.now
+
+        results = await asyncio.gather(
+            self.dashboard.publish(-100, "v2"),
+            self.dashboard.publish(-100, "v3"),
+            self.dashboard.publish(-100, "v4"),
+        )
+
+        self.assertEqual(["edited", "scheduled", "scheduled"], results)
+        self.assertEqual([(-100, 77, "v4")], self.edits)
+        self.assertGreaterEqual(self.clock.now - started, 3)
+
+    async def test_lost_message_is_sent_again(self):
+        await self.dashboard.publish(-100, "v1")
+        self.clock.now += 10
+        with patch(
+            "src.rich_report.edit_rich_telegram_message",
+            side_effect=RuntimeError("Bad Request: message to edit not found"),
+        ):
+            self.assertEqual("sent", await self.dashboard.publish(-100, "v2"))
+        self.assertEqual(2, len(self.sent))
+
+    async def test_not_modified_counts_as_edited(self):
+        await self.dashboard.publish(-100, "v1")
+        self.clock.now += 10
+        with patch(
+            "src.rich_report.edit_rich_telegram_message",
+            side_effect=RuntimeError("Bad Request: message is not modified"),
+        ):
+            self.assertEqual("edited", await self.dashboard.publish(-100, "v2"))
+        self.assertEqual("unchanged", await self.dashboard.publish(-100, "v2"))
+
+    async def test_pin_failure_does_not_break_publish(self):
+        self.bot.pin_chat_message.side_effect = RuntimeError("not enough rights")
+        self.assertEqual("sent", await self.dashboard.publish(-100, "v1"))
+        self.clock.now += 10
+        self.assertEqual("edited", await self.dashboard.publish(-100, "v2"))
+
+    async def test_state_survives_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            state_file = os.path.join(directory, "live.json")
+            dashboard = LiveDashboard(self.bot, state_file=state_file, clock=self.clock)
+            await dashboard.publish(-100, "v1")
+            with open(state_file, encoding="utf-8") as file:
+                self.assertEqual(77, json.load(file)["-100"]["message_id"])
+
+            restarted = LiveDashboard(self.bot, state_file=state_file, clock=self.clock)
+            self.assertEqual("unchanged", await restarted.publish(-100, "v1"))
+            self.clock.now += 10
+            self.assertEqual("edited", await restarted.publish(-100, "v2"))
+        self.assertEqual(1, len(self.sent))
+
+
+    async def test_pin_made_by_another_process_is_picked_up(self):
+        with tempfile.TemporaryDirectory() as directory:
+            state_file = os.path.join(directory, "live.json")
+            bot_side = LiveDashboard(self.bot, state_file=state_file, clock=self.clock)
+            await bot_side.publish(-100, "v1")
+
+            cron_side = LiveDashboard(self.bot, state_file=state_file, clock=self.clock)
+            with patch("src.rich_report.send_rich_telegram_message", return_value=88):
+                self.clock.now += 10
+                with patch(
+                    "src.rich_report.edit_rich_telegram_message",
+                    side_effect=RuntimeError("Bad Request: message to edit not found"),
+                ):
+                    self.assertEqual("sent", await cron_side.publish(-100, "v2"))
+                await cron_side.publish(-200, "other")
+
+            self.clock.now += 10
+            self.assertEqual("edited", await bot_side.publish(-100, "v3"))
+            await bot_side.publish(-300, "third")
+            with open(state_file, encoding="utf-8") as file:
+                saved = json.load(file)
+        self.assertEqual((-100, 88, "v3"), self.edits[-1])
+        self.assertEqual({"-100", "-200", "-300"}, set(saved))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+
+from src.logging_setup import log_stage, setup_logging, stop_logging
+
+
+class LoggingSetupTests(unittest.TestCase):
+    def setUp(self):
+        root = logging.getLogger()
+        self.saved_handlers = list(root.handlers)
+        self.saved_level = root.level
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.log_file = os.path.join(self.directory.name, 'bot.log')
+
+    def tearDown(self):
+        stop_logging()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in self.saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(self.saved_level)
+
+    def read_records(self):
+        with open(self.log_file, encoding='utf-8') as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    def test_records_go_through_queue_handler(self):
+        setup_logging(log_file=self.log_file)
+
+        handlers = logging.getLogger().handlers
+        self.assertEqual(len(handlers), 1)
+        self.assertIsInstance(handlers[0], logging.handlers.QueueHandler)
+
+    def test_json_record_carries_extra_fields(self):
+        setup_logging(log_file=self.log_file, json_format=True)
+
+        logging.getLogger('test.json').info("Отчёт отправлен", extra={'chat_id': -100, 'stage': 'deliver'})
+        stop_logging()
+
+        record = self.read_records()[-1]
+        self.assertEqual(record['message'], "Отчёт отправлен")
+        self.assertEqual(record['level'], 'INFO')
+        self.assertEqual(record['logger'], 'test.json')
+        self.assertEqual(record['chat_id'], -100)
+        self.assertEqual(record['stage'], 'deliver')
+
+    def test_log_stage_records_duration(self):
+        setup_logging(log_file=self.log_file, json_format=True)
+
+        with log_stage(logging.getLogger('test.stage'), 'generate_secondary_report', chat_id=42):
+            pass
+        stop_logging()
+
+        record = self.read_records()[-1]
+        self.assertEqual(record['stage'], 'generate_secondary_report')
+        self.assertEqual(record['chat_id'], 42)
+        self.assertGreaterEqual(record['duration_ms'], 0)
+
+    def test_file_is_rotated_by_size(self):
+        setup_logging(log_file=self.log_file, max_bytes=500, backup_count=2)
+
+        logger = logging.getLogger('test.rotate')
+        for number in range(50):
+            logger.info("строка %s %s", number, 'x' * 40)
+        stop_logging()
+
+        self.assertTrue(os.path.exists(f"{self.log_file}.1"))
+        self.assertFalse(os.path.exists(f"{self.log_file}.3"))
+        self.assertLessEqual(os.path.getsize(self.log_file), 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
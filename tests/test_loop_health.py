@@ -0,0 +1,67 @@
+import asyncio
+import builtins
+import time
+import unittest
+from unittest.mock import patch
+
+from src import loop_health
+from src.loop_health import LoopMonitor, percentiles_ms
+
+SETTINGS = {"UVLOOP": False, "DEBUG": True, "SLOW_CALLBACK": 0.05}
+
+
+def blocking_report():
+    time.sleep(0.4)  # как синхронный generate_secondary_report прямо в цикле
+
+
+class LoopMonitorTests(unittest.IsolatedAsyncioTestCase):
+    async def test_blocking_call_is_measured_and_logged_with_stack(self):
+        monitor = LoopMonitor(interval=0.02, block_threshold=0.15, samples=100)
+        monitor.start()
+        await asyncio.sleep(0.1)
+
+        with self.assertLogs("src.loop_health", level="WARNING") as logs:
+            blocking_report()
+            await asyncio.sleep(0.1)
+        await monitor.stop()
+
+        self.assertEqual(monitor.blocks, 1)
+        self.assertIn("blocking_report", logs.output[0])
+        self.assertGreaterEqual(monitor.percentiles()["max"], 300)
+        self.assertLess(monitor.percentiles()["p50"], 300)
+
+
+class RunTests(unittest.TestCase):
+    def test_run_sets_debug_and_slow_callback_threshold(self):
+        async def probe():
+            loop = asyncio.get_running_loop()
+            return loop.get_debug(), loop.slow_callback_duration
+
+        self.assertEqual(loop_health.run(probe(), SETTINGS), (True, 0.05))
+
+    def test_missing_uvloop_falls_back_to_default_loop(self):
+        real_import = builtins.__import__
+
+        def no_uvloop(name, *args, **kwargs):
+            if name == "uvloop":
+                raise ImportError(name)
+            return real_import(name, *args, **kwargs)
+
+        async def loop_type():
+            return type(asyncio.get_running_loop()).__module__
+
+        with patch("builtins.__import__", no_uvloop), self.assertLogs("src.loop_health", "WARNING"):
+            module = loop_health.run(loop_type(), {**SETTINGS, "UVLOOP": True})
+
+        self.assertTrue(module.startswith("asyncio"))
+
+    def test_percentiles_in_milliseconds(self):
+        self.assertEqual(
+            percentiles_ms([0.001 * value for value in range(1, 101)]),
+            {"p50": 51.0, "p95": 96.0, "p99": 100.0, "max": 100.0},
+        )
+        self.assertEqual(percentiles_ms([]), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
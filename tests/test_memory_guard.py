@@ -0,0 +1,82 @@
+import copy
+import io
+import tracemalloc
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest.mock import AsyncMock, patch
+
+import src.config as config
+
+from src.memory_guard import MIB, MemoryGuard, rss_bytes
+
+SETTINGS = {"RSS_BUDGET_MB": 100, "TRACEMALLOC": False, "TRACEMALLOC_FRAMES": 1, "TOP": 5}
+
+
+class MemoryGuardTests(unittest.IsolatedAsyncioTestCase):
+    async def test_budget_alert_once_until_rss_drops(self):
+        readings = iter([90, 120, 130, 80, 110])
+        alert = AsyncMock()
+        guard = MemoryGuard(SETTINGS, alert=alert, rss=lambda: next(readings) * MIB)
+
+        with self.assertLogs("src.memory_guard", "WARNING"):
+            results = [await guard.check() for _ in range(5)]
+
+        self.assertEqual([bool(text) for text in results], [False, True, False, False, True])
+        self.assertEqual(alert.await_count, 2)
+        self.assertIn("120 МБ памяти при бюджете 100 МБ", alert.await_args_list[0].args[0])
+        self.assertEqual(guard.summary(), "Память: RSS 110 МБ, бюджет 100 МБ")
+
+    async def test_failed_alert_does_not_stop_guard(self):
+        guard = MemoryGuard(
+            SETTINGS, alert=AsyncMock(side_effect=RuntimeError("Bot API недоступен")), rss=lambda: 200 * MIB
+        )
+
+        with self.assertLogs("src.memory_guard", "WARNING") as logs:
+            self.assertIsNotNone(await guard.check())
+
+        self.assertTrue(any("not sent" in line for line in logs.output))
+
+    async def test_tracemalloc_reports_growing_line(self):
+        guard = MemoryGuard({**SETTINGS, "TRACEMALLOC": True, "RSS_BUDGET_MB": None})
+        leak = []
+        guard.start()
+        try:
+            await guard.check()
+            leak.extend(bytearray(1024) for _ in range(200))
+            with self.assertLogs("src.memory_guard", "INFO"):
+                await guard.check()
+        finally:
+            guard.stop()
+
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertIn("test_memory_guard.py", guard.last_growth[0])
+
+    def test_rss_of_this_process(self):
+        self.assertGreater(rss_bytes(), MIB)
+
+    def test_no_proc_means_no_rss_not_peak(self):
+        with patch("builtins.open", side_effect=FileNotFoundError("/proc/self/statm")):
+            self.assertIsNone(rss_bytes())
+
+
+class SoakBenchmarkTests(unittest.TestCase):
+    def test_short_soak_reports_flat_memory(self):
+        from benchmarks.soak import main as soak_main
+
+        # soak, как и run_benchmarks, переписывает лист и адрес Sheets в config
+        with patch.object(config, "SHEET_SETTINGS", copy.deepcopy(config.SHEET_SETTINGS)), patch.object(
+            config, "SHEETS_API_BASE_URL", config.SHEETS_API_BASE_URL
+        ), patch.object(config, "CREDENTIALS_FILE", config.CREDENTIALS_FILE), redirect_stderr(
+            io.StringIO()
+        ), redirect_stdout(io.StringIO()):
+            report = soak_main(
+                ["--reports", "4", "--warmup", "2", "--sample-every", "2", "--projects", "10", "--dates", "5"]
+            )
+
+        self.assertEqual([sample["reports"] for sample in report["samples"]], [0, 2, 4])
+        self.assertIn("gc_objects", report["growth"])
+        self.assertTrue(report["flat"])
+
+
+if __name__ == "__main__":
+    unittest.main()
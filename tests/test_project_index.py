@@ -0,0 +1,161 @@
+import unittest
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.project_index import ProjectIndex, normalize, project_code
+from src.telegram_bot import TelegramBot
+
+REPORT_DATE = date(2026, 8, 16)
+
+NAMES = [
+    "[LR1] Альфа Север",
+    "[LR12] Ёлка Юг",
+    "[LR120] Бета",
+    "[LR2] Гамма_Дельта",
+    "Без кода Проект",
+]
+
+
+def make_project(name, number=1):
+    return {
+        "name": name,
+        "today_data": number,
+        "total_issued": 10,
+        "total_volume": 100,
+        "tariff_remaining": 90,
+    }
+
+
+class ProjectIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.index = ProjectIndex([make_project(name) for name in NAMES])
+
+    def names(self, query, limit=10):
+        return [project["name"] for project in self.index.search(query, limit)]
+
+    def test_normalize_and_code(self):
+        self.assertEqual("елка юг", normalize("  Ёлка   ЮГ "))
+        self.assertEqual("lr12", project_code("[LR12] Ёлка"))
+        self.assertEqual("lr12", project_code("lr 12", bare=True))
+        self.assertIsNone(project_code("Альфа"))
+
+    def test_exact_code_comes_first(self):
+        self.assertEqual("[LR12] Ёлка Юг", self.names("LR12")[0])
+        self.assertEqual("[LR12] Ёлка Юг", self.names("[lr12]")[0])
+        self.assertEqual("[LR1] Альфа Север", self.names("lr 1")[0])
+
+    def test_prefix_with_and_without_code(self):
+        self.assertEqual(["[LR1] Альфа Север"], self.names("альфа"))
+        self.assertEqual(["[LR12] Ёлка Юг"], self.names("елка"))
+        self.assertEqual(["[LR12] Ёлка Юг", "[LR120] Бета"], self.names("[LR12", limit=2))
+
+    def test_trigrams_find_middle_of_name(self):
+        self.assertIn("[LR1] Альфа Север", self.names("север"))
+        self.assertIn("[LR2] Гамма_Дельта", self.names("дельта"))
+        self.assertEqual("Без кода Проект", self.names("кода проект")[0])
+
+    def test_no_match(self):
+        self.assertEqual([], self.names("zzzz"))
+        self.assertEqual([], self.names("  "))
+
+
+class ProjectCommandTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.processor = MagicMock()
+        self.processor.generate_secondary_report.return_value = {
+            "success": True,
+            "report_date": REPORT_DATE,
+            "projects": [make_project(name, number) for number, name in enumerate(NAMES, 1)],
+        }
+        self.bot = TelegramBot("123456:TESTTOKEN", self.processor)
+        self.message = MagicMock()
+        self.message.chat.id = -100
+        self.message.answer = AsyncMock()
+
+    async def asyncTearDown(self):
+        await self.bot.bot.session.close()
+
+    async def test_exact_match_sends_vertical_table_from_cache(self):
+        with patch("src.rich_report.send_rich_telegram_message") as send_rich:
+            await self.bot.cmd_project(self.message, MagicMock(args="LR12"))
+            await self.bot.cmd_project(self.message, MagicMock(args="Бета"))
+
+        self.processor.generate_secondary_report.assert_called_once()
+        text = send_rich.call_args_list[0].args[2]
+        self.assertIn(r"| Проект | \[LR12\] Ёлка Юг |", text)
+        self.assertIn("| Сегодня | 2 |", text)
+        self.assertEqual(-100, send_rich.call_args_list[0].args[1])
+        self.assertIn("Бета", send_rich.call_args_list[1].args[2])
+
+    async def test_ambiguous_query_lists_candidates(self):
+        with patch("src.rich_report.send_rich_telegram_message") as send_rich:
+            await self.bot.cmd_project(self.message, MagicMock(args="[LR"))
+
+        send_rich.assert_not_called()
+        self.assertIn("[LR120] Бета", self.message.answer.call_args.args[0])
+
+    async def test_delivered_report_refreshes_index_without_reading_sheet(self):
+        result = {**self.processor.generate_secondary_report.return_value, "projects": [make_project("[LR7] Новый")]}
+        self.bot._update_project_index(result)
+
+        with patch("src.rich_report.send_rich_telegram_message") as send_rich:
+            await self.bot.cmd_project(self.message, MagicMock(args="LR7"))
+
+        self.processor.generate_secondary_report.assert_not_called()
+        self.assertIn("Новый", send_rich.call_args.args[2])
+
+    async def test_inline_query_answers_with_cache_time(self):
+        inline_query = MagicMock(query="альфа")
+        inline_query.from_user.id = 42
+        inline_query.answer = AsyncMock()
+
+        with patch("src.telegram_bot.config.ADMIN_CHAT_ID", 42):
+            await self.bot.inline_project_query(inline_query)
+
+        results = inline_query.answer.call_args.args[0]
+        self.assertEqual(["[LR1] Альфа Север"], [result.title for result in results])
+        self.assertIn("Проект: [LR1] Альфа Север\n", results[0].input_message_content.message_text)
+        self.assertIsNone(results[0].input_message_content.parse_mode)
+        self.assertEqual(300, inline_query.answer.call_args.kwargs["cache_time"])
+        self.assertTrue(inline_query.answer.call_args.kwargs["is_personal"])
+
+    async def test_inline_query_keeps_markdown_characters_in_names(self):
+        inline_query = MagicMock(query="дельта")
+        inline_query.from_user.id = 42
+        inline_query.answer = AsyncMock()
+
+        with patch("src.telegram_bot.config.ADMIN_CHAT_ID", 42):
+            await self.bot.inline_project_query(inline_query)
+
+        text = inline_query.answer.call_args.args[0][0].input_message_content.message_text
+        self.assertTrue(text.startswith("Проект: [LR2] Гамма_Дельта\n"))
+
+    async def test_inline_query_from_outsider_gets_nothing(self):
+        inline_query = MagicMock(query="альфа")
+        inline_query.from_user.id = 7
+        inline_query.answer = AsyncMock()
+        self.bot.bot.get_chat_member = AsyncMock(return_value=MagicMock(status="left"))
+
+        with patch("src.telegram_bot.config.ADMIN_CHAT_ID", 42), \
+                patch("src.telegram_bot.config.GROUP_CHAT_ID", -100):
+            await self.bot.inline_project_query(inline_query)
+
+        self.assertEqual([], inline_query.answer.call_args.args[0])
+        self.assertTrue(inline_query.answer.call_args.kwargs["is_personal"])
+        self.processor.generate_secondary_report.assert_not_called()
+        self.bot.bot.get_chat_member.assert_awaited_once_with(chat_id=-100, user_id=7)
+
+    async def test_inline_query_from_group_member_is_answered(self):
+        inline_query = MagicMock(query="альфа")
+        inline_query.from_user.id = 7
+        inline_query.answer = AsyncMock()
+        self.bot.bot.get_chat_member = AsyncMock(return_value=MagicMock(status="member"))
+
+        with patch("src.telegram_bot.config.ADMIN_CHAT_ID", 42), \
+                patch("src.telegram_bot.config.GROUP_CHAT_ID", -100):
+            await self.bot.inline_project_query(inline_query)
+
+        self.assertEqual(1, len(inline_query.answer.call_args.args[0]))
+
+if __name__ == "__main__":
+    unittest.main()
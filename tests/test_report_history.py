@@ -0,0 +1,206 @@
+import random
+import unittest
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from benchmarks.fake_servers import FakeSheetsServer
+from benchmarks.synthetic import make_sheet
+import src.config as config
+from src.data_processor import DataProcessor, parse_sheet_int
+from src.report_history import HistoryMatrix, parse_date_range, parse_header_date
+from src.telegram_bot import TelegramBot
+
+TODAY = date(2026, 8, 16)
+COLUMNS = {"name": 0, "status": 1, "volume": 2, "remaining": 4, "issued": 5, "data_start": 6}
+
+
+def naive_totals(values, start, end):
+    """Сумма по проектам в лоб: каждая колонка даты через parse_sheet_int."""
+    positions = [
+        position
+        for position, header in enumerate(values[0])
+        if position >= 6 and parse_header_date(header) and start <= parse_header_date(header) <= end
+    ]
+    return [
+        sum(parse_sheet_int(row, position) for position in positions)
+        for row in values[1:]
+        if len(row) > 1 and row[1] == "TRUE"
+    ], len(positions)
+
+
+class ParseDateRangeTests(unittest.TestCase):
+    def test_day_month_uses_current_year(self):
+        self.assertEqual((date(2026, 10, 1), date(2026, 10, 15)), parse_date_range("01.10-15.10", TODAY))
+        self.assertEqual((date(2026, 10, 1), date(2026, 10, 15)), parse_date_range(" 1.10 – 15.10 ", TODAY))
+
+    def test_range_across_new_year_starts_last_year(self):
+        self.assertEqual((date(2025, 12, 20), date(2026, 1, 5)), parse_date_range("20.12-05.01", TODAY))
+
+    def test_explicit_years(self):
+        self.assertEqual((date(2025, 10, 1), date(2025, 10, 15)), parse_date_range("01.10.25-15.10.2025", TODAY))
+
+    def test_bad_input(self):
+        for text in ("", "01.10", "вчера", "32.10-01.11", "15.10.26-01.10.26"):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                parse_date_range(text, TODAY)
+
+    def test_header_dates(self):
+        self.assertEqual(date(2026, 8, 16), parse_header_date("16.08.26"))
+        self.assertEqual(date(2026, 8, 16), parse_header_date("16.08.2026 (вс)"))
+        self.assertIsNone(parse_header_date("Итого"))
+        self.assertIsNone(parse_header_date(None))
+
+
+class HistoryMatrixTests(unittest.TestCase):
+    def test_range_sums_match_naive_sums(self):
+        values = make_sheet(projects=40, dates=120, today=TODAY, seed=5)
+        history = HistoryMatrix.from_values(values, COLUMNS)
+        rng = random.Random(1)
+
+        for _ in range(30):
+            start = TODAY - timedelta(days=rng.randint(0, 130))
+            end = start + timedelta(days=rng.randint(0, 60))
+            with self.subTest(start=start, end=end):
+                totals, days = history.range_totals(start, end)
+                self.assertEqual(naive_totals(values, start, end), (totals.tolist(), days))
+
+    def test_unsorted_columns_and_non_date_headers(self):
+        values = [
+            ["Проект", "Статус", "Объем", "", "Остаток", "Выдано", "03.10.26", "Итого", "01.10.26", "02.10.26"],
+            ["[LR1] A", "TRUE", "100", "", "50", "50", "3", "999", "1", "2"],
+            ["[LR2] B", "FALSE", "100", "", "50", "50", "7", "7", "7", "7"],
+            ["[LR3] C", "TRUE", "10", "", "0", "10", "", "", "x", "4"],
+        ]
+        history = HistoryMatrix.from_values(values, COLUMNS)
+
+        self.assertEqual([date(2026, 10, 1), date(2026, 10, 2), date(2026, 10, 3)], history.dates)
+        projects, days = history.range_projects(date(2026, 10, 1), date(2026, 10, 2))
+        self.assertEqual(2, days)
+        self.assertEqual(
+            [("[LR1] A", 3, 1.5, 50), ("[LR3] C", 4, 2.0, 0)],
+            [(p["name"], p["total"], p["average"], p["tariff_remaining"]) for p in projects],
+        )
+        totals, days = history.range_totals(date(2027, 1, 1), date(2027, 1, 2))
+        self.assertEqual(([0, 0], 0), (totals.tolist(), days))
+
+
+class RangeReportTests(unittest.TestCase):
+    def test_history_is_built_once_per_snapshot(self):
+        values = make_sheet(projects=30, dates=60, today=date.today())
+        sheet_settings = {**config.SHEET_SETTINGS["SECONDARY"], "SPREADSHEET_ID": "sheet"}
+        sheet_settings["STRUCTURE"] = {**sheet_settings["STRUCTURE"], "RANGE": "A1:BZ31"}
+        with FakeSheetsServer({"sheet": {sheet_settings["NAME"]: values}}) as server, patch.object(
+            config, "SHEETS_API_BASE_URL", server.url
+        ), patch.object(config, "CREDENTIALS_FILE", None), patch.dict(
+            config.SHEET_SETTINGS, {"SECONDARY": sheet_settings}
+        ):
+            processor = DataProcessor()
+            first = processor.generate_range_report(date.today() - timedelta(days=10), date.today())
+            history = processor.history
+            second = processor.generate_range_report(date.today() - timedelta(days=30), date.today())
+            requests_count = server.requests_count
+
+        self.assertTrue(first["success"])
+        self.assertEqual(11, first["days"])
+        self.assertEqual(31, second["days"])
+        self.assertEqual(1, requests_count)
+        self.assertIs(history, processor.history)
+        expected, _ = naive_totals(values, date.today() - timedelta(days=30), date.today())
+        self.assertEqual(expected, [project["total"] for project in second["projects"]])
+
+    def test_range_without_dates_is_an_error(self):
+        processor = DataProcessor.__new__(DataProcessor)
+        processor._init_state()
+        processor.get_history = lambda sheet_type="SECONDARY", settings=None: (
+            HistoryMatrix.from_values(make_sheet(projects=3, dates=5, today=TODAY), COLUMNS),
+            [],
+        )
+
+        result = processor.generate_range_report(date(2020, 1, 1), date(2020, 1, 5))
+
+        self.assertFalse(result["success"])
+        self.assertIn("01.01.2020", result["error"])
+
+
+class RangeCommandTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.processor = MagicMock()
+        self.processor.generate_range_report.return_value = {
+            "success": True,
+            "date_from": date(2026, 10, 1),
+            "date_to": date(2026, 10, 15),
+            "days": 15,
+            "projects": [
+                {"name": "[LR1] A", "total": 30, "average": 2.0, "tariff_remaining": 70},
+                {"name": "[LR2] B", "total": 15, "average": 1.0, "tariff_remaining": 5},
+            ],
+            "projects_data": "range-text",
+        }
+        self.bot = TelegramBot("123456:TESTTOKEN", self.processor)
+        self.message = MagicMock()
+        self.message.chat.id = -100
+        self.message.answer = AsyncMock()
+
+    async def asyncTearDown(self):
+        await self.bot.bot.session.close()
+
+    async def test_secondary_with_period_sends_range_table(self):
+        with patch.object(config, "REPORTS_MESSAGE_FORMAT", "rich"), patch(
+            "src.rich_report.send_rich_telegram_message"
+        ) as send_rich:
+            await self.bot.cmd_secondary(self.message, MagicMock(args="01.10-15.10"))
+
+        date_from, date_to = self.processor.generate_range_report.call_args.args
+        self.assertEqual(10, date_from.month)
+        self.assertEqual((1, 15), (date_from.day, date_to.day))
+        self.processor.generate_secondary_report.assert_not_called()
+        text = send_rich.call_args.args[2]
+        self.assertIn("## Период · 01.10–15.10", text)
+        self.assertIn("| \\[LR1\\] A | 30 | 2.0 | 70 |", text)
+
+    async def test_legacy_range_report_uses_text_template(self):
+        with patch.object(config, "REPORTS_MESSAGE_FORMAT", "legacy"), patch.object(
+            self.bot.bot, "send_message", new_callable=AsyncMock
+        ) as send_message:
+            await self.bot.deliver_range_report(-100, self.processor.generate_range_report.return_value)
+
+        text = send_message.call_args.kwargs["text"]
+        self.assertIn("с 01.10.2026 по 15.10.2026", text)
+        self.assertIn("range-text", text)
+
+    async def test_bad_period_answers_with_format(self):
+        await self.bot.cmd_secondary(self.message, MagicMock(args="вчера"))
+
+        self.processor.generate_range_report.assert_not_called()
+        self.assertIn("01.10-15.10", self.message.answer.call_args.args[0])
+
+
+class CronRangeTests(unittest.IsolatedAsyncioTestCase):
+    async def test_cli_range_option_sends_range_report(self):
+        from send_secondary_report import parse_args, send_report
+
+        self.assertEqual("01.10-15.10", parse_args(["--range", "01.10-15.10"]).date_range)
+
+        processor = MagicMock()
+        processor.generate_range_report.return_value = {"success": True}
+        bot = MagicMock()
+        bot.deliver_range_report = AsyncMock()
+
+        with patch.object(config, "GROUP_CHAT_ID", -100):
+            await send_report(
+                data_processor=processor,
+                bot=bot,
+                date_range=(date(2026, 10, 1), date(2026, 10, 15)),
+            )
+
+        processor.generate_range_report.assert_called_once_with(date(2026, 10, 1), date(2026, 10, 15))
+        processor.generate_secondary_report.assert_not_called()
+        bot.deliver_range_report.assert_awaited_once_with(
+            chat_id=-100,
+            result=processor.generate_range_report.return_value,
+            notify_empty=False,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+from src.report_pages import (
+    NOOP_CALLBACK,
+    ReportPages,
+    page_keyboard,
+    parse_page_callback,
+)
+
+PAGES = ["## Отчёт · 16.08\n| 1 |", "## Отчёт · 16.08\n| 2 |", "## Отчёт · 16.08\n| 3 |"]
+
+
+class ReportPagesTests(unittest.TestCase):
+    def test_pages_are_cached_per_snapshot_and_chat(self):
+        pages = ReportPages(capacity=10)
+        snapshot = pages.store(-100, PAGES)
+
+        self.assertEqual(pages.get(snapshot, -100, 1), (PAGES[1], 3))
+        self.assertIsNone(pages.get(snapshot, 200, 1))
+        self.assertEqual(snapshot, ReportPages(capacity=10).store(200, PAGES))
+        self.assertEqual((pages.hits, pages.misses), (1, 1))
+
+    def test_least_recently_used_pages_are_evicted(self):
+        pages = ReportPages(capacity=4)
+        first = pages.store(1, PAGES)
+        pages.get(first, 1, 0)
+        pages.store(2, PAGES[:2])
+
+        self.assertIsNone(pages.get(first, 1, 1))  # самая давняя
+        self.assertIsNotNone(pages.get(first, 1, 0))  # её недавно листали
+        self.assertIsNotNone(pages.get(first, 1, 2))
+
+    def test_other_process_reads_pages_from_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot = ReportPages(capacity=10, directory=directory).store(-100, PAGES)
+            bot_pages = ReportPages(capacity=10, directory=directory)
+
+            self.assertEqual(bot_pages.get(snapshot, -100, 2), (PAGES[2], 3))
+            self.assertIsNone(bot_pages.get("0" * 12, -100, 0))
+
+    def test_keyboard_wraps_around_and_round_trips(self):
+        keyboard = page_keyboard("0123456789ab", 0, 3)
+        back, counter, forward = keyboard["inline_keyboard"][0]
+
+        self.assertEqual(parse_page_callback(back["callback_data"]), ("0123456789ab", 2))
+        self.assertEqual(counter, {"text": "1/3", "callback_data": NOOP_CALLBACK})
+        self.assertEqual(parse_page_callback(forward["callback_data"]), ("0123456789ab", 1))
+        self.assertIsNone(parse_page_callback(NOOP_CALLBACK))
+        self.assertIsNone(parse_page_callback("secondary"))
+        self.assertLessEqual(len(back["callback_data"].encode()), 64)
+
+    def test_foreign_snapshot_is_not_a_page_callback(self):
+        for data in ("page:../../etc/passwd:0", "page:abc:0", "page:0123456789AB:0", "page:0123456789abc:0"):
+            with self.subTest(data=data):
+                self.assertIsNone(parse_page_callback(data))
+
+    def test_disk_keeps_own_limit_and_only_own_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            foreign = os.path.join(directory, "settings.json")
+            with open(foreign, "w", encoding="utf-8") as file:
+                file.write("{}")
+            pages = ReportPages(capacity=100, directory=directory, disk_reports=2)
+            for chat_id in (1, 2, 3):
+                pages.store(chat_id, PAGES)
+
+            names = sorted(os.listdir(directory))
+
+        self.assertEqual(len(names), 3)
+        self.assertIn("settings.json", names)
+
+
+if __name__ == "__main__":
+    unittest.main()
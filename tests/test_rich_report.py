@@ -12,6 +12,8 @@ from src.rich_report import (
     get_message_format,
     group_projects_by_chat,
     has_today_data,
+    project_to_row,
+    edit_rich_telegram_message,
     send_rich_telegram_message,
 )
 
@@ -82,6 +84,29 @@ class FormatTests(unittest.TestCase):
             ),
         )
 
+    def test_delta_columns_when_rows_carry_yesterday_and_week(self):
+        single = format_rich_report_message(REPORT_DATE, [("[LR1] Проект А", 3, 10, 100, 90, 5, -2)])
+        several = format_rich_report_message(
+            REPORT_DATE,
+            [
+                ("[LR1] Проект А", 3, 10, 100, 90, 5, -2),
+                ("[LR2] Проект Б", 7, 20, 200, 180, None, None),
+            ],
+        )
+
+        self.assertIn("| Вчера | 5 |\n| Δ неделя | -2 |", single)
+        self.assertIn("| Проект | Сегодня | Вчера | Δ неделя | Тариф | Остаток |", several)
+        self.assertIn(r"| \[LR1\] Проект А | 3 | 5 | -2 | 10 / 100 | 90 |", several)
+        self.assertIn(r"| \[LR2\] Проект Б | 7 | — | — | 20 / 200 | 180 |", several)
+
+    def test_project_row_has_deltas_only_when_read(self):
+        plain = project("[LR1] A", 9)
+        with_deltas = {**plain, "yesterday_data": 4, "week_ago_data": 6}
+
+        self.assertEqual(5, len(project_to_row(plain)))
+        self.assertEqual(("[LR1] A", 9, 5, 1000, 995, 4, 3), project_to_row(with_deltas))
+        self.assertIsNone(project_to_row({**with_deltas, "week_ago_data": None})[6])
+
     def test_escapes_table_cell_boundaries_and_line_breaks(self):
         escaped = escape_rich_table_cell("A | B\\C\nD_*[]")
         self.assertNotIn("\n", escaped)
@@ -263,14 +288,33 @@ class SenderTests(unittest.TestCase):
                 return {"ok": True, "result": {"message_id": 1}}
 
         with patch("src.rich_report.requests.post", return_value=FakeResponse()) as post:
-            send_rich_telegram_message("token", 100, "## Отчёт · 16.08")
+            message_id = send_rich_telegram_message("token", 100, "## Отчёт · 16.08")
 
+        self.assertEqual(1, message_id)
         post.assert_called_once_with(
             "https://api.telegram.org/bottoken/sendRichMessage",
             json={"chat_id": 100, "rich_message": {"markdown": "## Отчёт · 16.08"}},
             timeout=15,
         )
 
+    def test_rich_edit_uses_edit_message_text_and_surfaces_description(self):
+        class FakeResponse:
+            def raise_for_status(self):
+                raise AssertionError("описание Telegram должно проверяться раньше статуса")
+
+            def json(self):
+                return {"ok": False, "description": "Bad Request: message is not modified"}
+
+        with patch("src.rich_report.requests.post", return_value=FakeResponse()) as post:
+            with self.assertRaisesRegex(RuntimeError, "message is not modified"):
+                edit_rich_telegram_message("token", 100, 7, "## Отчёт")
+
+        post.assert_called_once_with(
+            "https://api.telegram.org/bottoken/editMessageText",
+            json={"chat_id": 100, "message_id": 7, "rich_message": {"markdown": "## Отчёт"}},
+            timeout=15,
+        )
+
     def test_unknown_format_fails_clearly(self):
         with self.assertRaisesRegex(ValueError, "REPORTS_MESSAGE_FORMAT"):
             get_message_format("unsupported")
@@ -0,0 +1,145 @@
+import time
+import unittest
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from benchmarks.fake_servers import FakeTelegramServer
+from src import rich_report, sharded_delivery
+import src.config as config
+from src.sharded_delivery import SharedRateLimiter, deliver_shard, deliver_sharded, partition_chats
+from src.telegram_bot import TelegramBot
+
+REPORT_DATE = date(2026, 8, 16)
+
+
+def make_rows(count, prefix="P"):
+    return [(f"[{prefix}{number}] Project", number + 1, number, 100, 100 - number) for number in range(count)]
+
+
+class PartitionChatsTests(unittest.TestCase):
+    def test_every_chat_lands_in_exactly_one_shard(self):
+        rows_by_chat = {-chat: make_rows(chat % 7 + 1) for chat in range(1, 101)}
+
+        shards = partition_chats(rows_by_chat, 4)
+
+        self.assertEqual(4, len(shards))
+        chats = [chat_id for shard in shards for chat_id, _ in shard]
+        self.assertEqual(sorted(rows_by_chat), sorted(chats))
+        loads = [sum(len(rows) for _, rows in shard) for shard in shards]
+        self.assertLessEqual(max(loads) - min(loads), 7)
+
+    def test_never_more_shards_than_chats(self):
+        self.assertEqual(2, len(partition_chats({-1: make_rows(1), -2: make_rows(1)}, 8)))
+        self.assertEqual([], partition_chats({}, 4))
+
+
+class SharedRateLimiterTests(unittest.TestCase):
+    def test_spaces_acquires_by_rate(self):
+        limiter = SharedRateLimiter(rate=50)
+        started = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 5 / 50 - 0.005)
+
+    def test_zero_rate_means_no_limit(self):
+        limiter = SharedRateLimiter(rate=0)
+        started = time.monotonic()
+        for _ in range(100):
+            limiter.acquire()
+        self.assertLess(time.monotonic() - started, 0.05)
+
+
+class DeliverShardTests(unittest.TestCase):
+    def test_failed_chat_does_not_stop_shard(self):
+        def send(bot_token, chat_id, text):
+            if chat_id == -2:
+                raise RuntimeError("Forbidden: bot was kicked")
+
+        shard = [(-1, make_rows(2)), (-2, make_rows(1)), (-3, make_rows(1))]
+        with patch("src.rich_report.send_rich_telegram_message", side_effect=send):
+            summary = deliver_shard("123:abc", REPORT_DATE, shard)
+
+        self.assertEqual(2, summary["chats"])
+        self.assertEqual(2, summary["messages"])
+        self.assertEqual({-2: "Forbidden: bot was kicked"}, summary["failed"])
+
+
+class DeliverShardedTests(unittest.TestCase):
+    def test_process_pool_sends_every_chat_to_fake_telegram(self):
+        rows_by_chat = {-chat: make_rows(2, prefix=f"C{chat}-") for chat in range(1, 31)}
+        with FakeTelegramServer() as server, patch.object(rich_report, "TELEGRAM_API_URL", server.url):
+            summary = deliver_sharded("123:abc", REPORT_DATE, rows_by_chat, workers=2, rate_per_second=None)
+            requests_count = server.requests_count
+
+        self.assertEqual(30, summary["chats"])
+        self.assertEqual(30, summary["messages"])
+        self.assertEqual({}, summary["failed"])
+        self.assertEqual(2, summary["shards"])
+        self.assertEqual(30, requests_count)
+
+
+class ShardedBotDeliveryTests(unittest.IsolatedAsyncioTestCase):
+    async def test_many_chats_go_through_sharded_delivery(self):
+        bot = TelegramBot("123456:TESTTOKEN", MagicMock())
+        self.addAsyncCleanup(bot.bot.session.close)
+        projects = [
+            {
+                "name": f"[LR{number}] P",
+                "today_data": 1,
+                "total_issued": 1,
+                "total_volume": 10,
+                "tariff_remaining": 9,
+                "telegram_chat_id": -number,
+            }
+            for number in range(1, 4)
+        ]
+        result = {"success": True, "date": "16.08.2026", "report_date": REPORT_DATE, "projects": projects}
+        summary = {"chats": 3, "messages": 3, "failed": {}, "shards": 2, "seconds": 0.1}
+        sharding = {**config.SHARDED_DELIVERY, "ENABLED": True, "MIN_CHATS": 3}
+
+        with patch.object(config, "REPORTS_MESSAGE_FORMAT", "rich"), patch.dict(
+            config.SHARDED_DELIVERY, sharding
+        ), patch.object(sharded_delivery, "deliver_sharded", return_value=summary) as deliver, patch.object(
+            bot.bot, "send_message", new_callable=AsyncMock
+        ):
+            self.assertTrue(await bot.deliver_secondary_report(chat_id=-100, result=result))
+
+        rows_by_chat = deliver.call_args.args[2]
+        self.assertEqual([-1, -2, -3], sorted(rows_by_chat, reverse=True))
+        self.assertEqual(summary, bot.last_delivery_summary)
+
+    async def test_tariff_warnings_precede_pool_run_in_both_orders(self):
+        bot = TelegramBot("123456:TESTTOKEN", MagicMock())
+        self.addAsyncCleanup(bot.bot.session.close)
+        projects = [
+            {"name": f"[LR{number}] P", "today_data": 1, "total_issued": 1, "total_volume": 10,
+             "tariff_remaining": 9, "telegram_chat_id": -number}
+            for number in range(1, 4)
+        ]
+        result = {
+            "success": True, "date": "16.08.2026", "report_date": REPORT_DATE, "projects": projects,
+            "projects_to_disable": [{"name": "[LR1] P", "remaining": 0, "today_data": 1,
+                                     "telegram_chat_id": -1}],
+        }
+        summary = {"chats": 3, "messages": 3, "failed": {}, "shards": 2, "seconds": 0.1}
+        sharding = {**config.SHARDED_DELIVERY, "ENABLED": True, "MIN_CHATS": 3}
+
+        for per_chat_order in ("fifo", "priority"):
+            with self.subTest(per_chat_order=per_chat_order):
+                sent = []
+                with patch.object(config, "REPORTS_MESSAGE_FORMAT", "rich"), patch.dict(
+                    config.SHARDED_DELIVERY, sharding
+                ), patch.dict(config.DELIVERY_QUEUE, {"PER_CHAT_ORDER": per_chat_order}), patch.object(
+                    sharded_delivery, "deliver_sharded",
+                    side_effect=lambda *args: sent.append("pool") or summary,
+                ), patch(
+                    "src.rich_report.send_rich_telegram_message",
+                    side_effect=lambda *args: sent.append(args[2].split("\n", 1)[0]),
+                ):
+                    self.assertTrue(await bot.deliver_secondary_report(chat_id=-100, result=result))
+
+                self.assertEqual(["## Внимание · тарифы исчерпаны", "pool"], sent)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import random
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from src.data_processor import parse_sheet_int
+from src.sheet_matrix import PLAIN_MAX_CHARS, parse_int_matrix
+
+EDGE_CELLS = [
+    "", " ", "0", "-0", "+5", "-17", "1\xa0234", "12 345", " 12 ", "\t3\n", " 7 ",
+    "1.9", "-1.9", "5.", ".5", "1e3", "1_000", "１２", "١٢", "²", "nan", "inf", "-inf",
+    "1e400", "—", "н/д", "#REF!", "1,5", "--5", "+-5", "-", "0x10", "9999999999",
+    "2147483647", "2147483648", "-2147483648", "\u2009 5\u3000", "5\u202f000", None, 42, 3.7, True,
+]
+
+
+def assert_agrees(test, rows, start=0, width=None):
+    matrix, mask = parse_int_matrix(rows, start, width)
+    test.assertEqual(np.int32, matrix.dtype)
+    for i, row in enumerate(rows):
+        for j in range(matrix.shape[1]):
+            expected = parse_sheet_int(row, start + j)
+            if mask[i, j]:
+                test.assertEqual(expected, int(matrix[i, j]), (row, start + j))
+            else:
+                test.assertEqual(0, int(matrix[i, j]))
+                out_of_range = not -2**31 <= expected < 2**31
+                test.assertTrue(expected == 0 or out_of_range, (row, start + j, expected))
+
+
+class ParseIntMatrixTests(unittest.TestCase):
+    def test_edge_cells_agree_with_parse_sheet_int(self):
+        rows = [[cell] for cell in EDGE_CELLS]
+        assert_agrees(self, rows)
+
+    def test_long_cell_does_not_widen_matrix(self):
+        note = "Комментарий менеджера: " + "очень длинная заметка " * 5000
+        rows = [[str(i * 10 + j) for j in range(400)] for i in range(300)]
+        rows[7][13] = note
+        rows[8][2] = " " * 40 + "-42" + " " * 40
+
+        with patch("src.sheet_matrix.np.array", wraps=np.array) as array:
+            matrix, mask = parse_int_matrix(rows)
+
+        padded = array.call_args_list[0].args[0]
+        self.assertLessEqual(max(len(cell) for row in padded for cell in row), PLAIN_MAX_CHARS)
+        self.assertEqual((0, False), (int(matrix[7, 13]), bool(mask[7, 13])))
+        self.assertEqual((-42, True), (int(matrix[8, 2]), bool(mask[8, 2])))
+        self.assertEqual(0 * 10 + 5, int(matrix[0, 5]))
+        assert_agrees(self, [rows[7][:20], rows[8][:20], [10**40, "1"]])
+
+    def test_marks_blanks_junk_and_overflow_invalid(self):
+        matrix, mask = parse_int_matrix([["5", "", "x", "9999999999", "1\xa0000"]])
+        self.assertEqual([5, 0, 0, 0, 1000], matrix[0].tolist())
+        self.assertEqual([True, False, False, False, True], mask[0].tolist())
+
+    def test_ragged_rows_and_column_window(self):
+        rows = [["name", "TRUE", "1", "2", "3"], ["name2", "TRUE"], ["n", "", "7"]]
+        matrix, mask = parse_int_matrix(rows, start=2, width=3)
+
+        self.assertEqual((3, 3), matrix.shape)
+        self.assertEqual([[1, 2, 3], [0, 0, 0], [7, 0, 0]], matrix.tolist())
+        self.assertEqual([False, False, False], mask[1].tolist())
+        assert_agrees(self, rows, start=2, width=3)
+
+    def test_width_defaults_to_longest_row(self):
+        matrix, _ = parse_int_matrix([["1"], ["1", "2", "3"]])
+        self.assertEqual((2, 3), matrix.shape)
+
+    def test_empty_input(self):
+        matrix, mask = parse_int_matrix([])
+        self.assertEqual((0, 0), matrix.shape)
+        self.assertEqual((0, 0), mask.shape)
+
+    def test_random_grid_agrees_with_parse_sheet_int(self):
+        rng = random.Random(3)
+        pool = EDGE_CELLS + [str(rng.randint(-5000, 5000)) for _ in range(200)]
+        rows = [
+            [rng.choice(pool) for _ in range(rng.randint(0, 40))]
+            for _ in range(60)
+        ]
+        assert_agrees(self, rows, start=0, width=40)
+
+
+class ParseSheetIntTests(unittest.TestCase):
+    def test_infinity_is_default_not_crash(self):
+        self.assertEqual(0, parse_sheet_int(["inf"], 0))
+        self.assertEqual(0, parse_sheet_int(["1e400"], 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
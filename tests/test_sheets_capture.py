@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+from unittest.mock import patch
+
+import pytz
+
+from benchmarks.fake_servers import FakeSheetsServer
+from benchmarks.synthetic import make_sheet
+import src.config as config
+from src.data_processor import DataProcessor
+from src.sheets_capture import Capture, SheetsReplay, load_captures
+
+RECORDED_DAY = date(2026, 10, 12)
+MOSCOW = pytz.timezone("Europe/Moscow")
+
+
+class RecordReplayTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.values = make_sheet(projects=30, dates=10, today=RECORDED_DAY)
+        sheet_settings = {**config.SHEET_SETTINGS["SECONDARY"], "SPREADSHEET_ID": "sheet"}
+        sheet_settings["STRUCTURE"] = {**sheet_settings["STRUCTURE"], "RANGE": "A1:ZZ31"}
+        self.range_name = f"'{sheet_settings['NAME']}'!A1:ZZ31"
+        self.server = FakeSheetsServer({"sheet": {sheet_settings["NAME"]: self.values}})
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        for patcher in (
+            patch.object(config, "SHEETS_API_BASE_URL", self.server.url),
+            patch.object(config, "CREDENTIALS_FILE", None),
+            patch.dict(config.SHEET_SETTINGS, {"SECONDARY": sheet_settings}),
+            patch.dict(config.SHEETS_CAPTURE, {"RECORD": True, "DIRECTORY": self.directory.name}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def record_report(self, streaming=False):
+        """Отчёт за RECORDED_DAY с записью ответа Google."""
+        recorded_now = MOSCOW.localize(datetime(2026, 10, 12, 13, 40))
+        with patch("src.data_processor.datetime") as datetime_mock, patch.object(
+            config, "SHEETS_STREAMING", streaming
+        ):
+            datetime_mock.now.return_value = recorded_now
+            return DataProcessor().generate_secondary_report()
+
+    def test_values_get_is_recorded_with_timing(self):
+        self.record_report()
+
+        (capture,) = load_captures(self.directory.name)
+        self.assertEqual(capture.range, self.range_name)
+        self.assertEqual(capture.response["values"], self.values)
+        self.assertEqual(capture.recorded_at.date(), RECORDED_DAY)
+        self.assertGreater(capture.seconds, 0)
+
+    def test_replay_rebuilds_the_recorded_report_offline(self):
+        recorded = self.record_report()
+        requests_after_recording = self.server.requests_count
+
+        with patch.object(config, "SHEETS_STREAMING", False):
+            replayed = DataProcessor.from_capture(self.directory.name).generate_secondary_report()
+        with patch.object(config, "SHEETS_STREAMING", True):
+            streamed = DataProcessor.from_capture(self.directory.name).generate_secondary_report()
+
+        self.assertTrue(replayed["success"])
+        self.assertEqual(replayed["report_date"], RECORDED_DAY)
+        self.assertEqual(replayed["projects"], recorded["projects"])
+        self.assertEqual(streamed["projects"], recorded["projects"])
+        self.assertEqual(self.server.requests_count, requests_after_recording)
+
+    def test_streamed_response_is_recorded(self):
+        report = self.record_report(streaming=True)
+
+        (capture,) = load_captures(self.directory.name)
+        self.assertTrue(report["success"])
+        self.assertEqual(capture.response["values"], self.values)
+
+    def test_recorder_numbers_continue_existing_captures(self):
+        self.record_report()
+        self.record_report()
+
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ["000001.json", "000002.json"])
+
+
+class SheetsReplayTests(unittest.TestCase):
+    def test_replay_cycles_and_waits_in_realtime(self):
+        waited = []
+        first = Capture("A1:B2", MOSCOW.localize(datetime(2026, 10, 12, 9, 0)), 0.5, {"values": [["1"]]})
+        second = Capture("A1:B2", MOSCOW.localize(datetime(2026, 10, 12, 9, 5)), 2.0, {"values": [["2"]]})
+        replay = SheetsReplay([first, second], realtime=True, sleep=waited.append)
+
+        served = [replay.next("A1:B2").response["values"][0][0] for _ in range(3)]
+
+        self.assertEqual(served, ["1", "2", "1"])
+        self.assertEqual(waited, [0.5, 2.0, 0.5])
+        self.assertEqual(replay.recorded_at, first.recorded_at)
+
+    def test_unknown_range_fails(self):
+        replay = SheetsReplay([Capture("A1", datetime(2026, 10, 12), 0.1, {})])
+
+        with self.assertRaises(KeyError):
+            replay.next("B1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,215 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytz
+
+from src.data_processor import DataProcessor
+from src.sheets_resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    SheetsCircuitOpenError,
+    SheetsClientError,
+    SheetsEmptyError,
+    SheetsFetchError,
+    SheetsNetworkError,
+    SheetsRateLimitError,
+    SheetsServerError,
+    call_with_retry,
+    classify_error,
+)
+
+
+class FakeHttpError(Exception):
+    """Как googleapiclient.errors.HttpError: статус в resp.status."""
+
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.resp = MagicMock(status=status)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_processor(execute):
+    """DataProcessor с подменённым service: execute() решает, что вернёт Google."""
+    processor = DataProcessor.__new__(DataProcessor)
+    processor._init_state()
+    processor.service = MagicMock()
+    processor.service.spreadsheets.return_value.values.return_value.get.return_value.execute.side_effect = execute
+    processor.retry_policy = RetryPolicy(max_attempts=3, base_delay=0.0, max_delay=0.0)
+    processor.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    return processor
+
+
+class ClassifyTests(unittest.TestCase):
+    def test_maps_statuses_to_error_types(self):
+        self.assertIsInstance(classify_error(FakeHttpError(429)), SheetsRateLimitError)
+        self.assertIsInstance(classify_error(FakeHttpError(503)), SheetsServerError)
+        self.assertIsInstance(classify_error(FakeHttpError(403)), SheetsClientError)
+        self.assertIsInstance(classify_error(ConnectionResetError()), SheetsNetworkError)
+        self.assertEqual("fetch_failed", classify_error(RuntimeError("x")).kind)
+
+
+class RetryTests(unittest.TestCase):
+    def test_retries_transient_errors_until_success(self):
+        outcomes = [FakeHttpError(503), FakeHttpError(429), {"values": [["ok"]]}]
+        sleeps = []
+
+        def func():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        result = call_with_retry(func, RetryPolicy(max_attempts=4, base_delay=1.0), sleep=sleeps.append)
+
+        self.assertEqual({"values": [["ok"]]}, result)
+        self.assertEqual(2, len(sleeps))
+        self.assertTrue(0 <= sleeps[0] <= 2.0)
+        self.assertTrue(0 <= sleeps[1] <= 4.0)
+
+    def test_client_error_is_not_retried(self):
+        calls = []
+
+        def func():
+            calls.append(1)
+            raise FakeHttpError(404)
+
+        with self.assertRaises(SheetsClientError):
+            call_with_retry(func, RetryPolicy(max_attempts=4), sleep=lambda _: None)
+        self.assertEqual(1, len(calls))
+
+    def test_backoff_is_capped(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=3.0)
+        self.assertTrue(all(policy.backoff(10) <= 3.0 for _ in range(50)))
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def test_opens_after_threshold_and_half_opens_after_timeout(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(CircuitBreaker.OPEN, breaker.state)
+        self.assertFalse(breaker.allow())
+
+        clock.now = 31
+        self.assertEqual(CircuitBreaker.HALF_OPEN, breaker.state)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # пробный запрос только один
+
+        breaker.record_success()
+        self.assertEqual(CircuitBreaker.CLOSED, breaker.state)
+
+    def test_client_error_on_probe_closes_the_circuit(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now = 31
+
+        with self.assertRaises(SheetsClientError):
+            call_with_retry(MagicMock(side_effect=FakeHttpError(404)), RetryPolicy(), breaker)
+
+        self.assertEqual(CircuitBreaker.CLOSED, breaker.state)
+        self.assertTrue(breaker.allow())
+
+    def test_open_circuit_fails_fast(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_failure()
+        func = MagicMock()
+
+        with self.assertRaises(SheetsCircuitOpenError):
+            call_with_retry(func, RetryPolicy(), breaker)
+        func.assert_not_called()
+
+
+class DataProcessorResilienceTests(unittest.TestCase):
+    def test_serves_stale_snapshot_while_google_fails(self):
+        outcomes = [{"values": [["header"], ["row"]]}]
+
+        def execute():
+            if outcomes:
+                return outcomes.pop(0)
+            raise FakeHttpError(503)
+
+        processor = make_processor(execute)
+
+        fresh = processor.get_sheet_data("SECONDARY")
+        self.assertFalse(fresh.stale)
+
+        stale = processor.get_sheet_data("SECONDARY")
+        self.assertTrue(stale.stale)
+        self.assertEqual([["header"], ["row"]], list(stale))
+        self.assertEqual(fresh.fetched_at, stale.fetched_at)
+
+        # breaker разомкнут: в Google больше не ходим, снимок всё ещё отдаём
+        again = processor.get_sheet_data("SECONDARY")
+        self.assertTrue(again.stale)
+
+    def test_raises_typed_error_without_snapshot(self):
+        processor = make_processor(FakeHttpError(429))
+        with self.assertRaises(SheetsRateLimitError):
+            processor.get_sheet_data("SECONDARY")
+
+    def test_empty_sheet_is_distinct_error(self):
+        processor = make_processor(lambda: {"values": []})
+        with self.assertRaises(SheetsEmptyError):
+            processor.get_sheet_data("SECONDARY")
+
+    def test_report_surfaces_error_type(self):
+        processor = make_processor(FakeHttpError(503))
+        result = processor.generate_secondary_report()
+
+        self.assertFalse(result["success"])
+        self.assertEqual("server_error", result["error_type"])
+        self.assertIn("503", result["error"])
+
+    def test_report_marks_stale_data(self):
+        moscow = pytz.timezone("Europe/Moscow")
+        fixed_now = moscow.localize(datetime(2026, 8, 16, 13, 40))
+        values = [
+            ["Проект", "Статус", "Объем", "D", "Остаток", "Выдано", "16.08.26"],
+            ["[LR1] Alpha", "TRUE", "100", "", "90", "10", "3"],
+        ]
+        outcomes = [{"values": values}]
+
+        def execute():
+            if outcomes:
+                return outcomes.pop(0)
+            raise FakeHttpError(502)
+
+        processor = make_processor(execute)
+        with patch("src.data_processor.datetime") as datetime_mock:
+            datetime_mock.now.return_value = fixed_now
+            fresh = processor.generate_secondary_report()
+            stale = processor.generate_secondary_report()
+
+        self.assertFalse(fresh["stale"])
+        self.assertTrue(stale["success"])
+        self.assertTrue(stale["stale"])
+        self.assertEqual(fixed_now, stale["fetched_at"])
+
+
+class FetchErrorHierarchyTests(unittest.TestCase):
+    def test_all_errors_share_base_class(self):
+        for error_class in (
+            SheetsRateLimitError,
+            SheetsServerError,
+            SheetsNetworkError,
+            SheetsClientError,
+            SheetsCircuitOpenError,
+            SheetsEmptyError,
+        ):
+            self.assertTrue(issubclass(error_class, SheetsFetchError))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+from benchmarks.fake_servers import FakeSheetsServer
+from benchmarks.synthetic import make_sheet
+import src.config as config
+from src.data_processor import DataProcessor, parse_sheet_int
+from src.sheets_stream import iter_values_rows, keep_cells
+
+
+def chunked(body: bytes, size: int):
+    return [body[offset:offset + size] for offset in range(0, len(body), size)]
+
+
+class IterValuesRowsTests(unittest.TestCase):
+    def test_matches_json_loads_for_any_chunk_size(self):
+        values = make_sheet(projects=15, dates=10, today=date(2026, 8, 16))
+        body = json.dumps(
+            {"range": "'[учет данных] 2025'!A1:ZZ227", "majorDimension": "ROWS", "values": values},
+            ensure_ascii=False,
+            indent=1,
+        ).encode("utf-8")
+
+        for size in (1, 3, 7, 64, 4096, len(body)):
+            with self.subTest(size=size):
+                self.assertEqual(values, list(iter_values_rows(chunked(body, size))))
+
+    def test_values_before_other_keys_and_empty_values(self):
+        body = b'{"values": [["a"], []], "range": "A1:B2"}'
+        self.assertEqual([["a"], []], list(iter_values_rows(chunked(body, 2))))
+        self.assertEqual([], list(iter_values_rows([b'{"range": "A1", "values": []}'])))
+        self.assertEqual([], list(iter_values_rows([b'{"range": "A1"}'])))
+
+    def test_rows_are_yielded_before_body_ends(self):
+        def chunks():
+            yield b'{"values": [["first"],'
+            raise AssertionError("второй кусок не нужен для первой строки")
+
+        self.assertEqual(["first"], next(iter_values_rows(chunks())))
+
+    def test_truncated_body_fails(self):
+        with self.assertRaises(ValueError):
+            list(iter_values_rows([b'{"values": [["a"], ["b"']))
+
+
+class KeepCellsTests(unittest.TestCase):
+    def test_keeps_only_requested_cells(self):
+        rows = [["a", "b", "c", "d"], ["x"]]
+        self.assertEqual([["a", "d"], ["x", None]], list(keep_cells(rows, [0, 3])))
+
+
+class StreamingReportTests(unittest.TestCase):
+    def test_streaming_report_equals_buffered_report(self):
+        rows = make_sheet(projects=40, dates=30, today=date.today())
+        sheet_settings = {**config.SHEET_SETTINGS["SECONDARY"], "SPREADSHEET_ID": "sheet"}
+        with FakeSheetsServer({"sheet": {sheet_settings["NAME"]: rows}}) as server, patch.object(
+            config, "SHEETS_API_BASE_URL", server.url
+        ), patch.object(config, "CREDENTIALS_FILE", None), patch.dict(
+            config.SHEET_SETTINGS, {"SECONDARY": sheet_settings}
+        ):
+            processor = DataProcessor()
+            with patch.object(config, "SHEETS_STREAMING", False):
+                buffered = processor.generate_secondary_report()
+            with patch.object(config, "SHEETS_STREAMING", True):
+                streamed = processor.generate_secondary_report()
+
+        self.assertTrue(streamed["success"])
+        for key in ("projects", "projects_to_disable", "projects_to_reduce", "projects_data"):
+            self.assertEqual(buffered[key], streamed[key])
+
+    def test_deltas_come_from_the_same_single_request(self):
+        rows = make_sheet(projects=40, dates=30, today=date.today())
+        sheet_settings = {**config.SHEET_SETTINGS["SECONDARY"], "SPREADSHEET_ID": "sheet"}
+        with FakeSheetsServer({"sheet": {sheet_settings["NAME"]: rows}}) as server, patch.object(
+            config, "SHEETS_API_BASE_URL", server.url
+        ), patch.object(config, "CREDENTIALS_FILE", None), patch.dict(
+            config.SHEET_SETTINGS, {"SECONDARY": sheet_settings}
+        ), patch.dict(config.REPORT_DELTAS, {"ENABLED": True}), patch.object(
+            config, "SHEETS_STREAMING", True
+        ):
+            report = DataProcessor().generate_secondary_report()
+            requests_count = server.requests_count
+
+        self.assertTrue(report["success"])
+        self.assertEqual(1, requests_count)
+        by_name = {row[0]: row for row in rows[1:]}
+        for project in report["projects"]:
+            row = by_name[project["name"]]
+            self.assertEqual(parse_sheet_int(row, len(rows[0]) - 2), project["yesterday_data"])
+            self.assertEqual(parse_sheet_int(row, len(rows[0]) - 8), project["week_ago_data"])
+            self.assertNotIn("telegram_chat_id", project)
+
+    def test_streaming_surfaces_http_errors_as_error_type(self):
+        sheet_settings = {**config.SHEET_SETTINGS["SECONDARY"], "SPREADSHEET_ID": "missing"}
+        with FakeSheetsServer({}) as server, patch.object(
+            config, "SHEETS_API_BASE_URL", server.url
+        ), patch.object(config, "CREDENTIALS_FILE", None), patch.dict(
+            config.SHEET_SETTINGS, {"SECONDARY": sheet_settings}
+        ), patch.object(config, "SHEETS_STREAMING", True):
+            result = DataProcessor().generate_secondary_report()
+
+        self.assertFalse(result["success"])
+        self.assertEqual("client_error", result["error_type"])
+
+
+if __name__ == "__main__":
+    unittest.main()
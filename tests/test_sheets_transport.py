@@ -0,0 +1,80 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from google.auth.credentials import AnonymousCredentials
+
+from benchmarks.fake_servers import FakeSheetsServer, SheetsFaults
+import src.config as config
+from src.data_processor import DataProcessor
+from src.sheets_transport import ThreadLocalHttp
+
+
+class ThreadLocalHttpTests(unittest.TestCase):
+    def test_one_http_per_thread(self):
+        transport = ThreadLocalHttp(AnonymousCredentials())
+        main_http = transport.get()
+        other = []
+        thread = threading.Thread(target=lambda: other.append(transport.get()))
+        thread.start()
+        thread.join()
+
+        self.assertIs(transport.get(), main_http)
+        self.assertIsNot(other[0], main_http)
+        self.assertEqual(transport.created, 2)
+
+
+class PooledFetchTests(unittest.TestCase):
+    def setUp(self):
+        sheet_settings = {**config.SHEET_SETTINGS["SECONDARY"], "SPREADSHEET_ID": "sheet"}
+        self.sheet_name = sheet_settings["NAME"]
+        self.values = [["Проект", "Статус"]] + [[f"[LR{index}] Проект", "TRUE"] for index in range(1, 9)]
+        self.server = FakeSheetsServer(
+            {"sheet": {self.sheet_name: self.values}},
+            faults=SheetsFaults(latency=0.2),
+        )
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        for patcher in (
+            patch.object(config, "SHEETS_API_BASE_URL", self.server.url),
+            patch.object(config, "CREDENTIALS_FILE", None),
+            patch.dict(config.SHEET_SETTINGS, {"SECONDARY": sheet_settings}),
+            patch.dict(config.SHEETS_TRANSPORT, {"MAX_PARALLEL": 4}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_ranges_are_fetched_in_parallel_in_order(self):
+        processor = DataProcessor()
+        targets = [("sheet", f"'{self.sheet_name}'!A{row}:B{row}") for row in range(2, 6)]
+        processor.values_get_many(targets)  # прогрев: потоки и их соединения
+        created = processor.http.created
+
+        started = time.perf_counter()
+        responses = processor.values_get_many(targets)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual([response["values"] for response in responses], [[row] for row in self.values[1:5]])
+        self.assertLess(elapsed, 0.6)  # четыре ответа по 0.2 с — не по очереди
+        self.assertGreaterEqual(created, 2)
+        self.assertEqual(processor.http.created, created)  # соединения потоков переиспользованы
+
+    def test_requests_ask_for_gzip_and_only_values(self):
+        processor = DataProcessor()
+
+        processor.values_get("sheet", f"'{self.sheet_name}'!A1:B2")
+        processor.batch_get("sheet", [f"'{self.sheet_name}'!A1:A2"])
+        list(processor.stream_sheet_rows("SECONDARY"))
+
+        values_get, batch_get, stream = self.server.request_log[-3:]
+        self.assertEqual(values_get["query"]["fields"], ["values"])
+        self.assertEqual(batch_get["query"]["fields"], ["valueRanges(values)"])
+        self.assertEqual(stream["query"]["fields"], ["values"])
+        for request in (values_get, batch_get, stream):
+            self.assertIn("gzip", request["headers"]["accept-encoding"])
+            self.assertIn("gzip", request["headers"]["user-agent"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from datetime import date, datetime
+from unittest.mock import patch
+
+import pytz
+
+from benchmarks.fake_servers import FakeSheetsServer
+import src.config as config
+from src.data_processor import DataProcessor
+from src.tariff_watcher import DISABLE, REDUCE, TariffWatcher, tariff_level
+
+TODAY = date(2026, 10, 19)
+
+
+def project(name, remaining, today_data):
+    return {"name": name, "tariff_remaining": remaining, "today_data": today_data}
+
+
+class TariffLevelTests(unittest.TestCase):
+    def test_levels(self):
+        self.assertEqual(tariff_level(0, 5), DISABLE)
+        self.assertEqual(tariff_level(-3, 0), DISABLE)
+        self.assertEqual(tariff_level(5, 5), REDUCE)
+        self.assertIsNone(tariff_level(6, 5))
+
+
+class TariffWatcherTests(unittest.TestCase):
+    def test_first_poll_is_baseline(self):
+        watcher = TariffWatcher()
+
+        self.assertEqual(watcher.update([project("A", 0, 1), project("B", 2, 5)]), ([], []))
+
+    def test_only_new_crossings_are_reported_once(self):
+        watcher = TariffWatcher()
+        watcher.update([project("A", 100, 10), project("B", 100, 10), project("C", 0, 0)])
+
+        to_disable, to_reduce = watcher.update(
+            [project("A", 0, 10), project("B", 8, 10), project("C", 0, 0)]
+        )
+        self.assertEqual([entry["name"] for entry in to_disable], ["A"])
+        self.assertEqual(to_reduce, [{"name": "B", "remaining": 8, "today_data": 10}])
+
+        self.assertEqual(
+            watcher.update([project("A", -5, 12), project("B", 5, 12), project("C", 0, 0)]),
+            ([], []),
+        )
+
+    def test_reduce_then_disable_escalates(self):
+        watcher = TariffWatcher()
+        watcher.update([project("A", 100, 10)])
+        watcher.update([project("A", 5, 10)])
+
+        to_disable, to_reduce = watcher.update([project("A", 0, 15)])
+
+        self.assertEqual([entry["name"] for entry in to_disable], ["A"])
+        self.assertEqual(to_reduce, [])
+
+    def test_topped_up_project_warns_again(self):
+        watcher = TariffWatcher()
+        watcher.update([project("A", 0, 10)])
+        self.assertEqual(watcher.update([project("A", 1000, 10)]), ([], []))
+
+        to_disable, _ = watcher.update([project("A", 0, 10)])
+
+        self.assertEqual([entry["name"] for entry in to_disable], ["A"])
+
+
+class GetTariffRowsTests(unittest.TestCase):
+    def setUp(self):
+        headers = ["Проект", "Статус", "Объем", "D", "Остаток", "Выдано", "18.10.26", "19.10.26"]
+        self.values = [
+            headers,
+            ["[LR1] Альфа", "TRUE", "100", "", "40", "60", "30", "12"],
+            ["[LR2] Бета", "FALSE", "100", "", "0", "100", "5"],
+            ["[LR3] Гамма", "TRUE", "100", "", "0", "100"],
+        ]
+        sheet_settings = {**config.SHEET_SETTINGS["SECONDARY"], "SPREADSHEET_ID": "sheet"}
+        sheet_settings["STRUCTURE"] = {**sheet_settings["STRUCTURE"], "RANGE": "A1:ZZ10"}
+        self.server = FakeSheetsServer({"sheet": {sheet_settings["NAME"]: self.values}})
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        fixed_now = pytz.timezone("Europe/Moscow").localize(datetime(2026, 10, 19, 10, 0))
+        for patcher in (
+            patch.object(config, "SHEETS_API_BASE_URL", self.server.url),
+            patch.object(config, "CREDENTIALS_FILE", None),
+            patch.dict(config.SHEET_SETTINGS, {"SECONDARY": sheet_settings}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        datetime_patcher = patch("src.data_processor.datetime")
+        datetime_mock = datetime_patcher.start()
+        datetime_mock.now.return_value = fixed_now
+        self.addCleanup(datetime_patcher.stop)
+
+    def test_reads_only_needed_columns_and_caches_today_column(self):
+        processor = DataProcessor()
+
+        rows = processor.get_tariff_rows()
+        after_first_poll = self.server.requests_count
+        self.values[1][7] = "45"
+        rows_again = processor.get_tariff_rows()
+
+        self.assertEqual(
+            rows,
+            [project("[LR1] Альфа", 40, 12), project("[LR3] Гамма", 0, 0)],
+        )
+        self.assertEqual(rows_again[0]["today_data"], 45)
+        self.assertEqual(after_first_poll, 2)  # строка дат + колонки
+        self.assertEqual(self.server.requests_count - after_first_poll, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -21,6 +21,9 @@ sys.modules.setdefault("googleapiclient", MagicMock())
 sys.modules.setdefault("googleapiclient.discovery", MagicMock())
 
 from src.data_processor import DataProcessor, parse_sheet_int, column_to_index
+from src.live_dashboard import LiveDashboard
+from src.report_pages import ReportPages
+from src import tracing
 from src.telegram_bot import TelegramBot
 import src.config as config
 
@@ -31,8 +34,8 @@ REPORT_DATE = date(2026, 8, 16)
 def make_processor(rows):
     """Собирает DataProcessor без Google-credentials, с готовыми строками листа."""
     processor = DataProcessor.__new__(DataProcessor)
-    processor.moscow_tz = __import__("pytz").timezone("Europe/Moscow")
-    processor.get_sheet_data = lambda sheet_type="SECONDARY": rows
+    processor._init_state()
+    processor.get_sheet_data = lambda sheet_type="SECONDARY", settings=None: rows
     return processor
 
 
@@ -184,6 +187,60 @@ class TelegramDeliveryTests(unittest.IsolatedAsyncioTestCase):
         self.assertIn(r"\[LR2\] Beta", messages_by_chat[200])
         self.assertEqual(1, messages_by_chat[100].count("## Отчёт"))
 
+    async def test_failed_chat_does_not_drop_the_rest_of_the_queue(self):
+        project = {"total_issued": 10, "total_volume": 100, "tariff_remaining": 0}
+        result = self._success_result(
+            [
+                {**project, "name": "[LR1] Alpha", "today_data": 3, "telegram_chat_id": 100},
+                {**project, "name": "[LR2] Beta", "today_data": 7, "telegram_chat_id": 200},
+            ],
+            projects_to_disable=[{"name": "[LR2] Beta", "remaining": 0, "today_data": 7,
+                                  "telegram_chat_id": 200}],
+        )
+        calls = []
+
+        def send(token, chat_id, text):
+            if chat_id == 100:
+                raise RuntimeError("chat not found")
+            calls.append((chat_id, text.split("\n", 1)[0]))
+
+        with patch.object(config, "REPORTS_MESSAGE_FORMAT", "rich"), patch(
+            "src.rich_report.send_rich_telegram_message", side_effect=send
+        ), patch.object(self.bot.bot, "send_message", new_callable=AsyncMock) as send_message:
+            with self.assertLogs("src.delivery_queue", "ERROR"):
+                delivered = await self.bot.deliver_secondary_report(chat_id=-100, result=result, notify_empty=True)
+
+        self.assertFalse(delivered)
+        self.assertEqual([(200, "## Отчёт · 16.08"), (200, "## Внимание · тарифы исчерпаны")], calls)
+        self.assertIn("chat not found", send_message.call_args.kwargs["text"])
+
+    async def test_serve_last_resends_only_own_chat_report(self):
+        project = {"total_issued": 10, "total_volume": 100, "tariff_remaining": 0}
+        result = self._success_result(
+            [
+                {**project, "name": "[LR1] Alpha", "today_data": 3, "telegram_chat_id": -100},
+                {**project, "name": "[LR2] Beta", "today_data": 7, "telegram_chat_id": 200},
+            ],
+            projects_to_disable=[{"name": "[LR1] Alpha", "remaining": 0, "today_data": 3}],
+        )
+        result["report_date"] = datetime.now(pytz.timezone(config.REPORT_TIME["TIMEZONE"])).date()
+        calls = []
+
+        with patch.object(config, "REPORTS_MESSAGE_FORMAT", "rich"), patch(
+            "src.rich_report.send_rich_telegram_message",
+            side_effect=lambda *args: calls.append(args),
+        ):
+            await self.bot.deliver_secondary_report(chat_id=-100, result=result)
+            sent = len(calls)
+            self.assertTrue(await self.bot.serve_last_report(-100))
+            self.assertFalse(await self.bot.serve_last_report(300))
+
+        served = calls[sent:]
+        self.assertEqual([-100], [call[1] for call in served])
+        self.assertIn(r"\[LR1\] Alpha", served[0][2])
+        self.assertNotIn("Внимание", served[0][2])
+        self.assertIsNone(self.bot.project_index_report)
+
     async def test_rich_skips_zero_today_and_does_not_call_send_message(self):
         result = self._success_result(
             [
@@ -209,6 +266,38 @@ class TelegramDeliveryTests(unittest.IsolatedAsyncioTestCase):
         send_rich.assert_not_called()
         send_message.assert_not_called()
 
+    async def test_live_dashboard_edits_pinned_message_instead_of_posting(self):
+        self.bot.live_dashboard = LiveDashboard(self.bot.bot, min_edit_interval=0)
+        result = self._success_result(
+            [
+                {
+                    "name": "[LR1] Alpha",
+                    "today_data": 3,
+                    "total_issued": 10,
+                    "total_volume": 100,
+                    "tariff_remaining": 90,
+                }
+            ]
+        )
+
+        with patch.object(config, "REPORTS_MESSAGE_FORMAT", "rich"), patch(
+            "src.rich_report.send_rich_telegram_message", return_value=5
+        ) as send_rich, patch(
+            "src.rich_report.edit_rich_telegram_message"
+        ) as edit_rich, patch.object(
+            self.bot.bot, "pin_chat_message", new_callable=AsyncMock
+        ) as pin:
+            await self.bot.deliver_secondary_report(chat_id=-100, result=result)
+            await self.bot.deliver_secondary_report(chat_id=-100, result=result)
+            result["projects"][0]["today_data"] = 4
+            await self.bot.deliver_secondary_report(chat_id=-100, result=result)
+
+        send_rich.assert_called_once()
+        pin.assert_awaited_once()
+        edit_rich.assert_called_once()
+        self.assertEqual((-100, 5), edit_rich.call_args.args[1:3])
+        self.assertIn("| Сегодня | 4 |", edit_rich.call_args.args[3])
+
     async def test_legacy_keeps_send_message(self):
         result = self._success_result(
             [
@@ -234,6 +323,19 @@ class TelegramDeliveryTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(-100, send_message.call_args.kwargs["chat_id"])
         self.assertIn("legacy-text", send_message.call_args.kwargs["text"])
 
+    async def test_legacy_long_report_is_split(self):
+        result = {**self._success_result([]), "projects_data": "Проект: *Alpha*\n" * 1000}
+
+        with patch.object(config, "REPORTS_MESSAGE_FORMAT", "legacy"), patch.object(
+            self.bot.bot, "send_message", new_callable=AsyncMock
+        ) as send_message:
+            await self.bot.deliver_secondary_report(chat_id=-100, result=result)
+
+        texts = [call.kwargs["text"] for call in send_message.call_args_list]
+        self.assertEqual(4, len(texts))
+        self.assertTrue(all(len(text) <= 4096 for text in texts))
+        self.assertEqual(1000, sum(text.count("*Alpha*") for text in texts))
+
     async def test_rich_warnings_go_as_tables(self):
         result = self._success_result(
             [
@@ -276,6 +378,91 @@ class TelegramDeliveryTests(unittest.IsolatedAsyncioTestCase):
         self.assertIn("| Остаток | 2 |", calls[2][2])
         self.assertNotIn("Сегодня", calls[2][2])
 
+    async def test_disable_warning_does_not_wait_for_other_chats(self):
+        projects = [
+            {"name": f"[LR{chat_id}] Client", "today_data": 3, "total_issued": 1, "total_volume": 10,
+             "tariff_remaining": 9, "telegram_chat_id": chat_id}
+            for chat_id in (100, 200, 300)
+        ]
+        result = self._success_result(
+            projects + [{"name": "[LR1] Group", "today_data": 3, "total_issued": 1,
+                         "total_volume": 10, "tariff_remaining": 9}],
+            projects_to_disable=[{"name": "[LR9] Dead", "remaining": 0, "today_data": 0}],
+        )
+
+        for per_chat_order, expected in (
+            ("fifo", [(-100, "## Отчёт"), (-100, "## Внимание"), (100, "## Отчёт")]),
+            ("priority", [(-100, "## Внимание"), (100, "## Отчёт"), (200, "## Отчёт")]),
+        ):
+            with self.subTest(per_chat_order=per_chat_order):
+                calls = []
+                with patch.object(config, "REPORTS_MESSAGE_FORMAT", "rich"), patch.dict(
+                    config.DELIVERY_QUEUE, {"PER_CHAT_ORDER": per_chat_order}
+                ), patch(
+                    "src.rich_report.send_rich_telegram_message",
+                    side_effect=lambda *args: calls.append(args),
+                ):
+                    self.assertTrue(await self.bot.deliver_secondary_report(chat_id=-100, result=result))
+
+                self.assertEqual(5, len(calls))
+                self.assertEqual(
+                    [(call[1], call[2].split(" · ", 1)[0]) for call in calls[:3]],
+                    expected,
+                )
+                self.assertEqual(1, self.bot.last_delivery_waits["disable"]["count"])
+                self.assertEqual(4, self.bot.last_delivery_waits["main"]["count"])
+
+    async def test_paginated_report_is_one_message_turned_from_cache(self):
+        result = self._success_result(
+            [
+                {"name": f"[LR{index}] Project", "today_data": 1, "total_issued": 1,
+                 "total_volume": 10, "tariff_remaining": 9}
+                for index in range(1, 8)
+            ]
+        )
+        self.bot.report_pages = ReportPages(capacity=50)
+        sent = []
+        with patch.object(config, "REPORTS_MESSAGE_FORMAT", "rich"), patch(
+            "src.rich_report.RICH_TABLE_MAX_DATA_ROWS", 3
+        ), patch(
+            "src.rich_report.send_rich_telegram_message",
+            side_effect=lambda *args: sent.append(args) or 77,
+        ):
+            await self.bot.deliver_secondary_report(chat_id=-100, result=result)
+
+        (call,) = sent
+        keyboard = call[3]["inline_keyboard"][0]
+        self.assertEqual(keyboard[1]["text"], "1/3")
+
+        callback = MagicMock()
+        callback.data = keyboard[2]["callback_data"]
+        callback.message.chat.id = -100
+        callback.message.message_id = 77
+        callback.answer = AsyncMock()
+        with patch("src.rich_report.edit_rich_telegram_message") as edit_rich:
+            await self.bot.callback_handler(callback)
+
+        edit_rich.assert_called_once()
+        _, chat_id, message_id, text, markup = edit_rich.call_args.args
+        self.assertEqual((chat_id, message_id), (-100, 77))
+        self.assertIn(r"\[LR4\] Project", text)
+        self.assertEqual(markup["inline_keyboard"][0][1]["text"], "2/3")
+        self.processor.generate_secondary_report.assert_not_called()
+        callback.answer.assert_awaited_once_with()
+
+    async def test_unknown_page_asks_for_a_fresh_report(self):
+        self.bot.report_pages = ReportPages(capacity=50)
+        callback = MagicMock()
+        callback.data = "page:000000000000:1"
+        callback.message.chat.id = -100
+        callback.answer = AsyncMock()
+
+        with patch("src.rich_report.edit_rich_telegram_message") as edit_rich:
+            await self.bot.callback_handler(callback)
+
+        edit_rich.assert_not_called()
+        self.assertIn("/secondary", callback.answer.call_args.args[0])
+
     async def test_rich_disable_warning_sent_when_today_is_zero(self):
         result = self._success_result(
             [
@@ -332,6 +519,151 @@ class TelegramDeliveryTests(unittest.IsolatedAsyncioTestCase):
         self.assertIn("legacy-text", texts[0])
         self.assertEqual("disable-me", texts[1])
 
+    async def test_stale_result_sends_notice_before_report(self):
+        result = self._success_result(
+            [
+                {
+                    "name": "[LR1] Alpha",
+                    "today_data": 3,
+                    "total_issued": 10,
+                    "total_volume": 100,
+                    "tariff_remaining": 90,
+                }
+            ]
+        )
+        result["stale"] = True
+        result["fetched_at"] = datetime(2026, 8, 16, 12, 5)
+
+        with patch.object(config, "REPORTS_MESSAGE_FORMAT", "rich"), patch(
+            "src.rich_report.send_rich_telegram_message"
+        ) as send_rich, patch.object(
+            self.bot.bot, "send_message", new_callable=AsyncMock
+        ) as send_message:
+            await self.bot.deliver_secondary_report(chat_id=-100, result=result)
+
+        send_rich.assert_called_once()
+        self.assertIn("16.08 12:05", send_message.call_args.kwargs["text"])
+
+    async def test_cmd_secondary_traces_fetch_build_and_each_send(self):
+        class FakeResponse:
+            def raise_for_status(self):
+                return None
+
+            def json(self):
+                return {"ok": True, "result": {"message_id": 1}}
+
+        ring = tracing.RingBufferExporter()
+        tracing.configure_tracing([ring])
+        self.addCleanup(tracing.configure_tracing, [])
+
+        def generate():
+            with tracing.span("get_sheet_data"):
+                pass
+            return self._success_result(
+                [{"name": "[LR1] Alpha", "today_data": 3, "total_issued": 1, "total_volume": 10,
+                  "tariff_remaining": 9, "telegram_chat_id": chat_id} for chat_id in (-100, -200)]
+            )
+
+        self.processor.generate_secondary_report.side_effect = generate
+        message = MagicMock()
+        message.chat.id = -100
+        with patch.object(config, "REPORTS_MESSAGE_FORMAT", "rich"), patch.object(
+            config, "LIVE_DASHBOARD", {**config.LIVE_DASHBOARD, "ENABLED": False}
+        ), patch("src.rich_report.requests.post", return_value=FakeResponse()):
+            await self.bot.cmd_secondary(message)
+
+        (spans,) = ring.recent_traces(1)
+        root = spans[0]
+        self.assertEqual(root.name, "cmd_secondary")
+        names = [span.name for span in spans if span.parent_id == root.span_id]
+        self.assertEqual(names.count("get_sheet_data"), 1)
+        self.assertEqual(names.count("build_rich_report_messages"), 2)
+        self.assertEqual(names.count("send_rich_telegram_message"), 2)
+        self.assertEqual({span.trace_id for span in spans}, {root.trace_id})
+
+    async def test_traces_command_answers_admin_only(self):
+        ring = tracing.RingBufferExporter()
+        tracing.configure_tracing([ring])
+        self.addCleanup(tracing.configure_tracing, [])
+        with tracing.trace("send_report"):
+            with tracing.span("get_sheet_data"):
+                pass
+
+        stranger = MagicMock()
+        stranger.chat.id = 555
+        stranger.from_user.id = 555
+        stranger.answer = AsyncMock()
+        admin = MagicMock()
+        admin.chat.id = 7
+        admin.from_user.id = 7
+        admin.answer = AsyncMock()
+        with patch.object(config, "ADMIN_CHAT_ID", 7):
+            await self.bot.cmd_traces(stranger)
+            await self.bot.cmd_traces(admin)
+
+        stranger.answer.assert_not_awaited()
+        text = admin.answer.await_args.args[0]
+        self.assertIn("send_report", text)
+        self.assertIn("  get_sheet_data", text)
+
+    async def test_tariff_watcher_warns_only_about_new_crossings(self):
+        from src.tariff_watcher import TariffWatcher
+
+        polls = [
+            [{"name": "[LR1] Alpha", "tariff_remaining": 50, "today_data": 10},
+             {"name": "[LR2] Beta", "tariff_remaining": 0, "today_data": 3}],
+            [{"name": "[LR1] Alpha", "tariff_remaining": 0, "today_data": 60},
+             {"name": "[LR2] Beta", "tariff_remaining": 0, "today_data": 3}],
+            [{"name": "[LR1] Alpha", "tariff_remaining": -4, "today_data": 64},
+             {"name": "[LR2] Beta", "tariff_remaining": 0, "today_data": 3}],
+        ]
+        self.processor.get_tariff_rows.side_effect = polls
+        self.bot.tariff_watcher = TariffWatcher()
+
+        with patch.object(config, "REPORTS_MESSAGE_FORMAT", "rich"), patch.object(
+            config, "GROUP_CHAT_ID", -100
+        ), patch("src.telegram_bot.rich_report.send_rich_telegram_message") as send_rich:
+            sent = [await self.bot.poll_tariffs() for _ in polls]
+
+        self.assertEqual(sent, [False, True, False])
+        send_rich.assert_called_once()
+        chat_id, text = send_rich.call_args.args[1:]
+        self.assertEqual(chat_id, -100)
+        self.assertIn("тарифы исчерпаны", text)
+        self.assertIn("Alpha", text)
+        self.assertNotIn("Beta", text)
+
+    async def test_tariff_warning_is_retried_until_sent(self):
+        from src.tariff_watcher import TariffWatcher
+
+        ok = {"name": "[LR1] Alpha", "tariff_remaining": 50, "today_data": 10}
+        empty = {"name": "[LR1] Alpha", "tariff_remaining": 0, "today_data": 60}
+        self.processor.get_tariff_rows.side_effect = [[ok], [empty], [empty]]
+        self.bot.tariff_watcher = TariffWatcher()
+
+        with patch.object(config, "REPORTS_MESSAGE_FORMAT", "rich"), patch.object(
+            config, "GROUP_CHAT_ID", -100
+        ), patch(
+            "src.telegram_bot.rich_report.send_rich_telegram_message",
+            side_effect=[RuntimeError("Bot API недоступен"), 1],
+        ) as send_rich, self.assertLogs("src.delivery_queue", "ERROR"):
+            sent = [await self.bot.poll_tariffs() for _ in range(3)]
+
+        self.assertEqual(sent, [False, False, True])
+        self.assertEqual(send_rich.call_count, 2)
+
+    async def test_tariff_poll_without_chat_is_skipped(self):
+        from src.tariff_watcher import TariffWatcher
+
+        self.bot.tariff_watcher = TariffWatcher()
+        with patch.dict(config.TARIFF_WATCHER, {"CHAT_ID": None}), patch.object(
+            config, "GROUP_CHAT_ID", None
+        ), self.assertLogs("src.telegram_bot", "WARNING"):
+            self.assertFalse(await self.bot.poll_tariffs())
+
+        self.processor.get_tariff_rows.assert_not_called()
+        self.assertIsNone(self.bot.tariff_watcher.levels)
+
     def test_bot_does_not_schedule_reports_internally(self):
         self.assertFalse(hasattr(TelegramBot, "check_reports_periodically"))
         self.assertFalse(hasattr(TelegramBot, "check_and_send_reports"))
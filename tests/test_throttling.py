@@ -0,0 +1,139 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from aiogram.types import CallbackQuery, Chat, Message, User
+
+from src.throttling import ReportThrottlingMiddleware, SlidingWindow, report_request
+
+SETTINGS = {"ENABLED": True, "WINDOW": 60, "USER_LIMIT": 2, "CHAT_LIMIT": 3, "SERVE_LAST": False}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def user(user_id):
+    return User.model_construct(id=user_id, is_bot=False, first_name="Тест")
+
+
+def command(text, user_id=1, chat_id=-100):
+    return Message.model_construct(
+        message_id=1,
+        text=text,
+        chat=Chat.model_construct(id=chat_id, type="group"),
+        from_user=user(user_id),
+    )
+
+
+def button(user_id=1, chat_id=-100):
+    return CallbackQuery.model_construct(
+        id="1",
+        data="secondary",
+        message=command("📊 Отчет", chat_id=chat_id),
+        from_user=user(user_id),
+        chat_instance="chat",
+    )
+
+
+class SlidingWindowTests(unittest.TestCase):
+    def test_limit_frees_up_as_the_window_slides(self):
+        window = SlidingWindow(limit=2, window=60)
+        window.record("a", 0)
+        window.record("a", 30)
+
+        self.assertFalse(window.allows("a", 59))
+        self.assertTrue(window.allows("a", 60))
+        self.assertTrue(window.allows("b", 59))
+        self.assertEqual(window.last("a"), 30)
+
+    def test_idle_keys_are_dropped(self):
+        window = SlidingWindow(limit=2, window=60)
+        for user_id in range(100):
+            window.record(user_id, 0)
+        window.record("late", 30)
+
+        window.record("new", 61)
+
+        self.assertEqual(len(window), 2)
+        self.assertIsNone(window.last(0))
+        self.assertEqual(window.last("late"), 30)
+
+
+class ReportRequestTests(unittest.TestCase):
+    def test_only_report_command_and_button_count(self):
+        self.assertEqual(report_request(command("/secondary"))["period"], False)
+        self.assertEqual(report_request(command("/secondary@bot 01.10-15.10"))["period"], True)
+        self.assertEqual(report_request(command("/secondary "))["period"], False)
+        self.assertIsNone(report_request(command("/secondaryx")))
+        self.assertIsNone(report_request(command("/project LR1")))
+        self.assertEqual(report_request(button(user_id=7))["user_id"], 7)
+
+
+class MiddlewareTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.clock = FakeClock()
+        self.handler = AsyncMock(return_value="handled")
+        # ответы бота в чат и всплывающие подсказки кнопок
+        self.message_answer = self.patch_answer(Message)
+        self.callback_answer = self.patch_answer(CallbackQuery)
+
+    def patch_answer(self, event_type):
+        patcher = patch.object(event_type, "answer", new_callable=AsyncMock)
+        answer = patcher.start()
+        self.addCleanup(patcher.stop)
+        return answer
+
+    async def test_user_limit_replies_instead_of_building_report(self):
+        middleware = ReportThrottlingMiddleware(SETTINGS, clock=self.clock)
+
+        results = [await middleware(self.handler, command("/secondary"), {}) for _ in range(2)]
+        self.clock.now += 12
+        throttled = await middleware(self.handler, command("/secondary"), {})
+
+        self.assertEqual(results, ["handled", "handled"])
+        self.assertIsNone(throttled)
+        self.assertEqual(self.handler.await_count, 2)
+        self.assertIn("12 с назад", self.message_answer.call_args.args[0])
+        self.assertEqual(
+            middleware.counters(),
+            {"allowed": 2, "suppressed_user": 1, "suppressed_chat": 0, "served_last": 0},
+        )
+
+        self.clock.now += 60
+        self.assertEqual(await middleware(self.handler, command("/secondary"), {}), "handled")
+
+    async def test_chat_limit_counts_all_users_and_button(self):
+        middleware = ReportThrottlingMiddleware(SETTINGS, clock=self.clock)
+        for user_id in (1, 2, 3):
+            await middleware(self.handler, button(user_id=user_id), {})
+        await middleware(self.handler, button(user_id=4), {})
+
+        self.assertEqual(self.handler.await_count, 3)
+        self.callback_answer.assert_awaited_once()
+        self.assertEqual(middleware.counters()["suppressed_chat"], 1)
+
+    async def test_other_events_pass_through(self):
+        middleware = ReportThrottlingMiddleware({**SETTINGS, "USER_LIMIT": 0}, clock=self.clock)
+
+        self.assertEqual(await middleware(self.handler, command("/start"), {}), "handled")
+
+    async def test_serve_last_resends_cached_report_except_for_periods(self):
+        serve_last = AsyncMock(return_value=True)
+        middleware = ReportThrottlingMiddleware(
+            {**SETTINGS, "USER_LIMIT": 0, "SERVE_LAST": True}, serve_last=serve_last, clock=self.clock
+        )
+        await middleware(self.handler, command("/secondary"), {})
+        await middleware(self.handler, command("/secondary 01.10-15.10"), {})
+
+        serve_last.assert_awaited_once_with(-100)
+        self.message_answer.assert_awaited_once()  # только период: его из кэша не отдать
+        self.handler.assert_not_awaited()
+        self.assertEqual(middleware.counters()["served_last"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
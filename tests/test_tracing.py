@@ -0,0 +1,128 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from src import tracing
+
+
+class TracingTests(unittest.TestCase):
+    def setUp(self):
+        self.ring = tracing.RingBufferExporter(100)
+        tracing.configure_tracing([self.ring])
+        self.addCleanup(tracing.configure_tracing, [])
+
+    def test_spans_are_nested_under_trace(self):
+        with tracing.trace("send_report", chat_id=-100) as root:
+            with tracing.span("get_sheet_data") as fetch:
+                with tracing.span("batch_get", ranges=2) as batch:
+                    pass
+
+        spans = {span.name: span for span in self.ring.spans()}
+        self.assertEqual(set(spans), {"send_report", "get_sheet_data", "batch_get"})
+        self.assertIsNone(root.parent_id)
+        self.assertEqual(fetch.parent_id, root.span_id)
+        self.assertEqual(batch.parent_id, fetch.span_id)
+        self.assertEqual({span.trace_id for span in spans.values()}, {root.trace_id})
+        self.assertEqual(batch.attributes, {"ranges": 2})
+        self.assertIsNotNone(root.duration_ms)
+        self.assertIsNone(tracing.current_span())
+
+    def test_span_outside_trace_is_not_recorded(self):
+        with tracing.span("send_rich_telegram_message") as span:
+            self.assertIsNone(span)
+        self.assertEqual(self.ring.spans(), [])
+
+    def test_disabled_tracing_records_nothing(self):
+        tracing.configure_tracing([])
+        with tracing.trace("send_report") as root:
+            with tracing.span("get_sheet_data"):
+                pass
+        self.assertIsNone(root)
+        self.assertIsNone(tracing.ring_buffer())
+
+    def test_trace_id_crosses_to_thread(self):
+        def fetch():
+            with tracing.span("get_sheet_data") as span:
+                return span
+
+        async def run():
+            with tracing.trace("cmd_secondary") as root:
+                span = await asyncio.to_thread(fetch)
+            return root, span
+
+        root, span = asyncio.run(run())
+
+        self.assertEqual(span.trace_id, root.trace_id)
+        self.assertEqual(span.parent_id, root.span_id)
+
+    def test_error_is_recorded_and_raised(self):
+        with self.assertRaises(RuntimeError):
+            with tracing.trace("send_report"):
+                with tracing.span("send_rich_telegram_message"):
+                    raise RuntimeError("Too Many Requests")
+
+        errors = {span.name: span.error for span in self.ring.spans()}
+        self.assertEqual(errors["send_rich_telegram_message"], "RuntimeError: Too Many Requests")
+        self.assertEqual(errors["send_report"], "RuntimeError: Too Many Requests")
+
+    def test_recent_traces_skip_unfinished_and_keep_order(self):
+        for name in ("first", "second", "third"):
+            with tracing.trace(name):
+                pass
+        with tracing.trace("running"):
+            with tracing.span("get_sheet_data"):
+                pass
+            traces = self.ring.recent_traces(2)
+
+        self.assertEqual([spans[0].name for spans in traces], ["second", "third"])
+
+    def test_format_trace_folds_repeated_sends(self):
+        with tracing.trace("cmd_secondary", chat_id=1):
+            with tracing.span("get_sheet_data"):
+                pass
+            for chat_id in (10, 20, 30):
+                with tracing.span("send_rich_telegram_message", chat_id=chat_id):
+                    pass
+
+        (spans,) = self.ring.recent_traces(1)
+        text = tracing.format_trace(spans)
+
+        self.assertIn("cmd_secondary", text)
+        self.assertIn("  get_sheet_data", text)
+        self.assertIn("  send_rich_telegram_message ×3:", text)
+        self.assertNotIn("chat_id=20", text)
+
+    def test_ring_buffer_keeps_last_spans(self):
+        ring = tracing.RingBufferExporter(2)
+        tracing.configure_tracing([ring])
+        for name in ("a", "b", "c"):
+            with tracing.trace(name):
+                pass
+        self.assertEqual([span.name for span in ring.spans()], ["b", "c"])
+
+
+class JsonLinesExporterTests(unittest.TestCase):
+    def test_spans_are_written_as_json_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces.jsonl")
+            exporter = tracing.JsonLinesExporter(path)
+            tracing.configure_tracing([exporter])
+            try:
+                with tracing.trace("send_report", chat_id=-100):
+                    with tracing.span("get_sheet_data"):
+                        pass
+            finally:
+                tracing.configure_tracing([])
+
+            with open(path, encoding="utf-8") as file:
+                records = [json.loads(line) for line in file]
+
+        self.assertEqual([record["name"] for record in records], ["get_sheet_data", "send_report"])
+        self.assertEqual(records[0]["parent_id"], records[1]["span_id"])
+        self.assertEqual(records[1]["attributes"], {"chat_id": -100})
+
+
+if __name__ == "__main__":
+    unittest.main()